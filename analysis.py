@@ -0,0 +1,167 @@
+import re
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+import os
+
+
+# 提交类型关键字（与 Notebook 图表5 的 classify_commit_type 保持一致，按优先级排列）
+COMMIT_TYPE_RULES = [
+    ('Bug Fix', ['fix', 'bug', 'issue', 'error', 'defect']),
+    ('Feature', ['feature', 'add', 'new', 'implement']),
+    ('Refactor', ['refactor', 'optimize', 'improve', 'clean', 'remove']),
+    ('Documentation', ['doc', 'comment', 'readme', 'changelog']),
+    ('Test', ['test', 'test case', 'unit test']),
+    ('Merge', ['merge', 'pull request']),
+]
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _read_csv(path: str) -> Optional[pd.DataFrame]:
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path)
+
+
+def load_commit_history(history_csv: str = 'vscode_commit_history.csv',
+                        fallback_csv: str = 'commits_massive.csv') -> Optional[pd.DataFrame]:
+    """
+    读取历史提交数据（run.py 导出）
+    文件不存在时退回爬虫格式的提交数据，并统一为 author / date / message 列
+    """
+    df = _read_csv(history_csv)
+    if df is None:
+        df = _read_csv(fallback_csv)
+        if df is None:
+            return None
+        df = df.rename(columns={'作者': 'author', '作者邮箱': 'author_email', '提交时间': 'date',
+                                '提交信息': 'message', 'SHA': 'commit_hash'})
+
+    df['date'] = pd.to_datetime(df['date'], errors='coerce', utc=True).dt.tz_localize(None)
+    df = df[df['date'].notna()].copy()
+    df['year'] = df['date'].dt.year
+    df['year_month'] = df['date'].dt.to_period('M')
+    return df
+
+
+def load_datasets(data_path: str = 'vscode_massive_data') -> Dict[str, Optional[pd.DataFrame]]:
+    """加载 Notebook 使用的全部数据集（缺失的文件为 None）"""
+    commits_full = _read_csv(f'{data_path}/2_commits.csv')
+    if commits_full is not None:
+        commits_full = commits_full.drop_duplicates(subset=['SHA'], keep='first')
+        commits_full['date'] = pd.to_datetime(commits_full['提交时间'], errors='coerce', utc=True).dt.tz_localize(None)
+        commits_full['commit_hash'] = commits_full['SHA']
+
+    return {
+        'commits_full': commits_full,
+        'commits_history': load_commit_history(),
+        'contributors': _read_csv(f'{data_path}/1_contributors.csv'),
+        'issues': _read_csv(f'{data_path}/3_issues_open.csv'),
+        'prs': _read_csv(f'{data_path}/4_prs_open.csv'),
+        'stargazers': _read_csv(f'{data_path}/5_stargazers.csv'),
+        'forks': _read_csv(f'{data_path}/6_forks.csv'),
+        'releases': _read_csv(f'{data_path}/7_releases.csv'),
+    }
+
+
+def classify_commit_types(messages: pd.Series) -> pd.Series:
+    """
+    向量化的提交类型分类
+    规则与逐行的 classify_commit_type 相同：按优先级匹配第一个命中的类型
+    """
+    lower = messages.fillna('').astype(str).str.lower()
+    result = pd.Series('Other', index=messages.index, dtype='object')
+    assigned = np.zeros(len(messages), dtype=bool)
+    for commit_type, keywords in COMMIT_TYPE_RULES:
+        pattern = '|'.join(re.escape(kw) for kw in keywords)
+        hit = lower.str.contains(pattern, regex=True).to_numpy() & ~assigned
+        result[hit] = commit_type
+        assigned |= hit
+    result[messages.isna().to_numpy()] = 'other'
+    return result
+
+
+# ---------- 各图表的输入聚合 ----------
+
+def top_contributors(contributors: pd.DataFrame, n: int = 20) -> pd.Series:
+    """图表1：Top N 贡献者"""
+    top = contributors.sort_values('贡献次数', ascending=False).head(n)
+    return pd.Series(top['贡献次数'].to_numpy(), index=top['用户名'].to_numpy(), name='贡献次数')
+
+
+def contribution_counts(contributors: pd.DataFrame) -> pd.Series:
+    """图表2：贡献次数分布"""
+    return contributors['贡献次数'].reset_index(drop=True)
+
+
+def pareto(contributors: pd.DataFrame) -> pd.DataFrame:
+    """图表3：帕累托累积曲线"""
+    counts = contributors['贡献次数'].sort_values(ascending=False).reset_index(drop=True)
+    return pd.DataFrame({'贡献次数': counts, 'cumulative_pct': counts.cumsum() / counts.sum() * 100})
+
+
+def monthly_commits(history: pd.DataFrame) -> pd.Series:
+    """图表4：月度提交数"""
+    monthly = history.groupby('year_month').size()
+    monthly.index = monthly.index.to_timestamp()
+    return monthly
+
+
+def commit_type_distribution(history: pd.DataFrame) -> pd.Series:
+    """图表5：提交类型分布"""
+    return classify_commit_types(history['message']).value_counts()
+
+
+def yearly_bugfix_rate(history: pd.DataFrame) -> pd.Series:
+    """图表6：每年 Bug Fix 占比（%）"""
+    is_fix = classify_commit_types(history['message']) == 'Bug Fix'
+    return is_fix.groupby(history['year']).mean() * 100
+
+
+def issue_merge_activity(history: pd.DataFrame) -> pd.DataFrame:
+    """图表7：月度 Issue 相关提交与 Merge 提交"""
+    from issue_linker import CommitIssueLinker
+
+    linker = CommitIssueLinker(history)
+    has_issue = linker.has_reference().to_numpy()
+    is_merge = history['message'].fillna('').astype(str).str.lower().str.contains('merge').to_numpy()
+    frame = pd.DataFrame({'year_month': history['year_month'].to_numpy(),
+                          'issue': has_issue, 'merge': is_merge})
+    monthly = frame.groupby('year_month')[['issue', 'merge']].sum()
+    monthly.index = monthly.index.to_timestamp()
+    return monthly
+
+
+def stars_over_time(stargazers: pd.DataFrame) -> pd.Series:
+    """图表8：累积 Star 数"""
+    starred = pd.to_datetime(stargazers['Star时间'], errors='coerce', utc=True).dropna()
+    daily = starred.dt.tz_localize(None).dt.normalize().value_counts().sort_index()
+    return daily.cumsum()
+
+
+def release_timeline(releases: pd.DataFrame) -> pd.Series:
+    """图表9：版本发布时间线（发布日期 -> 版本号）"""
+    published = pd.to_datetime(releases['发布日期'], errors='coerce', utc=True).dt.tz_localize(None)
+    timeline = pd.Series(releases['版本号'].astype(str).to_numpy(), index=published.to_numpy())
+    return timeline[timeline.index.notna()].sort_index()
+
+
+def cumulative_authors(history: pd.DataFrame) -> pd.Series:
+    """图表10：累积贡献者数（向量化：只在作者首次出现时计数）"""
+    ordered = history.sort_values('date')
+    first_seen = ~ordered['author'].duplicated()
+    return pd.Series(first_seen.cumsum().to_numpy(), index=ordered['date'].to_numpy())
+
+
+def weekly_heatmap(commits_full: pd.DataFrame) -> pd.DataFrame:
+    """图表11：星期 × 小时 提交数"""
+    dates = commits_full['date'].dropna()
+    pivot = pd.crosstab(dates.dt.day_name(), dates.dt.hour)
+    return pivot.reindex([d for d in DAY_ORDER if d in pivot.index])
+
+
+def yearly_type_distribution(history: pd.DataFrame) -> pd.DataFrame:
+    """图表12：按年份的提交类型分布"""
+    types = classify_commit_types(history['message'])
+    return pd.crosstab(history['year'], types)
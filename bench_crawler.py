@@ -0,0 +1,135 @@
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List
+import os
+
+from cyxcode import MaxDataVSCodeCrawler
+from crawler_metrics import CrawlerMetrics
+from fake_github import FakeGitHubServer, FakeGitHubState, SyntheticData, LIST_ENDPOINTS
+
+
+RESULTS_FILE = 'bench_results/crawler.jsonl'
+
+# 基准名 -> (服务端端点, 调用爬虫的函数)
+BENCHMARKS: Dict[str, tuple] = {
+    'contributors': ('contributors', lambda c: c.get_massive_contributors()),
+    'commits': ('commits', lambda c: c.get_massive_commits(since_date='2000-01-01')),
+    'issues': ('issues', lambda c: c.get_massive_issues_safe(state='open', issue_type='issues', days=3650)),
+    'prs': ('pulls', lambda c: c.get_massive_issues_safe(state='open', issue_type='pulls', days=3650)),
+    'stargazers': ('stargazers', lambda c: c.get_massive_stargazers(days=3650)),
+    'forks': ('forks', lambda c: c.get_massive_forks()),
+    'releases': ('releases', lambda c: c.get_massive_releases()),
+    'branches': ('branches', lambda c: c.get_massive_branches()),
+}
+
+
+def run_benchmark(server: FakeGitHubServer, crawler: MaxDataVSCodeCrawler, name: str,
+                  quiet: bool = True) -> Dict[str, Any]:
+    """运行单个端点基准，返回耗时、吞吐和峰值内存"""
+    endpoint, call = BENCHMARKS[name]
+    server.state.reset_stats()
+    crawler.metrics = CrawlerMetrics()
+
+    sink = io.StringIO() if quiet else None
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+        rows = call(crawler)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    requests_made = server.state.requests.get(endpoint, 0)
+    client = crawler.metrics.summary()
+    return {
+        'endpoint': name,
+        'requests': requests_made,
+        'rows': len(rows),
+        'wall_time_s': round(elapsed, 4),
+        'requests_per_s': round(requests_made / elapsed, 2) if elapsed > 0 else 0.0,
+        'rows_per_s': round(len(rows) / elapsed, 2) if elapsed > 0 else 0.0,
+        'peak_memory_mb': round(peak / 1024 / 1024, 3),
+        'bytes_in': server.state.bytes_out.get(endpoint, 0),
+        'statuses': dict(server.state.statuses),
+        'retries': client['retries'],
+        'rate_limit_wait_s': client['rate_limit_wait_s'],
+        'latency_p95_s': client['endpoints'].get(endpoint, {}).get('latency_p95_s'),
+    }
+
+
+def print_table(results: List[Dict[str, Any]]):
+    print(f"\n{'端点':<14}{'请求':>8}{'行数':>9}{'耗时(s)':>10}{'请求/s':>10}{'行/s':>11}{'峰值MB':>9}")
+    print("-" * 71)
+    for r in results:
+        print(f"{r['endpoint']:<14}{r['requests']:>8}{r['rows']:>9}{r['wall_time_s']:>10.3f}"
+              f"{r['requests_per_s']:>10.1f}{r['rows_per_s']:>11.1f}{r['peak_memory_mb']:>9.2f}")
+    total = sum(r['wall_time_s'] for r in results)
+    print("-" * 71)
+    print(f"{'合计':<14}{sum(r['requests'] for r in results):>8}{sum(r['rows'] for r in results):>9}{total:>10.3f}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='爬虫吞吐基准（离线，使用 fake_github 服务）')
+    parser.add_argument('endpoints', nargs='*', help=f"要测试的端点（默认全部）：{', '.join(BENCHMARKS)}")
+    parser.add_argument('--items', type=int, default=2000, help='每个端点的合成条目数，同时作为爬虫目标数量')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=100000)
+    parser.add_argument('--fixtures', default=None, help='录制页面目录')
+    parser.add_argument('--label', default='', help='本次运行的标签（便于对比不同改动）')
+    parser.add_argument('--output', default=RESULTS_FILE, help='结果追加写入的 JSONL 文件')
+    parser.add_argument('--verbose', action='store_true', help='显示爬虫自身输出')
+    args = parser.parse_args()
+
+    names = args.endpoints or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知端点: {', '.join(unknown)}")
+
+    data = SyntheticData({name: args.items for name in LIST_ENDPOINTS})
+    state = FakeGitHubState(data, args.fixtures, rate_limit=args.rate_limit, reset_seconds=1.0,
+                            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                            error_rate_429=args.error_rate_429)
+
+    print("🏁 爬虫吞吐基准")
+    print("=" * 60)
+
+    results = []
+    with FakeGitHubServer(state) as server:
+        crawler = MaxDataVSCodeCrawler(github_token='bench-token', base_url=server.base_url)
+        crawler.page_delay_scale = 0
+        crawler.rate_limit_min_wait = 0
+        crawler.rate_budget.reserve = 0
+        for key in crawler.config:
+            crawler.config[key] = args.items
+        print(f"🧪 服务地址: {server.base_url}")
+
+        for name in names:
+            result = run_benchmark(server, crawler, name, quiet=not args.verbose)
+            results.append(result)
+            print(f"  ✅ {name}: {result['rows']} 行, {result['wall_time_s']:.3f}s")
+
+    print_table(results)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    run = {
+        'timestamp': datetime.now().isoformat(),
+        'label': args.label,
+        'params': {'items': args.items, 'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms,
+                   'error_rate_429': args.error_rate_429, 'rate_limit': args.rate_limit},
+        'results': results,
+    }
+    with open(args.output, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    print(f"\n📁 结果已追加到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
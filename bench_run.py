@@ -0,0 +1,244 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import random
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+import os
+
+import git
+
+import run
+
+
+RESULTS_FILE = 'bench_results/run_py.jsonl'
+REPOS_DIR = 'bench_repos'
+
+# 合成提交信息模板（覆盖提交类型分类、Issue 引用和模板聚类）
+MESSAGE_TEMPLATES = [
+    "Fix {noun} when {verb} {noun2} (#{issue})",
+    "Fixes #{issue}: {verb} {noun}",
+    "Add {noun} support to {noun2}",
+    "Implement new {noun} API",
+    "Refactor {noun} {noun2}",
+    "Clean up {noun}",
+    "Update docs for {noun}",
+    "Add unit test for {noun}",
+    "Bump {noun} from 1.{n}.0 to 1.{n2}.0",
+    "Update distro",
+    "{verb} {noun} in {noun2}",
+]
+NOUNS = ['editor', 'terminal', 'chat', 'debug', 'explorer', 'search', 'notebook', 'scm', 'tasks',
+         'extensions', 'settings', 'keybindings', 'markdown', 'workbench', 'tree', 'hover']
+VERBS = ['render', 'open', 'close', 'resize', 'update', 'reveal', 'dispose', 'restore']
+
+
+class SyntheticRepoSpec:
+    """合成仓库参数"""
+
+    def __init__(self, commits: int = 10000, files: int = 2000, authors: int = 200,
+                 merge_ratio: float = 0.1, files_per_commit: int = 3, seed: int = 0):
+        self.commits = commits
+        self.files = files
+        self.authors = authors
+        self.merge_ratio = merge_ratio
+        self.files_per_commit = files_per_commit
+        self.seed = seed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+    def key(self) -> str:
+        raw = json.dumps(self.as_dict(), sort_keys=True).encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def _fast_import_stream(spec: SyntheticRepoSpec, out):
+    """
+    生成 git fast-import 指令流
+    主线按时间递增提交；按 merge_ratio 插入 "topic 提交 + 合并提交"
+    """
+    rng = random.Random(spec.seed)
+    # 提交时间分布在最近约 4 年内，落在 run.py 的 5 年窗口中
+    start = int((datetime.now() - timedelta(days=4 * 365)).timestamp())
+    step = max(1, (4 * 365 * 86400) // max(spec.commits, 1))
+
+    def write(text: str):
+        out.write(text.encode('utf-8'))
+
+    def data(payload: str):
+        raw = payload.encode('utf-8')
+        out.write(f"data {len(raw)}\n".encode('utf-8'))
+        out.write(raw)
+        out.write(b"\n")
+
+    def message():
+        template = rng.choice(MESSAGE_TEMPLATES)
+        return template.format(noun=rng.choice(NOUNS), noun2=rng.choice(NOUNS), verb=rng.choice(VERBS),
+                               issue=rng.randint(1000, 300000), n=rng.randint(0, 90), n2=rng.randint(0, 90))
+
+    def author(i: int) -> str:
+        a = rng.randint(0, spec.authors - 1)
+        return f"Author {a} <author{a}@example.com> {start + i * step} +0000"
+
+    def commit(ref: str, mark: int, i: int, parent: int, merge: int = 0, text: str = None):
+        write(f"commit {ref}\nmark :{mark}\n")
+        who = author(i)
+        write(f"author {who}\ncommitter {who}\n")
+        data(text or message())
+        if parent:
+            write(f"from :{parent}\n")
+        if merge:
+            write(f"merge :{merge}\n")
+        for _ in range(spec.files_per_commit):
+            path = f"src/module{rng.randint(0, spec.files // 50)}/file{rng.randint(0, spec.files - 1)}.ts"
+            write(f"M 100644 inline {path}\n")
+            data(f"// {mark} {rng.getrandbits(32)}\n")
+
+    mark = 0
+    main_tip = 0
+    produced = 0
+    while produced < spec.commits:
+        if main_tip and spec.merge_ratio and rng.random() < spec.merge_ratio and produced + 2 <= spec.commits:
+            mark += 1
+            commit('refs/heads/topic', mark, produced, main_tip)
+            topic = mark
+            produced += 1
+            mark += 1
+            commit('refs/heads/main', mark, produced, main_tip, merge=topic,
+                   text=f"Merge pull request #{rng.randint(1000, 300000)} from user/topic-{topic}")
+        else:
+            mark += 1
+            commit('refs/heads/main', mark, produced, main_tip)
+        main_tip = mark
+        produced += 1
+    write("done\n")
+
+
+def generate_repo(spec: SyntheticRepoSpec, root: str = REPOS_DIR) -> str:
+    """用 git fast-import 生成确定性的合成仓库（相同参数复用已生成的仓库）"""
+    path = os.path.abspath(os.path.join(root, f"repo_{spec.commits}_{spec.key()}"))
+    if os.path.exists(os.path.join(path, '.git', 'refs', 'heads', 'main')):
+        return path
+
+    os.makedirs(path, exist_ok=True)
+    subprocess.run(['git', 'init', '-q', '-b', 'main', path], check=True)
+    process = subprocess.Popen(['git', '-C', path, 'fast-import', '--quiet', '--done'], stdin=subprocess.PIPE)
+    _fast_import_stream(spec, process.stdin)
+    process.stdin.close()
+    if process.wait() != 0:
+        raise RuntimeError(f"git fast-import 失败: {path}")
+    subprocess.run(['git', '-C', path, 'checkout', '-q', 'main'], check=True)
+    return path
+
+
+class StageRecorder:
+    """记录每个阶段的耗时与 Python 内存峰值"""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, Any]] = []
+
+    def run(self, name: str, func: Callable[[], Any], quiet: bool = True) -> Any:
+        sink = io.StringIO()
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            result = func()
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.stages.append({'stage': name, 'time_s': round(elapsed, 4),
+                            'peak_memory_mb': round(peak / 1024 / 1024, 3)})
+        print(f"  ✅ {name:<20} {elapsed:8.3f}s  {peak / 1024 / 1024:8.2f} MB")
+        return result
+
+
+def run_stages(repo_path: str, recorder: StageRecorder, workdir: str) -> int:
+    """run.py 提取 + Notebook 聚合，返回提交数"""
+    import analysis
+    from identity import AuthorIdentityResolver
+    from issue_linker import CommitIssueLinker
+    from message_clusters import cluster_messages
+
+    repo = git.Repo(repo_path)
+    since = datetime.now() - timedelta(days=5 * 365)
+
+    commits_data = recorder.run('extract', lambda: run.collect_commits(repo, 'main', since))
+    df = recorder.run('dataframe', lambda: run.build_dataframe(commits_data))
+    csv_path = os.path.join(workdir, 'vscode_commit_history.csv')
+    recorder.run('csv_write', lambda: df.to_csv(csv_path, index=False, encoding='utf-8-sig'))
+
+    history = recorder.run('load_history', lambda: analysis.load_commit_history(csv_path))
+    recorder.run('commit_types', lambda: analysis.commit_type_distribution(history))
+    recorder.run('bugfix_rate', lambda: analysis.yearly_bugfix_rate(history))
+    recorder.run('monthly_commits', lambda: analysis.monthly_commits(history))
+    recorder.run('cumulative_authors', lambda: analysis.cumulative_authors(history))
+    recorder.run('yearly_types', lambda: analysis.yearly_type_distribution(history))
+    recorder.run('issue_linker', lambda: CommitIssueLinker(history))
+    recorder.run('message_clusters', lambda: cluster_messages(history['message']))
+
+    def resolve_authors():
+        resolver = AuthorIdentityResolver()
+        resolver.add_git_commits(history)
+        return resolver.author_ids(resolver.git_row_keys(history))
+
+    recorder.run('identity', resolve_authors)
+    return len(df)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='run.py 与分析阶段的合成仓库基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000], help='提交数（可多个，得到扩展曲线）')
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--authors', type=int, default=200)
+    parser.add_argument('--merge-ratio', type=float, default=0.1)
+    parser.add_argument('--files-per-commit', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repos-dir', default=REPOS_DIR)
+    parser.add_argument('--no-tracemalloc', action='store_true', help='不统计内存（tracemalloc 会拖慢提取阶段）')
+    parser.add_argument('--label', default='')
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    print("🏁 run.py 合成仓库基准")
+    print("=" * 60)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+
+    for size in args.sizes:
+        spec = SyntheticRepoSpec(size, args.files, args.authors, args.merge_ratio, args.files_per_commit, args.seed)
+
+        print(f"\n📦 生成合成仓库: {size:,} 个提交")
+        start = time.perf_counter()
+        repo_path = generate_repo(spec, args.repos_dir)
+        print(f"  {repo_path} ({time.perf_counter() - start:.2f}s)")
+
+        recorder = StageRecorder(trace_memory=not args.no_tracemalloc)
+        rows = run_stages(repo_path, recorder, repo_path)
+
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'label': args.label,
+            'spec': spec.as_dict(),
+            'rows': rows,
+            'total_time_s': round(sum(s['time_s'] for s in recorder.stages), 4),
+            'stages': recorder.stages,
+        }
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f"  📊 {rows:,} 行，合计 {record['total_time_s']:.2f}s")
+
+    print(f"\n📁 结果已追加到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
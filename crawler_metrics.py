@@ -0,0 +1,199 @@
+import bisect
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import os
+
+
+# 延迟直方图的桶上界（秒），与 Prometheus 默认桶相近
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+
+def endpoint_of(url: str) -> str:
+    """
+    URL -> 端点名
+    /repos/{owner}/{repo}/issues -> issues；/repos/{owner}/{repo} -> repository；
+    /repos/{owner}/{repo}/pulls/{number}/reviews -> pulls_reviews；/search/issues -> search_issues；其他取首段路径
+    """
+    parts = [p for p in urlparse(url).path.split('/') if p]
+    if len(parts) >= 3 and parts[0] == 'repos':
+        if len(parts) > 5 and parts[4].isdigit():
+            return f"{parts[3]}_{parts[5]}"
+        return parts[3] if len(parts) > 3 else 'repository'
+    if len(parts) == 2 and parts[0] == 'search':
+        return f"search_{parts[1]}"
+    return parts[0] if parts else 'root'
+
+
+class EndpointStats:
+    """单个端点的累计统计"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.statuses: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes_in = 0
+
+    def observe(self, status: str, latency: float, size: int):
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.latency_sum += latency
+        self.count += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.bytes_in += size
+
+    def quantile(self, q: float) -> Optional[float]:
+        """由直方图估计分位数（取所在桶的上界）"""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.bucket_counts):
+            seen += n
+            if seen >= target:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float('inf')
+        return float('inf')
+
+
+class CrawlerMetrics:
+    """
+    爬虫请求级指标
+    按端点记录延迟直方图、状态码、重试、限流等待和下载字节数，
+    可导出为 JSON 摘要和 Prometheus 文本格式
+    """
+
+    def __init__(self, progress_interval: float = 5.0):
+        self.lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_limit: Optional[int] = None
+        self.started = time.time()
+
+        # 节流的进度输出，替代每个请求一行的打印
+        self.progress_interval = progress_interval
+        self._last_progress = 0.0
+
+    def _stats(self, endpoint: str) -> EndpointStats:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record_request(self, url: str, status, latency: float, size: int = 0,
+                       remaining: Optional[str] = None, limit: Optional[str] = None):
+        with self.lock:
+            self._stats(endpoint_of(url)).observe(str(status), latency, size)
+            if remaining is not None and str(remaining).isdigit():
+                self.rate_limit_remaining = int(remaining)
+            if limit is not None and str(limit).isdigit():
+                self.rate_limit_limit = int(limit)
+        self.progress()
+
+    def record_retry(self, url: str):
+        with self.lock:
+            self._stats(endpoint_of(url)).retries += 1
+
+    def record_rate_limit_wait(self, seconds: float):
+        with self.lock:
+            self.rate_limit_waits += 1
+            self.rate_limit_wait_seconds += seconds
+
+    def total_requests(self) -> int:
+        return sum(s.count for s in self.endpoints.values())
+
+    def progress(self, force: bool = False):
+        """最多每 progress_interval 秒打印一行进度"""
+        now = time.time()
+        if not force and now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        with self.lock:
+            total = self.total_requests()
+            latency = sum(s.latency_sum for s in self.endpoints.values())
+            bytes_in = sum(s.bytes_in for s in self.endpoints.values())
+        elapsed = max(now - self.started, 1e-9)
+        remaining = f"{self.rate_limit_remaining}/{self.rate_limit_limit}" if self.rate_limit_remaining is not None else 'N/A'
+        avg = latency / total if total else 0.0
+        print(f"📊 请求 {total:,} | API剩余 {remaining} | 平均延迟 {avg:.2f}s | "
+              f"{total / elapsed:.1f} 请求/s | {bytes_in / 1024 / 1024:.1f} MB")
+
+    def summary(self) -> Dict:
+        """JSON 摘要"""
+        with self.lock:
+            endpoints = {}
+            for name, s in sorted(self.endpoints.items()):
+                endpoints[name] = {
+                    'requests': s.count,
+                    'statuses': dict(s.statuses),
+                    'retries': s.retries,
+                    'bytes_in': s.bytes_in,
+                    'latency_mean_s': round(s.latency_sum / s.count, 4) if s.count else None,
+                    'latency_p50_s': s.quantile(0.5),
+                    'latency_p95_s': s.quantile(0.95),
+                    'latency_buckets': {str(le): n for le, n in zip(LATENCY_BUCKETS + ['+Inf'], s.bucket_counts)},
+                }
+            return {
+                'elapsed_s': round(time.time() - self.started, 3),
+                'requests': sum(s.count for s in self.endpoints.values()),
+                'retries': sum(s.retries for s in self.endpoints.values()),
+                'bytes_in': sum(s.bytes_in for s in self.endpoints.values()),
+                'rate_limit_waits': self.rate_limit_waits,
+                'rate_limit_wait_s': round(self.rate_limit_wait_seconds, 3),
+                'rate_limit_remaining': self.rate_limit_remaining,
+                'endpoints': endpoints,
+            }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式（可交给 node_exporter textfile collector）"""
+        lines: List[str] = []
+        with self.lock:
+            lines.append('# HELP github_crawler_request_duration_seconds GitHub API request latency.')
+            lines.append('# TYPE github_crawler_request_duration_seconds histogram')
+            for name, s in sorted(self.endpoints.items()):
+                cumulative = 0
+                for le, n in zip(LATENCY_BUCKETS + ['+Inf'], s.bucket_counts):
+                    cumulative += n
+                    lines.append(f'github_crawler_request_duration_seconds_bucket{{endpoint="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'github_crawler_request_duration_seconds_sum{{endpoint="{name}"}} {s.latency_sum:.6f}')
+                lines.append(f'github_crawler_request_duration_seconds_count{{endpoint="{name}"}} {s.count}')
+
+            lines.append('# HELP github_crawler_responses_total Responses by endpoint and status code.')
+            lines.append('# TYPE github_crawler_responses_total counter')
+            for name, s in sorted(self.endpoints.items()):
+                for status, n in sorted(s.statuses.items()):
+                    lines.append(f'github_crawler_responses_total{{endpoint="{name}",status="{status}"}} {n}')
+
+            lines.append('# HELP github_crawler_retries_total Retried requests.')
+            lines.append('# TYPE github_crawler_retries_total counter')
+            for name, s in sorted(self.endpoints.items()):
+                lines.append(f'github_crawler_retries_total{{endpoint="{name}"}} {s.retries}')
+
+            lines.append('# HELP github_crawler_response_bytes_total Response body bytes received.')
+            lines.append('# TYPE github_crawler_response_bytes_total counter')
+            for name, s in sorted(self.endpoints.items()):
+                lines.append(f'github_crawler_response_bytes_total{{endpoint="{name}"}} {s.bytes_in}')
+
+            lines.append('# HELP github_crawler_rate_limit_waits_total Waits caused by rate limiting.')
+            lines.append('# TYPE github_crawler_rate_limit_waits_total counter')
+            lines.append(f'github_crawler_rate_limit_waits_total {self.rate_limit_waits}')
+            lines.append('# HELP github_crawler_rate_limit_wait_seconds_total Time spent waiting for rate limits.')
+            lines.append('# TYPE github_crawler_rate_limit_wait_seconds_total counter')
+            lines.append(f'github_crawler_rate_limit_wait_seconds_total {self.rate_limit_wait_seconds:.3f}')
+            if self.rate_limit_remaining is not None:
+                lines.append('# HELP github_crawler_rate_limit_remaining Last seen X-RateLimit-Remaining.')
+                lines.append('# TYPE github_crawler_rate_limit_remaining gauge')
+                lines.append(f'github_crawler_rate_limit_remaining {self.rate_limit_remaining}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory: str, prefix: str = 'crawler_metrics'):
+        """写出 {prefix}.json 和 {prefix}.prom"""
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f'{prefix}.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        with open(os.path.join(directory, f'{prefix}.prom'), 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
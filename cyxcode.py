@@ -1,12 +1,121 @@
 import requests
 import json
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, Optional, Any
 import pandas as pd
 from datetime import datetime, timedelta
 import csv
 import os
 
+from crawler_metrics import CrawlerMetrics
+from field_schema import (EndpointSchema, Field, count_labels, decode_json, join_labels, list_len, preview,
+                          safe_len, total_downloads, truncate)
+from rate_budget import RateBudget
+from record_store import RecordStore
+from response_archive import ARCHIVE_DIR, ResponseArchive
+from sketches import RepositorySketches
+
+
+# 各端点的字段投影（列名 -> 路径 / 默认值 / 转换）；增删字段只需修改这里
+# 作者、状态等重复值字典编码；序号、获取时间、页码由存储按页派生，不逐行保存
+ENDPOINT_SCHEMAS = {
+    'contributors': EndpointSchema([
+        Field("序号", kind='rownum'),
+        Field("用户名", 'login', '未知', kind='category'),
+        Field("贡献次数", 'contributions', 0, kind='int'),
+        Field("用户ID", 'id', '', convert=str),
+        Field("头像URL", 'avatar_url'),
+        Field("主页", 'html_url'),
+        Field("类型", 'type', 'User', kind='category'),
+        Field("管理员", 'site_admin', False, kind='bool'),
+        Field("获取时间", kind='page_time'),
+        Field("页码", kind='page'),
+    ]),
+    'commits': EndpointSchema([
+        Field("序号", kind='rownum'),
+        Field("SHA", 'sha'),
+        Field("短SHA", 'sha', convert=truncate(8)),
+        Field("提交信息", 'commit.message', convert=truncate(200)),
+        Field("作者", 'commit.author.name', kind='category'),
+        Field("作者邮箱", 'commit.author.email', kind='category'),
+        Field("提交时间", 'commit.author.date'),
+        Field("GitHub用户", 'author.login', kind='category'),
+        Field("URL", 'html_url'),
+        Field("获取时间", kind='page_time'),
+        Field("页码", kind='page'),
+    ]),
+    'issues': EndpointSchema([
+        Field("序号", kind='rownum'),
+        Field("编号", 'number', 0, kind='int'),
+        Field("标题", 'title'),
+        Field("类型", convert=lambda item: "PR" if 'pull_request' in item else "Issue", kind='category'),
+        Field("状态", 'state', kind='category'),
+        Field("创建者", 'user.login', kind='category'),
+        Field("创建时间", 'created_at'),
+        Field("更新时间", 'updated_at'),
+        Field("关闭时间", 'closed_at'),
+        Field("标签数", 'labels', [], convert=count_labels, kind='int'),
+        Field("标签", 'labels', [], convert=join_labels(3)),  # 只取前3个标签
+        Field("评论数", 'comments', 0, kind='int'),
+        Field("正文长度", 'body', convert=safe_len, kind='int'),
+        Field("正文预览", 'body', convert=preview(100)),
+        Field("URL", 'html_url'),
+        Field("获取时间", kind='page_time'),
+        Field("页码", kind='page'),
+    ]),
+    'stargazers': EndpointSchema([
+        Field("序号", kind='rownum'),
+        Field("用户名", 'user?.login', '未知', kind='category'),
+        Field("用户ID", 'user?.id', '', convert=str),
+        Field("头像URL", 'user?.avatar_url'),
+        Field("主页", 'user?.html_url'),
+        Field("类型", 'user?.type', 'User', kind='category'),
+        Field("管理员", 'user?.site_admin', False, kind='bool'),
+        Field("Star时间", 'starred_at'),
+        Field("获取时间", kind='page_time'),
+        Field("页码", kind='page'),
+    ]),
+    'forks': EndpointSchema([
+        Field("序号", kind='rownum'),
+        Field("仓库名", 'full_name'),
+        Field("所有者", 'owner.login', kind='category'),
+        Field("是否私有", 'private', False, kind='bool'),
+        Field("描述", 'description', convert=truncate(150)),
+        Field("Fork时间", 'created_at'),
+        Field("更新时间", 'updated_at'),
+        Field("推送时间", 'pushed_at'),
+        Field("Stars数", 'stargazers_count', 0, kind='int'),
+        Field("语言", 'language', kind='category'),
+        Field("主页", 'html_url'),
+        Field("获取时间", kind='page_time'),
+        Field("页码", kind='page'),
+    ]),
+    'branches': EndpointSchema([
+        Field("序号", kind='rownum'),
+        Field("分支名", 'name'),
+        Field("是否受保护", 'protected', False, kind='bool'),
+        Field("提交SHA", 'commit.sha'),
+        Field("获取时间", kind='page_time'),
+        Field("页码", kind='page'),
+    ]),
+    'releases': EndpointSchema([
+        Field("序号", kind='rownum'),
+        Field("版本号", 'tag_name'),
+        Field("版本名称", 'name'),
+        Field("发布者", 'author.login', kind='category'),
+        Field("发布日期", 'published_at'),
+        Field("预发布", 'prerelease', False, kind='bool'),
+        Field("草稿", 'draft', False, kind='bool'),
+        Field("发布说明长度", 'body', convert=safe_len, kind='int'),
+        Field("发布说明预览", 'body', convert=preview(120)),
+        Field("资产数量", 'assets', [], convert=list_len, kind='int'),
+        Field("总下载量", 'assets', [], convert=total_downloads, kind='int'),
+        Field("URL", 'html_url'),
+        Field("获取时间", kind='page_time'),
+        Field("页码", kind='page'),
+    ]),
+}
+
 
 class MaxDataVSCodeCrawler:
     """
@@ -14,12 +123,14 @@ class MaxDataVSCodeCrawler:
     专门修复NoneType错误
     """
 
-    def __init__(self, github_token: str = None):
+    def __init__(self, github_token: str = None,
+                 base_url: str = "https://api.github.com/repos/microsoft/vscode"):
         """
         初始化爬虫
 
         Args:
             github_token: GitHub Personal Access Token（必须！）
+            base_url: 仓库API地址（基准测试时指向本地 fake_github 服务）
         """
         if not github_token or github_token == "ghp_your_token_here":
             print("⚠️  警告：获取大量数据必须使用GitHub Token！")
@@ -28,7 +139,7 @@ class MaxDataVSCodeCrawler:
             raise ValueError("需要GitHub Token")
 
         self.github_token = github_token
-        self.base_url = "https://api.github.com/repos/microsoft/vscode"
+        self.base_url = base_url
         self.session = requests.Session()
 
         # 设置请求头
@@ -41,6 +152,26 @@ class MaxDataVSCodeCrawler:
         self.session.headers.update(self.headers)
         self.max_per_page = 100  # GitHub每页最大100条
 
+        # 翻页间隔的缩放系数（0 表示不等待，基准测试使用）
+        self.page_delay_scale = 1.0
+        # 触发限流后的最短等待秒数
+        self.rate_limit_min_wait = 10
+
+        # 请求级指标（延迟直方图、状态码、重试、限流等待、下载字节）
+        self.metrics = CrawlerMetrics()
+
+        # 共享配额：并发的补充抓取（审阅/时间线、Fork 网络）与主爬虫共用同一预算
+        self.rate_budget = RateBudget()
+        # 搜索 API 的独立配额（每分钟 30 次，不预留）
+        self.search_budget = RateBudget(reserve=0, resource='search')
+
+        # 近似统计草图（按月去重作者/高频提交者），设为 RepositorySketches() 即开启
+        self.sketches: Optional[RepositorySketches] = None
+
+        # 原始响应归档（完整响应体，可离线回放重建导出）；export 时自动打开，设为 None 关闭
+        self.archive_dir: Optional[str] = ARCHIVE_DIR
+        self.archive: Optional[ResponseArchive] = None
+
         # 配置获取的最大数量（更保守的设置）
         self.config = {
             'contributors': 300,  # 贡献者：300条
@@ -53,33 +184,56 @@ class MaxDataVSCodeCrawler:
             'forks': 100,  # Fork仓库：100条
         }
 
-    def _make_request_safe(self, url: str, params: Dict = None, headers: Dict = None) -> Optional[Any]:
+    def _make_request_safe(self, url: str, params: Dict = None, headers: Dict = None,
+                           budget: Optional[RateBudget] = None) -> Optional[Any]:
         """
         安全的API请求，增加重试机制
+        budget 为该请求所属的配额（默认 core 配额 self.rate_budget，搜索请求传 self.search_budget）
         """
+        budget = budget or self.rate_budget
         max_retries = 3
         for attempt in range(max_retries):
+            if attempt > 0:
+                self.metrics.record_retry(url)
             try:
+                budget.acquire()
+                start = time.perf_counter()
                 response = self.session.get(url, params=params, headers=headers, timeout=30)
+                budget.update(response.headers)
 
-                # 显示API限制
-                remaining = response.headers.get('X-RateLimit-Remaining', 'N/A')
-                limit = response.headers.get('X-RateLimit-Limit', 'N/A')
-                print(f"📊 API剩余: {remaining}/{limit}")
+                # 记录指标（API剩余额度由节流的进度行显示，只显示 core 配额）
+                core = budget is self.rate_budget
+                self.metrics.record_request(
+                    url, response.status_code, time.perf_counter() - start, len(response.content),
+                    response.headers.get('X-RateLimit-Remaining') if core else None,
+                    response.headers.get('X-RateLimit-Limit') if core else None
+                )
 
                 if response.status_code == 200:
-                    return response.json()
+                    if self.archive is not None:
+                        self.archive.append(url, params, response)
+                    return decode_json(response)
                 elif response.status_code == 403:
                     reset_time = response.headers.get('X-RateLimit-Reset')
                     if reset_time:
                         reset_time = datetime.fromtimestamp(int(reset_time))
-                        wait_seconds = max(10, (reset_time - datetime.now()).total_seconds())
+                        wait_seconds = max(self.rate_limit_min_wait, (reset_time - datetime.now()).total_seconds())
                         print(f"⏰ API限制，等待 {wait_seconds:.0f} 秒...")
-                        time.sleep(wait_seconds + 2)
+                        self.metrics.record_rate_limit_wait(wait_seconds)
+                        budget.pause(wait_seconds)
+                        time.sleep(wait_seconds + 2 * self.page_delay_scale)
                         continue
                     else:
                         print("❌ 未知的403错误")
                         return None
+                elif response.status_code == 429:
+                    # 次级限流：按 Retry-After 等待后重试
+                    wait_seconds = float(response.headers.get('Retry-After', 60))
+                    print(f"⏰ 次级限流，等待 {wait_seconds:.0f} 秒...")
+                    self.metrics.record_rate_limit_wait(wait_seconds)
+                    budget.pause(wait_seconds)
+                    time.sleep(wait_seconds)
+                    continue
                 elif response.status_code in [404, 422]:
                     print(f"❌ {response.status_code}: {response.text[:100]}")
                     return None
@@ -97,6 +251,11 @@ class MaxDataVSCodeCrawler:
         print(f"⚠️  请求失败，已重试{max_retries}次")
         return None
 
+    def _pause(self, seconds: float):
+        """翻页之间的礼貌等待"""
+        if self.page_delay_scale > 0:
+            time.sleep(seconds * self.page_delay_scale)
+
     def _safe_len(self, obj) -> int:
         """安全的获取长度，处理None值"""
         if obj is None:
@@ -116,13 +275,14 @@ class MaxDataVSCodeCrawler:
             return default
         return value
 
-    def get_massive_contributors(self) -> List[Dict]:
+    def get_massive_contributors(self) -> RecordStore:
         """
         获取大量贡献者数据
         """
         print(f"🔍 获取贡献者数据（目标: {self.config['contributors']}条）...")
 
-        contributors = []
+        schema = ENDPOINT_SCHEMAS['contributors']
+        contributors = schema.new_store()
         page = 1
 
         while len(contributors) < self.config['contributors']:
@@ -144,28 +304,18 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(contributors)} 条")
                 break
 
+            contributors.begin_page(page)
             for item in data:
                 if not isinstance(item, dict):
                     continue
 
-                contributors.append({
-                    "序号": len(contributors) + 1,
-                    "用户名": self._safe_get(item, 'login', '未知'),
-                    "贡献次数": self._safe_get(item, 'contributions', 0),
-                    "用户ID": self._safe_get(item, 'id', ''),
-                    "头像URL": self._safe_get(item, 'avatar_url', ''),
-                    "主页": self._safe_get(item, 'html_url', ''),
-                    "类型": self._safe_get(item, 'type', 'User'),
-                    "管理员": self._safe_get(item, 'site_admin', False),
-                    "获取时间": datetime.now().isoformat(),
-                    "页码": page
-                })
+                contributors.write(item)
 
             if len(data) < params["per_page"]:
                 print(f"  ✅ 已获取所有数据，共 {len(contributors)} 条")
                 break
 
-            time.sleep(0.8)
+            self._pause(0.8)
             page += 1
 
             if len(contributors) >= self.config['contributors']:
@@ -175,13 +325,15 @@ class MaxDataVSCodeCrawler:
         print(f"✅ 最终获取到 {len(contributors)} 条贡献者数据")
         return contributors
 
-    def get_massive_commits(self, since_date: str = "2023-01-01") -> List[Dict]:
+    def get_massive_commits(self, since_date: str = "2023-01-01") -> RecordStore:
         """
-        获取大量提交记录
+        获取大量提交记录（列式存储，避免每条记录一个 dict）
         """
         print(f"🔍 获取提交记录（目标: {self.config['commits']}条）...")
 
-        commits = []
+        schema = ENDPOINT_SCHEMAS['commits']
+        commits = schema.new_store()
+        time_pos, email_pos = schema.names.index('提交时间'), schema.names.index('作者邮箱')
         page = 1
 
         while len(commits) < self.config['commits']:
@@ -204,32 +356,26 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(commits)} 条")
                 break
 
+            commits.begin_page(page)
             for commit in data:
                 if not isinstance(commit, dict):
                     continue
 
-                commit_info = self._safe_get(commit, 'commit', {})
-                author_info = self._safe_get(commit_info, 'author', {})
-
-                commits.append({
-                    "序号": len(commits) + 1,
-                    "SHA": self._safe_get(commit, 'sha', ''),
-                    "短SHA": self._safe_get(commit, 'sha', '')[:8],
-                    "提交信息": self._safe_get(commit_info, 'message', '')[:200],
-                    "作者": self._safe_get(author_info, 'name', ''),
-                    "作者邮箱": self._safe_get(author_info, 'email', ''),
-                    "提交时间": self._safe_get(author_info, 'date', ''),
-                    "GitHub用户": self._safe_get(self._safe_get(commit, 'author', {}), 'login', ''),
-                    "URL": self._safe_get(commit, 'html_url', ''),
-                    "获取时间": datetime.now().isoformat(),
-                    "页码": page
-                })
+                if self.sketches is None:
+                    commits.write(commit)
+                    continue
+
+                row = schema.extract(commit)
+                commits.append(*row)
+                if row[time_pos]:
+                    committed = datetime.fromisoformat(row[time_pos].replace('Z', '+00:00'))
+                    self.sketches.add_commit(int(committed.timestamp()), row[email_pos])
 
             if len(data) < params["per_page"]:
                 print(f"  ✅ 已获取所有数据，共 {len(commits)} 条")
                 break
 
-            time.sleep(0.8)
+            self._pause(0.8)
             page += 1
 
             if len(commits) >= self.config['commits']:
@@ -239,7 +385,7 @@ class MaxDataVSCodeCrawler:
         print(f"✅ 最终获取到 {len(commits)} 条提交记录")
         return commits
 
-    def get_massive_issues_safe(self, state: str = "all", issue_type: str = "issues", days: int = 30) -> List[Dict]:
+    def get_massive_issues_safe(self, state: str = "all", issue_type: str = "issues", days: int = 30) -> RecordStore:
         """
         修复版：获取近 N 天问题/PR数据（修复NoneType错误）
         """
@@ -250,7 +396,8 @@ class MaxDataVSCodeCrawler:
 
         print(f"🔍 获取{state}{type_name}（近 {days} 天）...")
 
-        items = []
+        schema = ENDPOINT_SCHEMAS['issues']
+        items = schema.new_store()
         page = 1
         endpoint = "/issues" if issue_type == "issues" else "/pulls"
         reached_cutoff = False
@@ -278,6 +425,7 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(items)} 条")
                 break
 
+            items.begin_page(page)
             for item in data:
                 if not isinstance(item, dict):
                     continue
@@ -286,10 +434,6 @@ class MaxDataVSCodeCrawler:
                 if endpoint == "/issues" and 'pull_request' in item:
                     continue
 
-                # 安全获取所有字段
-                body = self._safe_get(item, 'body', '')
-                labels = self._safe_get(item, 'labels', [])
-                user_info = self._safe_get(item, 'user', {})
                 created_at_str = self._safe_get(item, 'created_at', '')
 
                 if created_at_str:
@@ -301,34 +445,7 @@ class MaxDataVSCodeCrawler:
                     except Exception:
                         pass
 
-                # 处理标签
-                label_names = []
-                if isinstance(labels, list):
-                    for label in labels:
-                        if isinstance(label, dict):
-                            name = self._safe_get(label, 'name', '')
-                            if name:
-                                label_names.append(name)
-
-                items.append({
-                    "序号": len(items) + 1,
-                    "编号": self._safe_get(item, 'number', 0),
-                    "标题": self._safe_get(item, 'title', ''),
-                    "类型": "PR" if 'pull_request' in item else "Issue",
-                    "状态": self._safe_get(item, 'state', ''),
-                    "创建者": self._safe_get(user_info, 'login', ''),
-                    "创建时间": created_at_str,
-                    "更新时间": self._safe_get(item, 'updated_at', ''),
-                    "关闭时间": self._safe_get(item, 'closed_at', ''),
-                    "标签数": len(label_names),
-                    "标签": ', '.join(label_names[:3]),  # 只取前3个标签
-                    "评论数": self._safe_get(item, 'comments', 0),
-                    "正文长度": self._safe_len(body),  # 使用安全长度函数
-                    "正文预览": body[:100] + "..." if body else '',
-                    "URL": self._safe_get(item, 'html_url', ''),
-                    "获取时间": datetime.now().isoformat(),
-                    "页码": page
-                })
+                items.write(item)
 
             print(f"  本页获取: {len(data)} 条，累计: {len(items)} 条")
 
@@ -340,19 +457,30 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(items)} 条")
                 break
 
-            time.sleep(1.2)  # Issues API限制较严格
+            self._pause(1.2)  # Issues API限制较严格
             page += 1
 
         print(f"✅ 最终获取到 {len(items)} 条{type_name}数据")
         return items
 
-    def get_massive_stargazers(self, days: int = 30) -> List[Dict]:
+    def get_issues_by_search(self, start: datetime, end: datetime, issue_type: str = "issues",
+                             workers: int = 4) -> RecordStore:
+        """
+        按创建时间区间回填问题/PR（搜索 API，自适应时间切片 + 并行，见 search_backfill.py）
+        适合"2024 年创建的全部 Issue"这类长时间窗口；列与 get_massive_issues_safe 相同
+        """
+        from search_backfill import SearchBackfill
+
+        return SearchBackfill(self, issue_type, workers).run(start, end)
+
+    def get_massive_stargazers(self, days: int = 30) -> RecordStore:
         """
         获取近 N 天的Star用户
         """
         print(f"🔍 获取Star用户（近 {days} 天）...")
 
-        stargazers = []
+        schema = ENDPOINT_SCHEMAS['stargazers']
+        stargazers = schema.new_store()
         page = 1
         cutoff_time = datetime.now() - timedelta(days=days)
         reached_cutoff = False
@@ -382,6 +510,7 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(stargazers)} 条")
                 break
 
+            stargazers.begin_page(page)
             for user in data:
                 if not isinstance(user, dict):
                     continue
@@ -396,20 +525,7 @@ class MaxDataVSCodeCrawler:
                     except Exception:
                         pass
 
-                user_info = self._safe_get(user, 'user', user)
-
-                stargazers.append({
-                    "序号": len(stargazers) + 1,
-                    "用户名": self._safe_get(user_info, 'login', '未知'),
-                    "用户ID": self._safe_get(user_info, 'id', ''),
-                    "头像URL": self._safe_get(user_info, 'avatar_url', ''),
-                    "主页": self._safe_get(user_info, 'html_url', ''),
-                    "类型": self._safe_get(user_info, 'type', 'User'),
-                    "管理员": self._safe_get(user_info, 'site_admin', False),
-                    "Star时间": starred_at_str,
-                    "获取时间": datetime.now().isoformat(),
-                    "页码": page
-                })
+                stargazers.write(user)
 
             if reached_cutoff:
                 print(f"  ✅ 已到达时间范围，停止获取")
@@ -419,19 +535,20 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(stargazers)} 条")
                 break
 
-            time.sleep(1.0)
+            self._pause(1.0)
             page += 1
 
         print(f"✅ 最终获取到 {len(stargazers)} 条Star用户数据")
         return stargazers
 
-    def get_massive_forks(self) -> List[Dict]:
+    def get_massive_forks(self) -> RecordStore:
         """
         获取大量fork信息
         """
         print(f"🔍 获取Fork仓库（目标: {self.config['forks']}条）...")
 
-        forks = []
+        schema = ENDPOINT_SCHEMAS['forks']
+        forks = schema.new_store()
         page = 1
 
         while len(forks) < self.config['forks']:
@@ -453,34 +570,18 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(forks)} 条")
                 break
 
+            forks.begin_page(page)
             for fork in data:
                 if not isinstance(fork, dict):
                     continue
 
-                owner_info = self._safe_get(fork, 'owner', {})
-                description = self._safe_get(fork, 'description', '')
-
-                forks.append({
-                    "序号": len(forks) + 1,
-                    "仓库名": self._safe_get(fork, 'full_name', ''),
-                    "所有者": self._safe_get(owner_info, 'login', ''),
-                    "是否私有": self._safe_get(fork, 'private', False),
-                    "描述": description[:150] if description else '',
-                    "Fork时间": self._safe_get(fork, 'created_at', ''),
-                    "更新时间": self._safe_get(fork, 'updated_at', ''),
-                    "推送时间": self._safe_get(fork, 'pushed_at', ''),
-                    "Stars数": self._safe_get(fork, 'stargazers_count', 0),
-                    "语言": self._safe_get(fork, 'language', ''),
-                    "主页": self._safe_get(fork, 'html_url', ''),
-                    "获取时间": datetime.now().isoformat(),
-                    "页码": page
-                })
+                forks.write(fork)
 
             if len(data) < params["per_page"]:
                 print(f"  ✅ 已获取所有数据，共 {len(forks)} 条")
                 break
 
-            time.sleep(0.8)
+            self._pause(0.8)
             page += 1
 
             if len(forks) >= self.config['forks']:
@@ -490,13 +591,14 @@ class MaxDataVSCodeCrawler:
         print(f"✅ 最终获取到 {len(forks)} 条Fork数据")
         return forks
 
-    def get_massive_branches(self) -> List[Dict]:
+    def get_massive_branches(self) -> RecordStore:
         """
         获取所有分支
         """
         print(f"🔍 获取分支列表（目标: {self.config['branches']}条）...")
 
-        branches = []
+        schema = ENDPOINT_SCHEMAS['branches']
+        branches = schema.new_store()
         page = 1
 
         while len(branches) < self.config['branches']:
@@ -518,26 +620,18 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(branches)} 条")
                 break
 
+            branches.begin_page(page)
             for branch in data:
                 if not isinstance(branch, dict):
                     continue
 
-                commit_info = self._safe_get(branch, 'commit', {})
-
-                branches.append({
-                    "序号": len(branches) + 1,
-                    "分支名": self._safe_get(branch, 'name', ''),
-                    "是否受保护": self._safe_get(branch, 'protected', False),
-                    "提交SHA": self._safe_get(commit_info, 'sha', ''),
-                    "获取时间": datetime.now().isoformat(),
-                    "页码": page
-                })
+                branches.write(branch)
 
             if len(data) < params["per_page"]:
                 print(f"  ✅ 已获取所有数据，共 {len(branches)} 条")
                 break
 
-            time.sleep(0.5)
+            self._pause(0.5)
             page += 1
 
             if len(branches) >= self.config['branches']:
@@ -547,13 +641,14 @@ class MaxDataVSCodeCrawler:
         print(f"✅ 最终获取到 {len(branches)} 条分支数据")
         return branches
 
-    def get_massive_releases(self) -> List[Dict]:
+    def get_massive_releases(self) -> RecordStore:
         """
         获取所有发布版本
         """
         print(f"🔍 获取发布版本（目标: {self.config['releases']}条）...")
 
-        releases = []
+        schema = ENDPOINT_SCHEMAS['releases']
+        releases = schema.new_store()
         page = 1
 
         while len(releases) < self.config['releases']:
@@ -575,43 +670,18 @@ class MaxDataVSCodeCrawler:
                 print(f"  ✅ 已获取所有数据，共 {len(releases)} 条")
                 break
 
+            releases.begin_page(page)
             for release in data:
                 if not isinstance(release, dict):
                     continue
 
-                body = self._safe_get(release, 'body', '')
-                author_info = self._safe_get(release, 'author', {})
-                assets = self._safe_get(release, 'assets', [])
-
-                # 计算总下载量
-                total_downloads = 0
-                if isinstance(assets, list):
-                    for asset in assets:
-                        if isinstance(asset, dict):
-                            total_downloads += self._safe_get(asset, 'download_count', 0)
-
-                releases.append({
-                    "序号": len(releases) + 1,
-                    "版本号": self._safe_get(release, 'tag_name', ''),
-                    "版本名称": self._safe_get(release, 'name', ''),
-                    "发布者": self._safe_get(author_info, 'login', ''),
-                    "发布日期": self._safe_get(release, 'published_at', ''),
-                    "预发布": self._safe_get(release, 'prerelease', False),
-                    "草稿": self._safe_get(release, 'draft', False),
-                    "发布说明长度": self._safe_len(body),
-                    "发布说明预览": body[:120] + "..." if body else '',
-                    "资产数量": len(assets) if isinstance(assets, list) else 0,
-                    "总下载量": total_downloads,
-                    "URL": self._safe_get(release, 'html_url', ''),
-                    "获取时间": datetime.now().isoformat(),
-                    "页码": page
-                })
+                releases.write(release)
 
             if len(data) < params["per_page"]:
                 print(f"  ✅ 已获取所有数据，共 {len(releases)} 条")
                 break
 
-            time.sleep(0.8)
+            self._pause(0.8)
             page += 1
 
             if len(releases) >= self.config['releases']:
@@ -653,6 +723,9 @@ class MaxDataVSCodeCrawler:
         """
         os.makedirs(export_dir, exist_ok=True)
         print(f"📂 数据将导出到: {os.path.abspath(export_dir)}/")
+        if self.archive is None and self.archive_dir:
+            self.archive = ResponseArchive(self.archive_dir)
+            print(f"🗄️  原始响应归档到: {os.path.abspath(self.archive_dir)}/")
 
         total_items = 0
         failed_apis = []
@@ -782,6 +855,12 @@ class MaxDataVSCodeCrawler:
             print("📊 数据获取总结")
             print("=" * 60)
             print(f"✅ 成功获取总数据条数: {total_items:,}")
+            self.metrics.progress(force=True)
+            self.metrics.export(export_dir)
+            if self.sketches is not None:
+                self.sketches.sources.append(self.base_url.rstrip('/').split('/repos/')[-1])
+                self.sketches.save(f"{export_dir}/sketches.json")
+                print(f"✅ 已写出近似统计草图: {export_dir}/sketches.json")
 
             if failed_apis:
                 print(f"⚠️  以下API获取失败: {', '.join(failed_apis)}")
@@ -817,6 +896,15 @@ class MaxDataVSCodeCrawler:
                 print(f"  ⚠️  数据为空: {filename}")
                 return False
 
+            # 列式存储直接写出（列顺序与 DictWriter 的排序字段一致）
+            if isinstance(data, RecordStore):
+                if len(data) == 0:
+                    print(f"  ⚠️  数据列表为空: {filename}")
+                    return False
+                data.write_csv(filename, columns=sorted(data.names))
+                print(f"  ✅ 已导出: {filename} ({len(data):,} 条)")
+                return True
+
             # 如果是字典，转为列表
             if isinstance(data, dict):
                 data = [data]
@@ -0,0 +1,358 @@
+import argparse
+import json
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+import pandas as pd
+import os
+
+from field_schema import decode_json
+from record_store import RecordStore
+
+
+DATA_PATH = 'vscode_massive_data'
+STATE_FILE = 'event_sync_state.json'
+
+# /events 最多保留最近 300 个事件，每页最多 100 个
+EVENTS_PER_PAGE = 100
+EVENTS_MAX_PAGES = 3
+# 没有 X-Poll-Interval 时的默认轮询间隔（秒）
+DEFAULT_POLL_INTERVAL = 60
+
+# 同步目标：导出文件、字段投影、主键列；issues / prs 按更新时间防止旧快照覆盖新数据
+TARGETS = {
+    'commits': {'file': '2_commits.csv', 'schema': 'commits', 'key': 'SHA'},
+    'issues': {'file': '3_issues_open.csv', 'schema': 'issues', 'key': '编号', 'version': '更新时间'},
+    'prs': {'file': '4_prs_open.csv', 'schema': 'issues', 'key': '编号', 'version': '更新时间'},
+    'stargazers': {'file': '5_stargazers.csv', 'schema': 'stargazers', 'key': '用户名'},
+    'forks': {'file': '6_forks.csv', 'schema': 'forks', 'key': '仓库名'},
+    'releases': {'file': '7_releases.csv', 'schema': 'releases', 'key': '版本号'},
+    'branches': {'file': '8_branches.csv', 'schema': 'branches', 'key': '分支名'},
+}
+
+
+def _utcnow() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def upsert_csv(path: str, store: RecordStore, deletes: Set[str], key: str,
+               version: Optional[str] = None) -> Tuple[int, int]:
+    """
+    按主键把 store 中的记录合并进导出 CSV（新记录排在最前，与导出的倒序一致），并删除 deletes 中的主键
+    给定 version 列时，已有记录版本更新的不会被较旧的快照覆盖；返回 (写入条数, 删除条数)
+    """
+    new = store.to_dataframe(categorical=False)
+    new = new.drop_duplicates(subset=key, keep='first')
+    new_keys = new[key].astype(str)
+
+    if os.path.exists(path):
+        old = pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    else:
+        old = pd.DataFrame(columns=sorted(store.names))
+    old_keys = old[key].astype(str)
+
+    if version is not None and len(old):
+        current = dict(zip(old_keys, old[version]))
+        stale = [current.get(k, '') > v for k, v in zip(new_keys, new[version].astype(str))]
+        new = new.loc[[not s for s in stale]]
+        new_keys = new[key].astype(str)
+
+    deleted = int(old_keys.isin(deletes).sum())
+    remove = set(new_keys) | set(deletes)
+    kept = old[~old_keys.isin(remove)]
+    frame = pd.concat([new[list(old.columns)], kept], ignore_index=True)
+    if '序号' in frame.columns:
+        frame['序号'] = range(1, len(frame) + 1)
+
+    # 先写临时文件再替换，长时间运行时中断也不会留下半个 CSV
+    tmp = path + '.tmp'
+    frame.to_csv(tmp, index=False, encoding='utf-8-sig')
+    os.replace(tmp, path)
+    return len(new), deleted
+
+
+class EventSync:
+    """
+    事件流增量同步
+    轮询 /repos/{owner}/{repo}/events：带 If-None-Match 的条件请求，304 不消耗配额；
+    间隔遵循 X-Poll-Interval。新事件按主键 upsert 到已有导出（Star、Fork、推送、Issue/PR、发布、分支）。
+    事件流只保留最近 300 个，翻完仍没遇到上次的检查点说明中间有遗漏，
+    此时从上次同步时间起用列表端点补齐（Issue/PR 用 since 即"更新时间之后"，正适合增量）。
+    """
+
+    def __init__(self, crawler, data_path: str = DATA_PATH):
+        from cyxcode import ENDPOINT_SCHEMAS
+
+        self.crawler = crawler
+        self.data_path = data_path
+        self.schemas = ENDPOINT_SCHEMAS
+        self.state_path = os.path.join(data_path, STATE_FILE)
+        self.state: Dict[str, Any] = {'etag': None, 'last_event_id': None, 'synced_at': None}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state.update(json.load(f))
+        self.default_branch: Optional[str] = None
+        self.stats = {'polls': 0, 'not_modified': 0, 'events': 0, 'ignored': 0, 'gaps': 0,
+                      'upserted': 0, 'deleted': 0, 'failed': 0}
+
+    # ---------- 请求 ----------
+
+    def _get_events_page1(self) -> Tuple[int, Optional[List[Dict]], Dict[str, str]]:
+        """第一页的条件请求；返回 (状态码, 事件, 响应头)"""
+        crawler = self.crawler
+        url = f"{crawler.base_url}/events"
+        headers = {'If-None-Match': self.state['etag']} if self.state['etag'] else None
+        try:
+            crawler.rate_budget.acquire()
+            start = time.perf_counter()
+            response = crawler.session.get(url, params={'per_page': EVENTS_PER_PAGE, 'page': 1},
+                                           headers=headers, timeout=30)
+            crawler.rate_budget.update(response.headers)
+            crawler.metrics.record_request(
+                url, response.status_code, time.perf_counter() - start, len(response.content),
+                response.headers.get('X-RateLimit-Remaining'), response.headers.get('X-RateLimit-Limit')
+            )
+        except Exception as e:
+            print(f"❌ 请求异常: {e}")
+            return 0, None, {}
+
+        if response.status_code == 200:
+            data = decode_json(response)
+            return 200, data if isinstance(data, list) else None, response.headers
+        if response.status_code in (403, 429):
+            wait_seconds = float(response.headers.get('Retry-After', 0) or 0)
+            reset = response.headers.get('X-RateLimit-Reset')
+            if reset and str(reset).isdigit():
+                wait_seconds = max(wait_seconds, int(reset) - time.time())
+            crawler.rate_budget.pause(max(wait_seconds, crawler.rate_limit_min_wait))
+        elif response.status_code != 304:
+            print(f"❌ 错误 {response.status_code}")
+        return response.status_code, None, response.headers
+
+    def _repo_default_branch(self) -> str:
+        if self.default_branch is None:
+            repo = self.crawler._make_request_safe(self.crawler.base_url)
+            self.default_branch = (repo or {}).get('default_branch') or 'main'
+        return self.default_branch
+
+    # ---------- 事件 -> 变更 ----------
+
+    def _apply(self, event: Dict, changes: Dict[str, Dict[str, Optional[Dict]]]) -> bool:
+        """把一个事件折叠进 changes[target][主键] = 条目（None 表示删除）；不关心的事件返回 False"""
+        kind = event.get('type')
+        payload = event.get('payload') or {}
+        created_at = event.get('created_at') or ''
+        actor = event.get('actor') or {}
+
+        if kind == 'WatchEvent':
+            changes['stargazers'][actor.get('login', '')] = {'starred_at': created_at, 'user': actor}
+        elif kind == 'ForkEvent' and isinstance(payload.get('forkee'), dict):
+            forkee = payload['forkee']
+            changes['forks'][forkee.get('full_name', '')] = forkee
+        elif kind == 'PushEvent':
+            # 只同步默认分支；事件里没有提交时间，先用推送时间，列表补齐时会被真实值覆盖
+            if payload.get('ref') != f"refs/heads/{self._repo_default_branch()}":
+                return False
+            repo = (event.get('repo') or {}).get('name', '')
+            for commit in payload.get('commits') or []:
+                sha = commit.get('sha', '')
+                author = dict(commit.get('author') or {}, date=created_at)
+                changes['commits'][sha] = {
+                    'sha': sha,
+                    'commit': {'message': commit.get('message', ''), 'author': author},
+                    'html_url': f"https://github.com/{repo}/commit/{sha}",
+                }
+        elif kind in ('IssuesEvent', 'PullRequestEvent', 'IssueCommentEvent'):
+            item = payload.get('pull_request') if kind == 'PullRequestEvent' else payload.get('issue')
+            if not isinstance(item, dict):
+                return False
+            target = 'prs' if kind == 'PullRequestEvent' or 'pull_request' in item else 'issues'
+            # 导出只包含打开的条目：关闭即删除
+            changes[target][str(item.get('number'))] = item if item.get('state') == 'open' else None
+        elif kind == 'ReleaseEvent' and isinstance(payload.get('release'), dict):
+            release = payload['release']
+            deleted = payload.get('action') == 'deleted' or release.get('draft')
+            changes['releases'][release.get('tag_name', '')] = None if deleted else release
+        elif kind in ('CreateEvent', 'DeleteEvent') and payload.get('ref_type') == 'branch':
+            ref = payload.get('ref', '')
+            changes['branches'][ref] = ({'name': ref, 'protected': False, 'commit': {'sha': ''}}
+                                        if kind == 'CreateEvent' else None)
+        else:
+            return False
+        return True
+
+    def _write(self, target: str, store: RecordStore, deletes: Set[str]):
+        spec = TARGETS[target]
+        path = os.path.join(self.data_path, spec['file'])
+        upserted, deleted = upsert_csv(path, store, deletes, spec['key'], spec.get('version'))
+        self.stats['upserted'] += upserted
+        self.stats['deleted'] += deleted
+        if upserted or deleted:
+            print(f"  ✅ {spec['file']}: 写入 {upserted} 条，删除 {deleted} 条")
+
+    def _write_changes(self, changes: Dict[str, Dict[str, Optional[Dict]]]):
+        fetched_at = datetime.now().isoformat()
+        for target, items in changes.items():
+            if not items:
+                continue
+            # 页码 0 表示来自事件流（而不是列表端点的某一页）
+            store = self.schemas[TARGETS[target]['schema']].new_store()
+            store.begin_page(0, fetched_at)
+            for item in reversed(list(items.values())):
+                if item is not None:
+                    store.write(item)
+            self._write(target, store, {k for k, v in items.items() if v is None})
+
+    # ---------- 轮询 ----------
+
+    def poll(self) -> float:
+        """轮询一次，返回下次轮询前应等待的秒数"""
+        self.stats['polls'] += 1
+        status, page1, headers = self._get_events_page1()
+        interval = float(headers.get('X-Poll-Interval') or DEFAULT_POLL_INTERVAL)
+        if status == 304:
+            self.stats['not_modified'] += 1
+            return interval
+        if status != 200 or page1 is None:
+            self.stats['failed'] += 1
+            return interval
+
+        last_id = int(self.state['last_event_id']) if self.state['last_event_id'] else None
+        events: List[Dict] = []
+        # 没有检查点时翻完事件流保留的全部页；有检查点时翻到检查点为止
+        reached = False
+        page, data = 1, page1
+        while True:
+            for event in data:
+                if last_id is not None and int(event.get('id', 0)) <= last_id:
+                    reached = True
+                    break
+                events.append(event)
+            if reached or len(data) < EVENTS_PER_PAGE or page >= EVENTS_MAX_PAGES:
+                break
+            page += 1
+            data = self.crawler._make_request_safe(f"{self.crawler.base_url}/events",
+                                                   {'per_page': EVENTS_PER_PAGE, 'page': page})
+            if not isinstance(data, list):
+                break
+
+        if events:
+            changes: Dict[str, Dict[str, Optional[Dict]]] = {target: {} for target in TARGETS}
+            # 从旧到新应用，同一主键保留最后一次变更
+            for event in reversed(events):
+                if self._apply(event, changes):
+                    self.stats['events'] += 1
+                else:
+                    self.stats['ignored'] += 1
+            print(f"🔁 {len(events)} 个新事件（{_utcnow()}）")
+            self._write_changes(changes)
+
+        if last_id is not None and not reached:
+            self.stats['gaps'] += 1
+            print(f"⚠️  事件流有遗漏（超过 {EVENTS_PER_PAGE * EVENTS_MAX_PAGES} 个事件未同步），用列表端点补齐")
+            self.catch_up(self.state['synced_at'])
+
+        if page1:
+            self.state['last_event_id'] = page1[0].get('id')
+        self.state['etag'] = headers.get('ETag')
+        self.state['synced_at'] = _utcnow()
+        self._save_state()
+        return interval
+
+    def catch_up(self, since: Optional[str]):
+        """从检查点时间起用列表端点补齐各导出"""
+        crawler = self.crawler
+        since = since or _utcnow()
+        print(f"📥 列表补齐（since {since}）")
+
+        # Issue + PR：/issues 的 since 为"更新时间之后"，包含 PR
+        stores = {target: self.schemas['issues'].new_store() for target in ('issues', 'prs')}
+        deletes: Dict[str, Set[str]] = {'issues': set(), 'prs': set()}
+        page = 1
+        while True:
+            params = {'state': 'all', 'since': since, 'sort': 'updated', 'direction': 'desc',
+                      'per_page': crawler.max_per_page, 'page': page}
+            data = crawler._make_request_safe(f"{crawler.base_url}/issues", params)
+            if not isinstance(data, list) or not data:
+                break
+            for target in stores:
+                stores[target].begin_page(page)
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                target = 'prs' if 'pull_request' in item else 'issues'
+                if item.get('state') == 'open':
+                    stores[target].write(item)
+                else:
+                    deletes[target].add(str(item.get('number')))
+            if len(data) < crawler.max_per_page:
+                break
+            page += 1
+        for target, store in stores.items():
+            self._write(target, store, deletes[target])
+
+        days = max(1, math.ceil((datetime.now(timezone.utc) -
+                                 datetime.fromisoformat(since.replace('Z', '+00:00'))).total_seconds() / 86400))
+        self._write('commits', crawler.get_massive_commits(since_date=since), set())
+        self._write('stargazers', crawler.get_massive_stargazers(days=days), set())
+        self._write('forks', crawler.get_massive_forks(), set())
+        self._write('releases', crawler.get_massive_releases(), set())
+        self._write('branches', crawler.get_massive_branches(), set())
+
+    def _save_state(self):
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def run(self, max_polls: Optional[int] = None, min_interval: float = 0.0):
+        """持续轮询（Ctrl+C 停止）"""
+        try:
+            while max_polls is None or self.stats['polls'] < max_polls:
+                interval = self.poll()
+                if max_polls is not None and self.stats['polls'] >= max_polls:
+                    break
+                time.sleep(max(interval, min_interval))
+        except KeyboardInterrupt:
+            print("\n已停止")
+
+
+def main():
+    """主函数"""
+    from cyxcode import MaxDataVSCodeCrawler
+
+    parser = argparse.ArgumentParser(description='事件流增量同步（ETag + X-Poll-Interval）')
+    parser.add_argument('--data', default=DATA_PATH, help='要保持更新的导出目录')
+    parser.add_argument('--once', action='store_true', help='只轮询一次')
+    parser.add_argument('--max-polls', type=int, default=None, help='最多轮询次数')
+    parser.add_argument('--min-interval', type=float, default=0.0, help='最短轮询间隔（秒），不低于 X-Poll-Interval')
+    parser.add_argument('--catch-up-since', default=None, help='先用列表端点补齐该时间（ISO）之后的变更')
+    parser.add_argument('--base-url', default="https://api.github.com/repos/microsoft/vscode")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data):
+        print(f"❌ 导出目录不存在：{args.data}（请先运行 cyxcode.py 完整导出一次）")
+        return
+
+    crawler = MaxDataVSCodeCrawler(github_token=os.environ.get('GITHUB_TOKEN', ''), base_url=args.base_url)
+    sync = EventSync(crawler, args.data)
+    if sync.state['last_event_id'] is None:
+        print("📌 首次同步：以现有导出为基线，应用事件流中的全部事件")
+    if args.catch_up_since:
+        sync.catch_up(args.catch_up_since)
+
+    sync.run(max_polls=1 if args.once else args.max_polls, min_interval=args.min_interval)
+
+    print("\n" + "=" * 60)
+    print("📊 同步总结")
+    print("=" * 60)
+    stats = sync.stats
+    print(f"轮询 {stats['polls']} 次（304 未变化 {stats['not_modified']} 次，失败 {stats['failed']} 次）| "
+          f"事件 {stats['events']} 个（忽略 {stats['ignored']} 个）| 写入 {stats['upserted']} 条 | "
+          f"删除 {stats['deleted']} 条 | 补齐 {stats['gaps']} 次")
+    crawler.metrics.progress(force=True)
+
+
+if __name__ == "__main__":
+    main()
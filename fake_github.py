@@ -0,0 +1,641 @@
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+import os
+
+
+# 爬虫访问的全部列表端点
+LIST_ENDPOINTS = ['contributors', 'commits', 'issues', 'pulls', 'stargazers', 'forks', 'releases', 'branches']
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class SyntheticData:
+    """
+    确定性的合成数据：各端点返回与真实 API 字段一致的条目
+    时间按倒序排列，最新的条目接近当前时间，便于覆盖爬虫的时间截止逻辑
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, int]] = None, seed: int = 0, owner: str = 'microsoft',
+                 repo: str = 'vscode'):
+        self.sizes = {name: 1000 for name in LIST_ENDPOINTS}
+        self.sizes.update(sizes or {})
+        self.seed = seed
+        self.owner = owner
+        self.repo = repo
+        self.now = datetime.now(timezone.utc)
+        # 已生成的 Fork：full_name -> 条目（列出下一层 Fork 时查找）
+        self.fork_index: Dict[str, Dict[str, Any]] = {}
+
+    def _user(self, i: int) -> Dict[str, Any]:
+        login = f"user{i % 997}"
+        return {
+            'login': login,
+            'id': 100000 + i % 997,
+            'avatar_url': f"https://avatars.example.com/u/{100000 + i % 997}",
+            'html_url': f"https://github.com/{login}",
+            'type': 'User',
+            'site_admin': False,
+        }
+
+    def item(self, endpoint: str, i: int) -> Dict[str, Any]:
+        rng = random.Random(f"{self.seed}:{endpoint}:{i}")
+        # 每条间隔约 10 分钟，倒序
+        when = self.now - timedelta(minutes=10 * i + rng.randint(0, 9))
+        full = f"{self.owner}/{self.repo}"
+
+        if endpoint == 'contributors':
+            user = self._user(i)
+            user['contributions'] = max(1, 20000 // (i + 1))
+            return user
+        if endpoint == 'commits':
+            sha = f"{rng.getrandbits(160):040x}"
+            return {
+                'sha': sha,
+                'commit': {
+                    'message': f"Fix issue #{200000 + i} in module {rng.randint(1, 50)}",
+                    'author': {'name': f"Author {i % 997}", 'email': f"author{i % 997}@example.com",
+                               'date': _iso(when)},
+                },
+                'author': self._user(i),
+                'html_url': f"https://github.com/{full}/commit/{sha}",
+            }
+        if endpoint in ('issues', 'pulls'):
+            number = 300000 - i
+            item = {
+                'number': number,
+                'title': f"Synthetic {endpoint[:-1]} {number}",
+                'state': 'open',
+                'user': self._user(i),
+                'created_at': _iso(when),
+                'updated_at': _iso(when + timedelta(minutes=5)),
+                'closed_at': None,
+                'labels': [{'name': f"label-{k}"} for k in range(rng.randint(0, 4))],
+                'comments': rng.randint(0, 20),
+                'body': 'x' * rng.randint(0, 800),
+                'html_url': f"https://github.com/{full}/{endpoint}/{number}",
+            }
+            # /issues 端点混入 PR，覆盖爬虫的过滤逻辑
+            if endpoint == 'pulls' or i % 4 == 0:
+                item['pull_request'] = {'url': f"https://api.github.com/repos/{full}/pulls/{number}"}
+            return item
+        if endpoint == 'stargazers':
+            return {'starred_at': _iso(when), 'user': self._user(i)}
+        if endpoint == 'forks':
+            owner = self._user(i)
+            fork = {
+                'id': 500000 + i,
+                'full_name': f"{owner['login']}/{self.repo}",
+                'owner': owner,
+                'private': False,
+                'description': 'Visual Studio Code',
+                'created_at': _iso(when),
+                'updated_at': _iso(when),
+                'pushed_at': _iso(when - timedelta(minutes=rng.randint(-60, 60))),
+                'stargazers_count': rng.randint(0, 5),
+                'forks_count': self._fork_count(500000 + i),
+                'default_branch': 'main',
+                'language': 'TypeScript',
+                'html_url': f"https://github.com/{owner['login']}/{self.repo}",
+            }
+            self.fork_index[fork['full_name']] = fork
+            return fork
+        if endpoint == 'releases':
+            return {
+                'tag_name': f"1.{200 - i}.0",
+                'name': f"Release 1.{200 - i}",
+                'author': self._user(i),
+                'published_at': _iso(when),
+                'prerelease': False,
+                'draft': False,
+                'body': 'Release notes ' * 20,
+                'assets': [{'download_count': rng.randint(0, 1000)} for _ in range(rng.randint(0, 3))],
+                'html_url': f"https://github.com/{full}/releases/tag/1.{200 - i}.0",
+            }
+        if endpoint == 'branches':
+            return {'name': f"branch-{i}", 'protected': i == 0, 'commit': {'sha': f"{rng.getrandbits(160):040x}"}}
+        raise KeyError(endpoint)
+
+    def _fork_count(self, fork_id: int) -> int:
+        """Fork 的下一层 Fork 数：约四分之一有 1~4 个，编号超过 1e8（第 4 层）后不再分叉"""
+        rng = random.Random(f"{self.seed}:fork_count:{fork_id}")
+        if fork_id >= 10 ** 8 or rng.random() >= 0.25:
+            return 0
+        return rng.randint(1, 4)
+
+    def forks_of(self, full_name: str) -> List[Dict[str, Any]]:
+        """某个 Fork 的下一层 Fork（编号 = 上游编号 * 10 + k），约 40% 在创建后有推送"""
+        parent = self.fork_index.get(full_name)
+        if parent is None:
+            return []
+        parent_created = datetime.strptime(parent['created_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+        forks = []
+        for k in range(parent['forks_count']):
+            fork_id = parent['id'] * 10 + k + 1
+            rng = random.Random(f"{self.seed}:fork:{fork_id}")
+            owner = self._user(fork_id)
+            created = min(parent_created + timedelta(hours=rng.randint(1, 2000)), self.now)
+            pushed = created + timedelta(minutes=rng.randint(1, 5000)) if rng.random() < 0.4 else created - timedelta(minutes=1)
+            fork = {
+                'id': fork_id,
+                'full_name': f"{owner['login']}/{self.repo}-{fork_id}",
+                'owner': owner,
+                'private': False,
+                'description': 'Visual Studio Code',
+                'created_at': _iso(created),
+                'updated_at': _iso(created),
+                'pushed_at': _iso(pushed),
+                'stargazers_count': rng.randint(0, 2),
+                'forks_count': self._fork_count(fork_id),
+                'default_branch': 'main',
+                'language': 'TypeScript',
+                'html_url': f"https://github.com/{owner['login']}/{self.repo}-{fork_id}",
+            }
+            self.fork_index[fork['full_name']] = fork
+            forks.append(fork)
+        return forks
+
+    def compare(self, basehead: str) -> Dict[str, Any]:
+        """/compare/{base}...{head} 的摘要字段（领先/落后提交数由 head 确定）"""
+        rng = random.Random(f"{self.seed}:compare:{basehead}")
+        ahead, behind = rng.choice([0, 0, rng.randint(1, 50)]), rng.randint(0, 3000)
+        status = 'identical' if not ahead and not behind else 'ahead' if not behind else 'behind' if not ahead else 'diverged'
+        commits = [{'sha': f"{rng.getrandbits(160):040x}"} for _ in range(min(ahead, 1))]
+        return {'status': status, 'ahead_by': ahead, 'behind_by': behind, 'total_commits': ahead,
+                'commits': commits, 'files': []}
+
+    def sub_items(self, kind: str, number: int) -> List[Dict[str, Any]]:
+        """
+        单个 Issue/PR 的子资源：reviews、comments（审阅评论）、timeline
+        数量和时间由编号确定，时间都晚于该条目的创建时间
+        """
+        rng = random.Random(f"{self.seed}:{kind}:{number}")
+        i = 300000 - number
+        created = self.now - timedelta(minutes=10 * i)
+        states = ['APPROVED', 'CHANGES_REQUESTED', 'COMMENTED']
+
+        if kind == 'reviews':
+            return [{
+                'id': number * 100 + k,
+                'user': self._user(rng.randint(0, 50)),
+                'state': rng.choice(states),
+                'submitted_at': _iso(created + timedelta(minutes=rng.randint(5, 3000))),
+                'commit_id': f"{rng.getrandbits(160):040x}",
+                'body': 'LGTM' if k % 2 else '',
+            } for k in range(rng.randint(0, 5))]
+        if kind == 'comments':
+            return [{
+                'id': number * 1000 + k,
+                'pull_request_review_id': number * 100 + rng.randint(0, 4),
+                'user': self._user(rng.randint(0, 50)),
+                'path': f"src/vs/module{rng.randint(0, 20)}/file{rng.randint(0, 200)}.ts",
+                'created_at': _iso(created + timedelta(minutes=rng.randint(5, 3000))),
+                'in_reply_to_id': number * 1000 + k - 1 if k and rng.random() < 0.3 else None,
+                'body': 'nit',
+            } for k in range(rng.randint(0, 8))]
+        if kind == 'timeline':
+            events = []
+            when = created
+            for k in range(rng.randint(1, 12)):
+                when += timedelta(minutes=rng.randint(1, 600))
+                event = rng.choice(['labeled', 'assigned', 'commented', 'review_requested', 'closed',
+                                    'reopened', 'cross-referenced', 'reviewed'])
+                actor = self._user(rng.randint(0, 50))
+                item = {'event': event, 'created_at': _iso(when)}
+                if event in ('commented', 'reviewed'):
+                    item['user'] = actor
+                    if event == 'reviewed':
+                        item['submitted_at'] = item.pop('created_at')
+                        item['state'] = rng.choice(states).lower()
+                else:
+                    item['actor'] = actor
+                if event == 'labeled':
+                    item['label'] = {'name': f"label-{rng.randint(0, 4)}"}
+                if event == 'assigned':
+                    item['assignee'] = self._user(rng.randint(0, 50))
+                if event == 'review_requested':
+                    item['requested_reviewer'] = self._user(rng.randint(0, 50))
+                events.append(item)
+            return events
+        raise KeyError(kind)
+
+    def search_issues(self, is_pr: Optional[bool], created_from: datetime, created_to: datetime) -> List[Dict[str, Any]]:
+        """
+        /issues 条目中创建时间落在 [created_from, created_to] 内的全部结果（按创建时间倒序）
+        第 i 条的创建时间在 now - 10i - 9 ~ now - 10i 分钟之间，只需生成对应下标范围
+        """
+        first = max(0, int((self.now - created_to).total_seconds() // 600) - 1)
+        last = min(self.sizes['issues'], int((self.now - created_from).total_seconds() // 600) + 2)
+        matches = []
+        for i in range(first, last):
+            item = self.item('issues', i)
+            if is_pr is not None and ('pull_request' in item) != is_pr:
+                continue
+            created = datetime.strptime(item['created_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+            if created_from <= created <= created_to:
+                matches.append(item)
+        matches.sort(key=lambda item: (item['created_at'], item['number']), reverse=True)
+        return matches
+
+    def event(self, seq: int, when: datetime) -> Dict[str, Any]:
+        """
+        第 seq 个仓库事件（/events），类型轮换覆盖 Star、Fork、推送、Issue/PR 变更、发布和分支
+        新建的 Issue/PR 编号从 300001 起递增，edited/closed 作用于已有条目
+        """
+        rng = random.Random(f"{self.seed}:event:{seq}")
+        full = f"{self.owner}/{self.repo}"
+        actor = self._user(5000 + seq)
+        kinds = ['WatchEvent', 'PushEvent', 'IssuesEvent', 'PullRequestEvent', 'ForkEvent', 'IssuesEvent',
+                 'PushEvent', 'WatchEvent', 'PullRequestEvent', 'ReleaseEvent', 'CreateEvent', 'DeleteEvent']
+        kind = kinds[seq % len(kinds)]
+        payload: Dict[str, Any] = {}
+        if kind == 'WatchEvent':
+            payload = {'action': 'started'}
+        elif kind == 'ForkEvent':
+            payload = {'forkee': {
+                'id': 900000 + seq, 'full_name': f"{actor['login']}/{self.repo}", 'owner': actor,
+                'private': False, 'description': 'Visual Studio Code', 'created_at': _iso(when),
+                'updated_at': _iso(when), 'pushed_at': _iso(when), 'stargazers_count': 0,
+                'language': None, 'html_url': f"https://github.com/{actor['login']}/{self.repo}",
+            }}
+        elif kind == 'PushEvent':
+            commits = []
+            for k in range(rng.randint(1, 3)):
+                sha = f"{rng.getrandbits(160):040x}"
+                commits.append({'sha': sha, 'message': f"Sync change {seq}.{k}", 'distinct': True,
+                                'author': {'name': f"Author {seq % 997}", 'email': f"author{seq % 997}@example.com"}})
+            payload = {'ref': 'refs/heads/main', 'head': commits[-1]['sha'], 'size': len(commits), 'commits': commits}
+        elif kind in ('IssuesEvent', 'PullRequestEvent'):
+            endpoint = 'issues' if kind == 'IssuesEvent' else 'pulls'
+            action = ['opened', 'edited', 'closed'][rng.randint(0, 2)]
+            if action == 'opened':
+                item = self.item(endpoint, 0)
+                item.pop('pull_request', None)
+                item.update({'number': 300001 + seq, 'title': f"Synced {endpoint[:-1]} {300001 + seq}",
+                             'created_at': _iso(when), 'html_url': f"https://github.com/{full}/{endpoint}/{300001 + seq}"})
+            else:
+                item = self.item(endpoint, rng.randint(0, 20))
+                item.pop('pull_request', None)
+                item['title'] += ' (edited)'
+            if kind == 'PullRequestEvent':
+                item['pull_request'] = {'url': f"https://api.github.com/repos/{full}/pulls/{item['number']}"}
+            item['updated_at'] = _iso(when)
+            if action == 'closed':
+                item['state'] = 'closed'
+                item['closed_at'] = _iso(when)
+            payload = {'action': action, ('issue' if kind == 'IssuesEvent' else 'pull_request'): item}
+        elif kind == 'ReleaseEvent':
+            payload = {'action': 'published', 'release': {
+                'tag_name': f"2.{seq}.0", 'name': f"Release 2.{seq}", 'author': actor, 'published_at': _iso(when),
+                'prerelease': False, 'draft': False, 'body': 'Synced release', 'assets': [],
+                'html_url': f"https://github.com/{full}/releases/tag/2.{seq}.0",
+            }}
+        else:
+            # CreateEvent 新建分支，DeleteEvent 删除前一个 CreateEvent 建的分支
+            ref = f"sync-{seq if kind == 'CreateEvent' else seq - 1}"
+            payload = {'ref': ref, 'ref_type': 'branch'}
+        return {
+            'id': str(40000000000 + seq),
+            'type': kind,
+            'actor': actor,
+            'repo': {'name': full},
+            'payload': payload,
+            'public': True,
+            'created_at': _iso(when),
+        }
+
+    def page(self, endpoint: str, page: int, per_page: int) -> List[Dict[str, Any]]:
+        start = (page - 1) * per_page
+        end = min(start + per_page, self.sizes[endpoint])
+        return [self.item(endpoint, i) for i in range(start, end)]
+
+    def repository(self) -> Dict[str, Any]:
+        return {
+            'full_name': f"{self.owner}/{self.repo}",
+            'stargazers_count': self.sizes['stargazers'],
+            'forks_count': self.sizes['forks'],
+            'watchers_count': self.sizes['stargazers'],
+            'open_issues_count': self.sizes['issues'],
+            'size': 1000000,
+            'created_at': '2015-09-03T20:23:38Z',
+            'updated_at': _iso(self.now),
+            'pushed_at': _iso(self.now),
+            'default_branch': 'main',
+            'language': 'TypeScript',
+            'license': {'name': 'MIT License'},
+        }
+
+
+class FakeGitHubState:
+    """服务端共享状态：限流配额、故障注入参数和请求统计"""
+
+    def __init__(self, data: SyntheticData, fixtures_dir: Optional[str] = None, rate_limit: int = 5000,
+                 reset_seconds: float = 2.0, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate_429: float = 0.0, retry_after: float = 0.0, seed: int = 0,
+                 search_rate_limit: int = 30, poll_interval: int = 60):
+        self.data = data
+        self.fixtures_dir = fixtures_dir
+        self.rate_limit = rate_limit
+        self.reset_seconds = reset_seconds
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate_429 = error_rate_429
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.remaining = rate_limit
+        self.reset_at = time.time() + reset_seconds
+        # 搜索 API 使用独立的配额（真实 API 为每分钟 30 次）
+        self.search_rate_limit = search_rate_limit
+        self.search_remaining = search_rate_limit
+        self.search_reset_at = self.reset_at
+        self.requests: Dict[str, int] = {}
+        self.statuses: Dict[int, int] = {}
+        self.bytes_out: Dict[str, int] = {}
+
+        # /events 事件流（最新在前，最多保留 300 条，与真实 API 一致）
+        self.poll_interval = poll_interval
+        self.events: List[Dict[str, Any]] = []
+        self.event_seq = 0
+
+    def add_events(self, n: int):
+        """追加 n 个新事件"""
+        with self.lock:
+            for _ in range(n):
+                self.event_seq += 1
+                self.events.insert(0, self.data.event(self.event_seq, datetime.now(timezone.utc)))
+            del self.events[300:]
+
+    def events_etag(self) -> str:
+        with self.lock:
+            return f'"{self.events[0]["id"] if self.events else "empty"}"'
+
+    def take_quota(self, resource: str = 'core') -> Optional[float]:
+        """扣减一次配额（core 或 search）；配额耗尽时返回重置时间戳"""
+        with self.lock:
+            now = time.time()
+            if resource == 'search':
+                if now >= self.search_reset_at:
+                    self.search_remaining = self.search_rate_limit
+                    self.search_reset_at = now + self.reset_seconds
+                if self.search_remaining <= 0:
+                    return self.search_reset_at
+                self.search_remaining -= 1
+                return None
+            if now >= self.reset_at:
+                self.remaining = self.rate_limit
+                self.reset_at = now + self.reset_seconds
+            if self.remaining <= 0:
+                return self.reset_at
+            self.remaining -= 1
+            return None
+
+    def record(self, endpoint: str, status: int, size: int):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_out[endpoint] = self.bytes_out.get(endpoint, 0) + size
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests.clear()
+            self.statuses.clear()
+            self.bytes_out.clear()
+
+    def fixture(self, endpoint: str, page: int) -> Optional[List[Any]]:
+        """录制的页面：{fixtures_dir}/{endpoint}/page_{n}.json"""
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, endpoint, f"page_{page}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """模拟 GitHub REST API 的请求处理器"""
+
+    state: FakeGitHubState = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Any, endpoint: str, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode('utf-8')
+        state = self.state
+        # 先记录再响应：客户端收到响应后立即读取统计时，本次请求已计入
+        state.record(endpoint, status, len(payload))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        if endpoint == 'search_issues':
+            self.send_header('X-RateLimit-Limit', str(state.search_rate_limit))
+            self.send_header('X-RateLimit-Remaining', str(max(state.search_remaining, 0)))
+            self.send_header('X-RateLimit-Reset', str(int(state.search_reset_at) + 1))
+            self.send_header('X-RateLimit-Resource', 'search')
+        else:
+            self.send_header('X-RateLimit-Limit', str(state.rate_limit))
+            self.send_header('X-RateLimit-Remaining', str(max(state.remaining, 0)))
+            self.send_header('X-RateLimit-Reset', str(int(state.reset_at) + 1))
+            self.send_header('X-RateLimit-Resource', 'core')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _link_header(self, path: str, query: Dict[str, List[str]], page: int, last: int) -> str:
+        host = self.headers.get('Host', 'localhost')
+        links = []
+
+        def url(p: int) -> str:
+            params = {k: v[0] for k, v in query.items()}
+            params['page'] = str(p)
+            return f"http://{host}{path}?" + '&'.join(f"{k}={v}" for k, v in params.items())
+
+        if page < last:
+            links.append(f'<{url(page + 1)}>; rel="next"')
+            links.append(f'<{url(last)}>; rel="last"')
+        if page > 1:
+            links.append(f'<{url(1)}>; rel="first"')
+            links.append(f'<{url(page - 1)}>; rel="prev"')
+        return ', '.join(links)
+
+    def do_GET(self):
+        state = self.state
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        parts = [p for p in parsed.path.split('/') if p]
+        endpoint = parts[3] if len(parts) >= 4 else ('repository' if len(parts) == 3 else 'unknown')
+        if parts == ['search', 'issues']:
+            endpoint = 'search_issues'
+
+        if state.latency_ms or state.jitter_ms:
+            time.sleep((state.latency_ms + state.rng.uniform(0, state.jitter_ms)) / 1000)
+
+        # 条件请求命中（304）不消耗配额
+        if endpoint == 'events' and len(parts) == 4 and self.headers.get('If-None-Match') == state.events_etag():
+            state.record(endpoint, 304, 0)
+            self.send_response(304)
+            self.send_header('ETag', state.events_etag())
+            self.send_header('X-Poll-Interval', str(state.poll_interval))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        reset_at = state.take_quota('search' if endpoint == 'search_issues' else 'core')
+        if reset_at is not None:
+            self._send(403, {'message': 'API rate limit exceeded'}, endpoint)
+            return
+        if state.error_rate_429 and state.rng.random() < state.error_rate_429:
+            self._send(429, {'message': 'You have exceeded a secondary rate limit'}, endpoint,
+                       {'Retry-After': str(state.retry_after)})
+            return
+
+        if endpoint == 'repository':
+            self._send(200, state.data.repository(), endpoint)
+            return
+        if endpoint == 'search_issues':
+            self._search_issues(query)
+            return
+        if endpoint == 'events' and len(parts) == 4:
+            page = int(query.get('page', ['1'])[0])
+            per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+            with state.lock:
+                items = state.events[(page - 1) * per_page:page * per_page]
+            self._send(200, items, endpoint, {'ETag': state.events_etag(), 'X-Poll-Interval': str(state.poll_interval)})
+            return
+        # /repos/{owner}/{repo}/{issues|pulls}/{number}/{reviews|comments|timeline}
+        if len(parts) == 6 and parts[3] in ('issues', 'pulls') and parts[4].isdigit():
+            kind = parts[5]
+            if kind not in ('reviews', 'comments', 'timeline'):
+                self._send(404, {'message': 'Not Found'}, endpoint)
+                return
+            page = int(query.get('page', ['1'])[0])
+            per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+            items = state.data.sub_items(kind, int(parts[4]))
+            self._send(200, items[(page - 1) * per_page:page * per_page], f"{parts[3]}_{kind}")
+            return
+        if endpoint == 'compare' and len(parts) == 5:
+            self._send(200, state.data.compare(parts[4]), endpoint)
+            return
+        if endpoint not in LIST_ENDPOINTS or len(parts) != 4:
+            self._send(404, {'message': 'Not Found'}, endpoint)
+            return
+        # 其他仓库（Fork）的 /forks：合成下一层 Fork 网络
+        if endpoint == 'forks' and f"{parts[1]}/{parts[2]}" != f"{state.data.owner}/{state.data.repo}":
+            page = int(query.get('page', ['1'])[0])
+            per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+            items = state.data.forks_of(f"{parts[1]}/{parts[2]}")
+            self._send(200, items[(page - 1) * per_page:page * per_page], endpoint)
+            return
+
+        page = int(query.get('page', ['1'])[0])
+        per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+        items = state.fixture(endpoint, page)
+        if items is None:
+            items = state.data.page(endpoint, page, per_page)
+        last = max(1, -(-state.data.sizes[endpoint] // per_page))
+        self._send(200, items, endpoint, {'Link': self._link_header(parsed.path, query, page, last)})
+
+
+    def _search_issues(self, query: Dict[str, List[str]]):
+        """/search/issues?q=repo:o/r is:issue|is:pr created:A..B（只返回前 1000 条，与真实 API 一致）"""
+        is_pr = None
+        created_from = datetime.min.replace(tzinfo=timezone.utc)
+        created_to = datetime.max.replace(tzinfo=timezone.utc)
+        for term in query.get('q', [''])[0].split():
+            if term in ('is:pr', 'type:pr'):
+                is_pr = True
+            elif term in ('is:issue', 'type:issue'):
+                is_pr = False
+            elif term.startswith('created:') and '..' in term:
+                lo, hi = term[len('created:'):].split('..', 1)
+                created_from = datetime.fromisoformat(lo.replace('Z', '+00:00'))
+                created_to = datetime.fromisoformat(hi.replace('Z', '+00:00'))
+                if created_from.tzinfo is None:
+                    created_from = created_from.replace(tzinfo=timezone.utc)
+                if created_to.tzinfo is None:
+                    created_to = created_to.replace(tzinfo=timezone.utc)
+
+        page = int(query.get('page', ['1'])[0])
+        per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+        if (page - 1) * per_page >= 1000:
+            self._send(422, {'message': 'Only the first 1000 search results are available'}, 'search_issues')
+            return
+        matches = self.state.data.search_issues(is_pr, created_from, created_to)
+        items = matches[:1000][(page - 1) * per_page:page * per_page]
+        self._send(200, {'total_count': len(matches), 'incomplete_results': False, 'items': items}, 'search_issues')
+
+
+class FakeGitHubServer:
+    """
+    本地 GitHub API 替身
+    在后台线程中运行，base_url 可直接传给 MaxDataVSCodeCrawler
+    """
+
+    def __init__(self, state: FakeGitHubState, host: str = '127.0.0.1', port: int = 0):
+        handler = type('BoundFakeGitHubHandler', (FakeGitHubHandler,), {'state': state})
+        self.state = state
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/repos/{self.state.data.owner}/{self.state.data.repo}"
+
+    def start(self) -> 'FakeGitHubServer':
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'FakeGitHubServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='本地 GitHub API 替身')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--items', type=int, default=1000, help='每个端点的条目数')
+    parser.add_argument('--fixtures', default=None, help='录制页面目录：{endpoint}/page_{n}.json')
+    parser.add_argument('--rate-limit', type=int, default=5000)
+    parser.add_argument('--reset-seconds', type=float, default=60.0)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate-429', type=float, default=0.0)
+    args = parser.parse_args()
+
+    data = SyntheticData({name: args.items for name in LIST_ENDPOINTS})
+    state = FakeGitHubState(data, args.fixtures, args.rate_limit, args.reset_seconds,
+                            args.latency_ms, args.jitter_ms, args.error_rate_429)
+    server = FakeGitHubServer(state, port=args.port)
+    print(f"🧪 Fake GitHub API: {server.base_url}")
+    print("按 Ctrl+C 停止")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止")
+
+
+if __name__ == "__main__":
+    main()
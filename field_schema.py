@@ -0,0 +1,167 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from record_store import Column, RecordStore, DERIVED_KINDS
+
+try:
+    import orjson
+except ImportError:  # 可选依赖：没有 orjson 时使用 requests 自带的 json 解码
+    orjson = None
+
+
+def decode_json(response) -> Any:
+    """解码响应体，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+class Field:
+    """
+    一个输出列
+    path 为点分路径（如 'commit.author.name'），逐层取值，任一层不是 dict 或值为 None 时取 default；
+    以 '?' 结尾的一层为可选层：该层不是 dict 时停留在上一层（如 stargazers 的 'user?.login'）；
+    path 为 None 时 convert 接收整条记录（用于由多个字段计算的列）
+    """
+    __slots__ = ('name', 'path', 'default', 'convert', 'kind', 'options')
+
+    def __init__(self, name: str, path: Optional[str] = None, default: Any = '',
+                 convert: Optional[Callable] = None, kind: str = 'text', **options):
+        self.name = name
+        self.path = tuple(path.split('.')) if path else ()
+        self.default = default
+        self.convert = convert
+        self.kind = kind
+        self.options = options
+
+    def column(self) -> Column:
+        return Column(self.name, self.kind, **self.options)
+
+
+def _compile(fields: Sequence[Field], store: Optional[RecordStore] = None) -> Callable:
+    """
+    把字段列表编译成一个提取函数
+    store 为空时返回 item -> tuple；否则生成直接写入该存储各列的 item -> None，
+    category 列的字典编码也内联，没有逐字段的函数调用和中间 tuple；公共路径前缀只取一次
+    """
+    namespace: Dict[str, Any] = {'store': store}
+    lines = ['def extract(item):']
+    prefixes: Dict[Tuple[str, ...], str] = {(): 'item'}
+    outputs: List[str] = []
+
+    def node(prefix: Tuple[str, ...]) -> str:
+        """返回保存该前缀对应子对象的变量名（不是 dict 时为 None）"""
+        if prefix in prefixes:
+            return prefixes[prefix]
+        parent = node(prefix[:-1])
+        key = prefix[-1]
+        var = f"n{len(prefixes)}"
+        if key.endswith('?'):
+            lines.append(f"    {var} = {parent}.get({key[:-1]!r}) if {parent}.__class__ is dict else None")
+            lines.append(f"    if {var}.__class__ is not dict: {var} = {parent}")
+        else:
+            lines.append(f"    {var} = {parent}.get({key!r}) if {parent}.__class__ is dict else None")
+        prefixes[prefix] = var
+        return var
+
+    for i, field in enumerate(fields):
+        var = f"v{i}"
+        namespace[f"d{i}"] = field.default
+        if field.path:
+            parent = node(field.path[:-1])
+            key = field.path[-1]
+            lines.append(f"    {var} = {parent}.get({key!r}) if {parent}.__class__ is dict else None")
+            lines.append(f"    if {var} is None: {var} = d{i}")
+        else:
+            lines.append(f"    {var} = item")
+        if field.convert is not None:
+            namespace[f"c{i}"] = field.convert
+            lines.append(f"    {var} = c{i}({var})")
+
+        if store is None:
+            outputs.append(var)
+        elif field.kind == 'category':
+            pool = store.pools[field.name]
+            namespace[f"p{i}"] = pool.codes
+            namespace[f"e{i}"] = pool.encode
+            namespace[f"a{i}"] = store.data[field.name].append
+            lines.append(f"    k{i} = p{i}.get({var})")
+            lines.append(f"    a{i}(e{i}({var}) if k{i} is None else k{i})")
+        else:
+            namespace[f"a{i}"] = store._appenders[[c.name for c in store.stored].index(field.name)]
+            lines.append(f"    a{i}({var})")
+
+    if store is None:
+        lines.append(f"    return ({', '.join(outputs)}{',' if len(outputs) == 1 else ''})")
+    else:
+        lines.append("    store._count += 1")
+    exec('\n'.join(lines), namespace)
+    return namespace['extract']
+
+
+class EndpointSchema:
+    """端点的字段投影：列定义 + 编译好的提取函数"""
+
+    def __init__(self, fields: Sequence[Field]):
+        self.fields = list(fields)
+        self.columns = [f.column() for f in self.fields]
+        self.stored = [f for f in self.fields if f.kind not in DERIVED_KINDS]
+        # extract 返回元组的列名顺序，按名称取位置，不依赖字段定义的先后
+        self.names = [f.name for f in self.stored]
+        self.extract = _compile(self.stored)
+
+    def new_store(self) -> RecordStore:
+        """新建该端点的列式存储，并为其编译直接写入的 writer（store.write(item)）"""
+        store = RecordStore(self.columns)
+        store.write = _compile(self.stored, store)
+        return store
+
+
+# 常用转换
+def truncate(n: int) -> Callable[[str], str]:
+    return lambda text: text[:n]
+
+
+def preview(n: int) -> Callable[[str], str]:
+    """前 n 个字符加省略号，空文本保持为空"""
+    return lambda text: text[:n] + "..." if text else ''
+
+
+def safe_len(obj) -> int:
+    try:
+        return len(obj)
+    except TypeError:
+        return 0
+
+
+def label_names(labels) -> List[str]:
+    if not isinstance(labels, list):
+        return []
+    names = []
+    for label in labels:
+        if isinstance(label, dict):
+            name = label.get('name')
+            if name:
+                names.append(name)
+    return names
+
+
+def join_labels(limit: int) -> Callable[[Any], str]:
+    return lambda labels: ', '.join(label_names(labels)[:limit])
+
+
+def count_labels(labels) -> int:
+    return len(label_names(labels))
+
+
+def list_len(value) -> int:
+    return len(value) if isinstance(value, list) else 0
+
+
+def total_downloads(assets) -> int:
+    if not isinstance(assets, list):
+        return 0
+    total = 0
+    for asset in assets:
+        if isinstance(asset, dict):
+            total += asset.get('download_count') or 0
+    return total
@@ -0,0 +1,214 @@
+import argparse
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+import pandas as pd
+import os
+
+from field_schema import EndpointSchema, Field
+from record_store import RecordStore
+
+
+DATA_PATH = 'vscode_massive_data'
+NETWORK_DIR = f'{DATA_PATH}/fork_network'
+PAGE_SIZE = 100
+
+
+def is_active(fork: Dict) -> bool:
+    """创建后有过推送：pushed_at 晚于 created_at（没有推送的 Fork 沿用上游的推送时间，早于创建时间）"""
+    pushed, created = fork.get('pushed_at'), fork.get('created_at')
+    return bool(pushed and created and pushed > created)
+
+
+# 每条 Fork 包装为 {'depth': 层数, 'parent': 上游全名, 'item': 原始记录}
+FORK_SCHEMA = EndpointSchema([
+    Field("仓库ID", 'item.id', 0, kind='int'),
+    Field("仓库名", 'item.full_name'),
+    Field("所有者", 'item.owner.login', kind='category'),
+    Field("上游", 'parent', kind='category'),
+    Field("深度", 'depth', 0, kind='int'),
+    Field("创建时间", 'item.created_at'),
+    Field("推送时间", 'item.pushed_at'),
+    Field("活跃", 'item', {}, convert=is_active, kind='bool'),
+    Field("Stars数", 'item.stargazers_count', 0, kind='int'),
+    Field("Fork数", 'item.forks_count', 0, kind='int'),
+    Field("默认分支", 'item.default_branch', kind='category'),
+])
+# 对比结果包装为 {'id': 仓库ID, 'compare': 响应}
+COMPARE_SCHEMA = EndpointSchema([
+    Field("仓库ID", 'id', 0, kind='int'),
+    Field("对比状态", 'compare.status', kind='category'),
+    Field("领先提交", 'compare.ahead_by', 0, kind='int'),
+    Field("落后提交", 'compare.behind_by', 0, kind='int'),
+])
+
+
+class ForkNetworkCrawler:
+    """
+    Fork 网络广度优先抓取
+    从主仓库逐层列出 Fork 的 Fork（按仓库 ID 去重），只展开 forks_count > 0 的节点；
+    已知 forks_count 时一次提交该节点的全部分页。创建后没有推送的 Fork 视为不活跃，不做对比；
+    活跃的 Fork 与主仓库默认分支做 ahead/behind 对比（per_page=1，只取摘要）。
+    所有请求经过 crawler._make_request_safe，与其他抓取共用 crawler.rate_budget。
+    """
+
+    def __init__(self, crawler, workers: int = 8, max_depth: int = 3, max_forks: Optional[int] = None,
+                 compare: bool = True):
+        self.crawler = crawler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_forks = max_forks
+        self.compare = compare
+        # base_url 形如 {api}/repos/{owner}/{repo}
+        self.api_root, self.root = crawler.base_url.rstrip('/').split('/repos/', 1)
+        self.seen: Set[int] = set()
+        self.stats = {'list_requests': 0, 'compare_requests': 0, 'forks': 0, 'active': 0, 'duplicates': 0,
+                      'failed': 0, 'truncated': 0}
+
+    def _list(self, full_name: str, page: int, depth: int) -> Tuple[str, int, int, Any]:
+        url = f"{self.api_root}/repos/{full_name}/forks"
+        data = self.crawler._make_request_safe(url, {"per_page": PAGE_SIZE, "page": page, "sort": "oldest"})
+        return full_name, page, depth, data
+
+    def _compare(self, fork_id: int, base: str, head: str) -> Tuple[int, Any]:
+        url = f"{self.api_root}/repos/{self.root}/compare/{base}...{head}"
+        return fork_id, self.crawler._make_request_safe(url, {"per_page": 1})
+
+    def _full(self) -> bool:
+        return self.max_forks is not None and len(self.seen) >= self.max_forks
+
+    def _list_tasks(self, full_name: str, depth: int, forks_count: int):
+        pages = max(1, math.ceil(forks_count / PAGE_SIZE))
+        return [('list', full_name, page, depth) for page in range(1, pages + 1)]
+
+    def run(self) -> pd.DataFrame:
+        repo = self.crawler._make_request_safe(f"{self.api_root}/repos/{self.root}") or {}
+        base = repo.get('default_branch') or 'main'
+        print(f"🔍 Fork 网络: {self.root}（{repo.get('forks_count', '?')} 个直接 Fork，最多 {self.max_depth} 层，"
+              f"{self.workers} 线程）")
+
+        forks = FORK_SCHEMA.new_store()
+        compares = COMPARE_SCHEMA.new_store()
+        queue = deque(self._list_tasks(self.root, 0, repo.get('forks_count') or 0))
+        last_page: Dict[str, int] = {self.root: len(queue)}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running: Dict[Any, str] = {}
+            while queue or running:
+                # 最多 workers * 2 个任务在途；队列先进先出，列表任务按层推进
+                while queue and len(running) < self.workers * 2:
+                    task = queue.popleft()
+                    if task[0] == 'list' and self._full():
+                        continue
+                    action = self._list if task[0] == 'list' else self._compare
+                    running[pool.submit(action, *task[1:])] = task[0]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if running.pop(future) == 'list':
+                        self._on_list(future.result(), forks, queue, last_page, base)
+                    else:
+                        self._on_compare(future.result(), compares)
+
+        frame = forks.to_dataframe(categorical=False)
+        if len(compares):
+            frame = frame.merge(compares.to_dataframe(categorical=False), on='仓库ID', how='left')
+            for column in ('领先提交', '落后提交'):
+                frame[column] = frame[column].astype('Int64')
+        return frame
+
+    def _on_list(self, result, forks: RecordStore, queue: deque, last_page: Dict[str, int], base: str):
+        full_name, page, depth, data = result
+        self.stats['list_requests'] += 1
+        if not isinstance(data, list):
+            self.stats['failed'] += 1
+            return
+        forks.begin_page(page)
+        for fork in data:
+            if not isinstance(fork, dict):
+                continue
+            fork_id = fork.get('id')
+            if fork_id in self.seen:
+                self.stats['duplicates'] += 1
+                continue
+            if self._full():
+                self.stats['truncated'] += 1
+                continue
+            self.seen.add(fork_id)
+            forks.write({'depth': depth + 1, 'parent': full_name, 'item': fork})
+            self.stats['forks'] += 1
+
+            if is_active(fork):
+                self.stats['active'] += 1
+                if self.compare:
+                    owner = (fork.get('owner') or {}).get('login', '')
+                    queue.append(('compare', fork_id, base, f"{owner}:{fork.get('default_branch') or base}"))
+            name = fork.get('full_name')
+            if name and (fork.get('forks_count') or 0) > 0 and depth + 1 < self.max_depth:
+                tasks = self._list_tasks(name, depth + 1, fork['forks_count'])
+                last_page[name] = len(tasks)
+                queue.extend(tasks)
+
+        # forks_count 只是估计：最后一页仍是满页时继续翻页
+        if len(data) == PAGE_SIZE and page >= last_page.get(full_name, page):
+            last_page[full_name] = page + 1
+            queue.append(('list', full_name, page + 1, depth))
+
+    def _on_compare(self, result, compares: RecordStore):
+        fork_id, data = result
+        self.stats['compare_requests'] += 1
+        if not isinstance(data, dict):
+            self.stats['failed'] += 1
+            return
+        compares.write({'id': fork_id, 'compare': data})
+
+
+def main():
+    """主函数"""
+    from cyxcode import MaxDataVSCodeCrawler
+
+    parser = argparse.ArgumentParser(description='Fork 网络广度优先抓取（活跃度过滤 + ahead/behind 对比）')
+    parser.add_argument('--workers', type=int, default=8, help='并发线程数')
+    parser.add_argument('--max-depth', type=int, default=3, help='最多抓取的 Fork 层数')
+    parser.add_argument('--max-forks', type=int, default=None, help='最多收录的 Fork 数')
+    parser.add_argument('--no-compare', action='store_true', help='不做 ahead/behind 对比')
+    parser.add_argument('--output', default=NETWORK_DIR, help='输出目录')
+    parser.add_argument('--base-url', default="https://api.github.com/repos/microsoft/vscode")
+    args = parser.parse_args()
+
+    crawler = MaxDataVSCodeCrawler(github_token=os.environ.get('GITHUB_TOKEN', ''), base_url=args.base_url)
+    crawler.page_delay_scale = 0
+    network = ForkNetworkCrawler(crawler, args.workers, args.max_depth, args.max_forks, not args.no_compare)
+
+    start = datetime.now()
+    frame = network.run()
+    elapsed = (datetime.now() - start).total_seconds()
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, 'fork_network.csv')
+    frame.to_csv(path, index=False, encoding='utf-8-sig')
+
+    print("\n" + "=" * 60)
+    print("📊 Fork 网络总结")
+    print("=" * 60)
+    stats = network.stats
+    print(f"Fork {stats['forks']:,} 个（活跃 {stats['active']:,}）| 列表请求 {stats['list_requests']:,} | "
+          f"对比请求 {stats['compare_requests']:,} | 去重 {stats['duplicates']:,} | 失败 {stats['failed']:,} | "
+          f"耗时 {elapsed:.1f}s")
+    if stats['truncated']:
+        print(f"⚠️  达到 --max-forks 上限，未收录 {stats['truncated']} 个")
+    if len(frame):
+        by_depth = frame.groupby('深度').agg(Fork数=('仓库ID', 'size'), 活跃=('活跃', 'sum'))
+        print(by_depth.to_string())
+        if '领先提交' in frame.columns:
+            ahead = frame[frame['领先提交'] > 0].sort_values('领先提交', ascending=False)
+            print(f"\n🌱 领先主仓库的 Fork: {len(ahead):,} 个，前 10：")
+            print(ahead[['仓库名', '深度', '领先提交', '落后提交', '推送时间']].head(10).to_string(index=False))
+    print(f"\n✅ 已写出 {path}")
+    crawler.metrics.progress(force=True)
+    print(f"🔁 共享配额: {crawler.rate_budget.summary()}")
+
+
+if __name__ == "__main__":
+    main()
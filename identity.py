@@ -0,0 +1,289 @@
+import re
+from typing import Dict, List, Optional, Iterable, Tuple
+import pandas as pd
+import os
+
+
+# GitHub noreply 邮箱：12345+login@users.noreply.github.com 或 login@users.noreply.github.com
+NOREPLY_PATTERN = re.compile(r'^(?:\d+\+)?([A-Za-z0-9-]+)@users\.noreply\.github\.com$', re.IGNORECASE)
+
+# .mailmap 行中的 "Name <email>" 片段
+MAILMAP_ENTRY_PATTERN = re.compile(r'([^<]*)<([^>]*)>')
+
+# 视为缺失的占位值（run.py 会写入 "Unknown"）
+MISSING_VALUES = {'', 'unknown', 'nan', 'none'}
+
+
+class UnionFind:
+    """
+    基于数组的并查集
+    路径减半 + 按秩合并，支持增量添加元素
+    """
+
+    def __init__(self):
+        self.parent: List[int] = []
+        self.rank: List[int] = []
+        # 每个集合中最早出现的元素下标，用于生成稳定的作者ID
+        self.first: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def add(self) -> int:
+        """新增一个单元素集合，返回其下标"""
+        idx = len(self.parent)
+        self.parent.append(idx)
+        self.rank.append(0)
+        self.first.append(idx)
+        return idx
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> int:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.rank[ra] < self.rank[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        if self.rank[ra] == self.rank[rb]:
+            self.rank[ra] += 1
+        self.first[ra] = min(self.first[ra], self.first[rb])
+        return ra
+
+
+class AuthorIdentityResolver:
+    """
+    作者身份归并
+    把 git 姓名/邮箱、GitHub 登录名统一到同一个整数作者ID
+    """
+
+    def __init__(self):
+        self.uf = UnionFind()
+        self.key_index: Dict[str, int] = {}
+        # 集合最早元素下标 -> 作者ID，只追加不重排；合并时保留较早集合的ID
+        self.author_index: Dict[int, int] = {}
+        self._next_id = 0
+
+    # ---------- 标识符 ----------
+
+    @staticmethod
+    def _is_missing(value) -> bool:
+        if value is None:
+            return True
+        if isinstance(value, float) and value != value:
+            return True
+        return str(value).strip().lower() in MISSING_VALUES
+
+    @classmethod
+    def email_key(cls, email) -> Optional[str]:
+        """邮箱标识符；noreply 邮箱直接折叠为登录名"""
+        if cls._is_missing(email):
+            return None
+        email = str(email).strip().lower()
+        match = NOREPLY_PATTERN.match(email)
+        if match:
+            return f"login:{match.group(1)}"
+        return f"email:{email}"
+
+    @classmethod
+    def login_key(cls, login) -> Optional[str]:
+        if cls._is_missing(login):
+            return None
+        return f"login:{str(login).strip().lower()}"
+
+    @classmethod
+    def name_key(cls, name) -> Optional[str]:
+        """姓名仅在缺少邮箱时作为兜底标识，不参与跨标识合并"""
+        if cls._is_missing(name):
+            return None
+        return f"name:{' '.join(str(name).split()).lower()}"
+
+    def _index(self, key: str) -> int:
+        idx = self.key_index.get(key)
+        if idx is None:
+            idx = self.uf.add()
+            self.key_index[key] = idx
+        return idx
+
+    def link(self, *keys: Optional[str]):
+        """将若干标识符合并为同一个人（忽略空值）"""
+        indices = [self._index(k) for k in keys if k]
+        uf = self.uf
+        for other in indices[1:]:
+            first_a, first_b = uf.first[uf.find(indices[0])], uf.first[uf.find(other)]
+            if first_a == first_b:
+                continue
+            uf.union(indices[0], other)
+            # 合并后的集合沿用较早集合已分配的ID，另一个ID作废（不复用）
+            older, newer = sorted((first_a, first_b))
+            author_id = self.author_index.pop(older, None)
+            newer_id = self.author_index.pop(newer, None)
+            if author_id is None:
+                author_id = newer_id
+            if author_id is not None:
+                self.author_index[older] = author_id
+
+    # ---------- 证据来源 ----------
+
+    def load_mailmap(self, path: str = '.mailmap') -> int:
+        """
+        读取 .mailmap，支持以下格式：
+            Proper Name <proper@email>
+            <proper@email> <commit@email>
+            Proper Name <proper@email> Commit Name <commit@email>
+        返回合并的条目数
+        """
+        if not os.path.exists(path):
+            return 0
+
+        count = 0
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                entries = MAILMAP_ENTRY_PATTERN.findall(line)
+                emails = [self.email_key(email) for _, email in entries]
+                if len(emails) >= 2:
+                    self.link(*emails)
+                    count += 1
+                elif emails:
+                    # 只有一个邮箱时，把姓名映射到该邮箱
+                    self.link(emails[0], self.name_key(entries[0][0]))
+                    count += 1
+        return count
+
+    def add_git_commits(self, df: pd.DataFrame, name_col: str = 'author', email_col: str = 'author_email'):
+        """run.py 导出的提交：每行的邮箱（或兜底姓名）作为一个标识"""
+        for key in self.git_row_keys(df, name_col, email_col).unique():
+            self._index(key)
+
+    def add_api_commits(self, df: pd.DataFrame, login_col: str = 'GitHub用户', email_col: str = '作者邮箱'):
+        """爬虫提交数据：同一行的登录名与邮箱是同一个人的证据"""
+        pairs = df[[login_col, email_col]].drop_duplicates()
+        for login, email in pairs.itertuples(index=False, name=None):
+            self.link(self.login_key(login), self.email_key(email))
+
+    def add_contributors(self, df: pd.DataFrame, login_col: str = '用户名'):
+        for login in df[login_col].dropna().unique():
+            key = self.login_key(login)
+            if key:
+                self._index(key)
+
+    # ---------- 行级键 ----------
+
+    def git_row_keys(self, df: pd.DataFrame, name_col: str = 'author', email_col: str = 'author_email') -> pd.Series:
+        emails = df[email_col].map(self.email_key)
+        names = df[name_col].map(self.name_key)
+        return emails.fillna(names).fillna('name:unknown')
+
+    def api_row_keys(self, df: pd.DataFrame, login_col: str = 'GitHub用户', email_col: str = '作者邮箱') -> pd.Series:
+        logins = df[login_col].map(self.login_key)
+        emails = df[email_col].map(self.email_key)
+        return logins.fillna(emails).fillna('name:unknown')
+
+    def contributor_row_keys(self, df: pd.DataFrame, login_col: str = '用户名') -> pd.Series:
+        return df[login_col].map(self.login_key).fillna('name:unknown')
+
+    # ---------- 作者ID ----------
+
+    def resolve_keys(self, keys: Iterable[str]) -> List[int]:
+        """标识符 -> 所在集合最早出现的元素下标（跨增量更新保持稳定）"""
+        uf = self.uf
+        return [uf.first[uf.find(self._index(k))] for k in keys]
+
+    def _author_id(self, first: int) -> int:
+        """集合 -> 作者ID：首次查询时按顺序追加分配，之后的新增标识与合并都不会改变已分配的ID"""
+        author_id = self.author_index.get(first)
+        if author_id is None:
+            # 合并会作废ID，已分配的最大ID + 1 保证不与作废的ID重复
+            author_id = self._next_id
+            self._next_id += 1
+            self.author_index[first] = author_id
+        return author_id
+
+    def author_ids(self, keys: pd.Series) -> pd.Series:
+        """
+        为每一行生成整数作者ID（增量更新时已分配的ID保持不变，合并后可能不连续）
+        先对键去重，只对唯一值做并查集查找，再按行回填
+        """
+        codes, uniques = pd.factorize(keys)
+        stable = self.resolve_keys(uniques)
+        lookup = pd.Series([self._author_id(s) for s in stable], dtype='int32').to_numpy()
+        return pd.Series(lookup[codes], index=keys.index, name='author_id')
+
+    def stats(self) -> Dict[str, int]:
+        roots = {self.uf.find(i) for i in range(len(self.uf))}
+        return {'标识符数': len(self.uf), '作者数': len(roots)}
+
+
+def resolve_vscode_authors(data_path: str = 'vscode_massive_data',
+                           history_csv: str = 'vscode_commit_history.csv',
+                           mailmap_path: str = '.mailmap') -> Tuple[AuthorIdentityResolver, Dict[str, pd.DataFrame]]:
+    """
+    读取现有导出并为每行添加 author_id 列
+    """
+    resolver = AuthorIdentityResolver()
+    resolver.load_mailmap(mailmap_path)
+
+    frames: Dict[str, pd.DataFrame] = {}
+
+    commits_path = f"{data_path}/2_commits.csv"
+    if os.path.exists(commits_path):
+        api_commits = pd.read_csv(commits_path)
+        resolver.add_api_commits(api_commits)
+        frames['commits_full'] = api_commits
+
+    contributors_path = f"{data_path}/1_contributors.csv"
+    if os.path.exists(contributors_path):
+        contributors = pd.read_csv(contributors_path)
+        resolver.add_contributors(contributors)
+        frames['contributors'] = contributors
+
+    if os.path.exists(history_csv):
+        history = pd.read_csv(history_csv)
+        resolver.add_git_commits(history)
+        frames['commits_history'] = history
+
+    # 所有证据加载完毕后再统一分配ID
+    if 'commits_full' in frames:
+        df = frames['commits_full']
+        df['author_id'] = resolver.author_ids(resolver.api_row_keys(df))
+    if 'contributors' in frames:
+        df = frames['contributors']
+        df['author_id'] = resolver.author_ids(resolver.contributor_row_keys(df))
+    if 'commits_history' in frames:
+        df = frames['commits_history']
+        df['author_id'] = resolver.author_ids(resolver.git_row_keys(df))
+
+    return resolver, frames
+
+
+def main():
+    """主函数"""
+    print("🔗 作者身份归并")
+    print("=" * 60)
+
+    resolver, frames = resolve_vscode_authors()
+    if not frames:
+        print("⚠️  未找到任何数据文件")
+        return
+
+    stats = resolver.stats()
+    print(f"✅ 标识符: {stats['标识符数']:,}，归并后作者: {stats['作者数']:,}")
+
+    naive_cols = {'commits_full': '作者', 'contributors': '用户名', 'commits_history': 'author'}
+    for name, df in frames.items():
+        before = df[naive_cols[name]].nunique()
+        after = df['author_id'].nunique()
+        print(f"  {name}: 原始作者数 {before:,} → 归并后 {after:,}")
+
+
+if __name__ == "__main__":
+    main()
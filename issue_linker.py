@@ -0,0 +1,200 @@
+import re
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import os
+
+
+DEFAULT_REPO = 'microsoft/vscode'
+
+# 一次编译、一次扫描：同时识别 Merge PR、关闭关键字、跨仓库引用和普通 #N 引用
+REFERENCE_PATTERN = re.compile(
+    r'(?P<merge>merge pull request\s+)?'
+    r'(?P<keyword>\b(?:close[sd]?|fix(?:e[sd])?|resolve[sd]?)\b:?\s+)?'
+    r'(?P<repo>\b[\w.-]+/[\w.-]+)?'
+    r'#(?P<number>\d+)\b',
+    re.IGNORECASE
+)
+
+# 引用类型
+REF_MERGE = 'merge'
+REF_CLOSES = 'closes'
+REF_MENTION = 'mention'
+
+
+def _first_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+    """在中英文列名中选出实际存在的一列"""
+    for col in candidates:
+        if col in df.columns:
+            return col
+    return None
+
+
+class CommitIssueLinker:
+    """
+    提交 ↔ Issue/PR 关联
+    对提交信息列做一次向量化正则扫描，建立 编号 -> 提交 的倒排索引
+    """
+
+    def __init__(self, commits: pd.DataFrame, repo: str = DEFAULT_REPO):
+        self.repo = repo.lower()
+        self.commits = commits.reset_index(drop=True)
+
+        self.message_col = _first_column(self.commits, ['message', '提交信息'])
+        self.date_col = _first_column(self.commits, ['date', '提交时间'])
+        self.hash_col = _first_column(self.commits, ['commit_hash', 'SHA'])
+        if self.message_col is None:
+            raise ValueError("提交数据中缺少提交信息列（message / 提交信息）")
+
+        self.refs = self._extract_references()
+        self._build_index()
+
+    def _extract_references(self) -> pd.DataFrame:
+        """
+        抽取所有引用，返回每条引用一行：commit_pos, number, kind
+        跨仓库引用（owner/repo#N 且不是本仓库）不进入索引
+        """
+        messages = self.commits[self.message_col].fillna('').astype(str)
+        found = messages.str.extractall(REFERENCE_PATTERN)
+
+        if found.empty:
+            return pd.DataFrame({'commit_pos': pd.Series(dtype='int64'),
+                                 'number': pd.Series(dtype='int64'),
+                                 'kind': pd.Series(dtype='object')})
+
+        repo = found['repo'].str.lower()
+        found = found[repo.isna() | (repo == self.repo)]
+
+        kind = np.where(found['merge'].notna(), REF_MERGE,
+                        np.where(found['keyword'].notna(), REF_CLOSES, REF_MENTION))
+
+        refs = pd.DataFrame({
+            'commit_pos': found.index.get_level_values(0).to_numpy(dtype='int64'),
+            'number': found['number'].astype('int64').to_numpy(),
+            'kind': kind,
+        })
+        # 同一提交对同一编号只保留最强的引用类型
+        refs['rank'] = refs['kind'].map({REF_MERGE: 0, REF_CLOSES: 1, REF_MENTION: 2})
+        refs = (refs.sort_values(['commit_pos', 'number', 'rank'])
+                    .drop_duplicates(['commit_pos', 'number'])
+                    .drop(columns='rank')
+                    .reset_index(drop=True))
+        return refs
+
+    def _build_index(self):
+        """CSR 形式的倒排索引：排序后的编号 + 每个编号在提交数组中的区间"""
+        order = np.argsort(self.refs['number'].to_numpy(), kind='stable')
+        numbers = self.refs['number'].to_numpy()[order]
+        self._index_commits = self.refs['commit_pos'].to_numpy()[order]
+        self._index_kinds = self.refs['kind'].to_numpy()[order]
+        self._index_numbers, self._index_starts = np.unique(numbers, return_index=True)
+        self._index_ends = np.append(self._index_starts[1:], len(numbers))
+
+    # ---------- 查询 ----------
+
+    def _slice(self, number: int) -> slice:
+        pos = np.searchsorted(self._index_numbers, number)
+        if pos >= len(self._index_numbers) or self._index_numbers[pos] != number:
+            return slice(0, 0)
+        return slice(self._index_starts[pos], self._index_ends[pos])
+
+    def commits_for(self, number: int, kind: Optional[str] = None) -> pd.DataFrame:
+        """引用某个 Issue/PR 编号的所有提交"""
+        span = self._slice(number)
+        positions = self._index_commits[span]
+        if kind is not None:
+            positions = positions[self._index_kinds[span] == kind]
+        return self.commits.iloc[positions]
+
+    def closing_commits(self, number: int) -> pd.DataFrame:
+        """关闭（Fixes/Closes/Resolves）某个 Issue 的提交"""
+        return self.commits_for(number, kind=REF_CLOSES)
+
+    def has_reference(self) -> pd.Series:
+        """每个提交是否引用了本仓库的 Issue/PR（替代逐行的 has_issue_reference）"""
+        flags = np.zeros(len(self.commits), dtype=bool)
+        flags[self.refs['commit_pos'].to_numpy()] = True
+        return pd.Series(flags, index=self.commits.index, name='has_issue')
+
+    def is_pr_merge(self) -> pd.Series:
+        flags = np.zeros(len(self.commits), dtype=bool)
+        merges = self.refs.loc[self.refs['kind'] == REF_MERGE, 'commit_pos'].to_numpy()
+        flags[merges] = True
+        return pd.Series(flags, index=self.commits.index, name='is_pr_merge')
+
+    # ---------- 关联导出数据 ----------
+
+    def link_table(self) -> pd.DataFrame:
+        """引用明细：每条引用附带提交哈希和提交时间"""
+        table = self.refs.copy()
+        if self.hash_col:
+            table['commit_hash'] = self.commits[self.hash_col].to_numpy()[table['commit_pos']]
+        if self.date_col:
+            dates = pd.to_datetime(self.commits[self.date_col], errors='coerce', utc=True)
+            table['commit_date'] = dates.to_numpy()[table['commit_pos']]
+        return table
+
+    def join(self, items: pd.DataFrame, number_col: str = '编号') -> pd.DataFrame:
+        """
+        与 3_issues_open.csv / 4_prs_open.csv 等导出按编号关联
+        只保留有提交引用的条目
+        """
+        table = self.link_table()
+        joined = table.merge(items, left_on='number', right_on=number_col, how='inner')
+        return joined
+
+    def time_to_fix(self, issues: pd.DataFrame, number_col: str = '编号',
+                    created_col: str = '创建时间') -> pd.DataFrame:
+        """
+        Issue 创建到首个关闭提交的时长
+        """
+        if not self.date_col:
+            raise ValueError("提交数据中缺少时间列，无法计算修复时长")
+
+        joined = self.join(issues, number_col)
+        joined = joined[joined['kind'] == REF_CLOSES]
+        if joined.empty:
+            return pd.DataFrame(columns=['number', 'created_at', 'first_fix', 'time_to_fix'])
+
+        joined = joined.assign(created_at=pd.to_datetime(joined[created_col], errors='coerce', utc=True))
+        result = (joined.groupby('number')
+                        .agg(created_at=('created_at', 'first'), first_fix=('commit_date', 'min'))
+                        .reset_index())
+        result['time_to_fix'] = result['first_fix'] - result['created_at']
+        return result
+
+    def summary(self) -> Dict[str, int]:
+        counts = self.refs['kind'].value_counts()
+        return {
+            '提交数': len(self.commits),
+            '有引用的提交': int(self.refs['commit_pos'].nunique()),
+            '被引用编号': int(len(self._index_numbers)),
+            'Merge PR引用': int(counts.get(REF_MERGE, 0)),
+            '关闭引用': int(counts.get(REF_CLOSES, 0)),
+            '普通引用': int(counts.get(REF_MENTION, 0)),
+        }
+
+
+def main():
+    """主函数"""
+    print("🔗 提交 ↔ Issue/PR 关联")
+    print("=" * 60)
+
+    data_path = 'vscode_massive_data'
+    commits = pd.read_csv(f'{data_path}/2_commits.csv')
+    linker = CommitIssueLinker(commits)
+
+    for key, value in linker.summary().items():
+        print(f"  {key}: {value:,}")
+
+    for name in ['3_issues_open.csv', '4_prs_open.csv']:
+        path = f'{data_path}/{name}'
+        if not os.path.exists(path):
+            continue
+        items = pd.read_csv(path)
+        joined = linker.join(items)
+        print(f"\n📄 {name}: {joined['number'].nunique()} 个编号被提交引用")
+
+
+if __name__ == "__main__":
+    main()
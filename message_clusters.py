@@ -0,0 +1,209 @@
+import argparse
+import re
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import os
+
+from identity import UnionFind
+
+
+# 模板归一化：把提交信息中易变的部分替换成占位符（按顺序应用）
+VERSION = r'v?\d+(?:\.\d+)+(?:[-+][\w.]+)?'
+TEMPLATE_RULES = [
+    # 标题末尾的 "(#1234)" 是合并时附加的，不参与比较
+    (re.compile(r'\s*\((?:[\w.-]+/[\w.-]+)?#\d+\)\s*$'), ''),
+    # 依赖升级：包名本身也是易变部分
+    (re.compile(r'^bump\s+\S+'), 'bump <pkg>'),
+    # 同时含字母和数字才视为 SHA，避免把纯数字或普通单词当成 SHA
+    (re.compile(r'\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{7,40}\b'), '<sha>'),
+    (re.compile(r'\b[\w.-]+/[\w.-]+#\d+\b'), '<ref>'),
+    (re.compile(r'#\d+'), '<ref>'),
+    # "from X" 中的 X 不是版本号或占位符时才是分支名，须在版本号规则之前
+    (re.compile(r'\bfrom\s+(?!<|' + VERSION + r'\b)\S+'), 'from <branch>'),
+    (re.compile(r'\b' + VERSION + r'\b'), '<ver>'),
+    (re.compile(r'\d+'), '<num>'),
+    (re.compile(r'"[^"]*"|\'[^\']*\'|`[^`]*`'), '<str>'),
+]
+# 字母（含中文等非 ASCII 文字）组成的词，数字已被上面的规则替换
+TOKEN_PATTERN = re.compile(r"<\w+>|[^\W\d]+")
+
+# MinHash 参数：16 个 band × 4 行，相似度阈值约 (1/16)^(1/4) ≈ 0.5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MAX_TOKENS = 32
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def normalize_message(message: str) -> str:
+    """提交信息标题行 -> 模板字符串"""
+    text = str(message).strip().split('\n', 1)[0].lower()
+    subject = text
+    for pattern, placeholder in TEMPLATE_RULES:
+        text = pattern.sub(placeholder, text)
+    # 没有可用的词（如只有标点或表情）时退回原标题，避免不相关的信息合并成同一个空模板
+    return ' '.join(TOKEN_PATTERN.findall(text)[:MAX_TOKENS]) or subject
+
+
+class MessageClusterer:
+    """
+    提交信息近重复 / 模板聚类（流式）
+    1. 完全相同的模板直接归为一类，不做任何相似度计算
+    2. 新模板计算 MinHash 签名，通过 LSH 分桶只与同桶代表比较
+    3. 并查集合并，整体复杂度近似线性
+    """
+
+    def __init__(self, threshold: float = 0.6, seed: int = 42):
+        self.threshold = threshold
+        rng = np.random.RandomState(seed)
+        # 与 datasketch 相同的做法：61 位系数，乘法在 uint64 上自然溢出后再取模
+        self._a = rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+        self.uf = UnionFind()
+        self.template_index: Dict[str, int] = {}
+        self.templates: List[str] = []
+        # 每条提交信息对应的模板下标
+        self.message_templates = array('i')
+        # LSH 桶：(band, 桶哈希) -> 代表模板下标；只为代表保存签名
+        self.buckets: Dict[Tuple[int, int], int] = {}
+        self.signatures: Dict[int, np.ndarray] = {}
+
+    def _signatures(self, templates: List[str]) -> np.ndarray:
+        """批量计算 MinHash 签名：所有 shingle 一次性哈希，再按模板分段取最小值"""
+        hashes, offsets = [], []
+        for template in templates:
+            tokens = template.split()
+            shingles = [' '.join(tokens[i:i + 2]) for i in range(len(tokens) - 1)] or tokens or ['<empty>']
+            offsets.append(len(hashes))
+            hashes.extend(zlib.crc32(s.encode('utf-8')) for s in shingles)
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            values = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME
+        return np.minimum.reduceat(values & MAX_HASH, offsets, axis=1).T
+
+    def _insert(self, idx: int, signature: np.ndarray):
+        """把新模板放入 LSH 桶，与同桶代表相似则合并"""
+        bands = signature.reshape(BANDS, ROWS)
+        is_representative = False
+        for band in range(BANDS):
+            key = (band, hash(bands[band].tobytes()))
+            rep = self.buckets.get(key)
+            if rep is None:
+                self.buckets[key] = idx
+                is_representative = True
+            elif self.uf.find(rep) != self.uf.find(idx):
+                # 用签名估计 Jaccard 相似度，过滤 LSH 的假阳性
+                if np.mean(self.signatures[rep] == signature) >= self.threshold:
+                    self.uf.union(rep, idx)
+        if is_representative:
+            self.signatures[idx] = signature
+
+    def _flush(self, pending: List[int]):
+        if not pending:
+            return
+        signatures = self._signatures([self.templates[idx] for idx in pending])
+        for idx, signature in zip(pending, signatures):
+            self._insert(idx, signature)
+        pending.clear()
+
+    def add(self, messages: Iterable[str], batch_size: int = 2048):
+        """追加一批提交信息（可多次调用，实现流式处理）"""
+        pending: List[int] = []
+        for message in messages:
+            template = normalize_message(message) if isinstance(message, str) else ''
+            idx = self.template_index.get(template)
+            if idx is None:
+                idx = self.uf.add()
+                self.template_index[template] = idx
+                self.templates.append(template)
+                pending.append(idx)
+                if len(pending) >= batch_size:
+                    self._flush(pending)
+            self.message_templates.append(idx)
+        self._flush(pending)
+
+    def cluster_ids(self) -> np.ndarray:
+        """每条已加入提交信息的紧凑聚类ID（按聚类首次出现的顺序编号）"""
+        uf = self.uf
+        roots = np.fromiter((uf.first[uf.find(i)] for i in range(len(uf))), dtype=np.int64, count=len(uf))
+        dense, _ = pd.factorize(roots)
+        return dense[np.frombuffer(self.message_templates, dtype=np.int32)]
+
+    def cluster_table(self, top: int = 20) -> pd.DataFrame:
+        """最大的若干聚类及其代表模板"""
+        ids = self.cluster_ids()
+        counts = pd.Series(ids).value_counts().head(top)
+        # 每个聚类以其第一条提交信息的模板作为代表
+        first_positions = pd.Series(ids).drop_duplicates()
+        message_templates = np.frombuffer(self.message_templates, dtype=np.int32)
+        representative = {cluster: self.templates[message_templates[pos]] for pos, cluster in first_positions.items()}
+        return pd.DataFrame({
+            'cluster_id': counts.index,
+            '提交数': counts.to_numpy(),
+            '模板': [representative[c] for c in counts.index],
+        })
+
+
+def cluster_messages(messages: pd.Series, chunk_size: int = 100_000,
+                     clusterer: Optional[MessageClusterer] = None) -> pd.Series:
+    """为提交信息列生成聚类ID列"""
+    clusterer = clusterer or MessageClusterer()
+    start = len(clusterer.message_templates)
+    for offset in range(0, len(messages), chunk_size):
+        clusterer.add(messages.iloc[offset:offset + chunk_size])
+    ids = clusterer.cluster_ids()[start:]
+    return pd.Series(ids, index=messages.index, name='message_cluster')
+
+
+def iter_message_chunks(path: str, column: str, chunk_size: int = 100_000) -> Iterable[pd.Series]:
+    """分块读取 CSV 的提交信息列，大文件不必整体载入内存"""
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=chunk_size):
+        yield chunk[column]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='提交信息近重复与模板聚类')
+    parser.add_argument('csv', nargs='?', default=None, help='提交数据 CSV（默认依次尝试历史数据和爬虫数据）')
+    parser.add_argument('--column', default=None, help='提交信息列名（默认自动识别 message / 提交信息）')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--output', default=None, help='输出每个提交的聚类ID到CSV')
+    args = parser.parse_args()
+
+    candidates = [args.csv] if args.csv else ['vscode_commit_history.csv', 'commits_massive.csv',
+                                              'vscode_massive_data/2_commits.csv']
+    path = next((p for p in candidates if p and os.path.exists(p)), None)
+    if path is None:
+        print("⚠️  未找到提交数据文件")
+        return
+
+    column = args.column
+    if column is None:
+        header = pd.read_csv(path, nrows=0).columns
+        column = 'message' if 'message' in header else '提交信息'
+
+    print(f"🧩 提交信息聚类: {path} [{column}]")
+    print("=" * 60)
+
+    clusterer = MessageClusterer()
+    for chunk in iter_message_chunks(path, column):
+        clusterer.add(chunk)
+
+    ids = clusterer.cluster_ids()
+    print(f"✅ 提交: {len(ids):,}，模板: {len(clusterer.templates):,}，聚类: {len(np.unique(ids)):,}")
+    print(f"\n📊 最大的 {args.top} 个聚类：")
+    for _, row in clusterer.cluster_table(args.top).iterrows():
+        print(f"  [{row['cluster_id']:>5}] {row['提交数']:>6}  {row['模板'][:80]}")
+
+    if args.output:
+        pd.DataFrame({'message_cluster': ids}).to_csv(args.output, index=False)
+        print(f"\n📁 已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
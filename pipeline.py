@@ -0,0 +1,382 @@
+import argparse
+import glob
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+import pandas as pd
+import os
+
+
+STATE_FILE = '.pipeline_state.json'
+DATA_PATH = 'vscode_massive_data'
+NORMALIZED_DIR = 'normalized'
+AGGREGATES_DIR = 'aggregates'
+ENRICH_DIR = f'{DATA_PATH}/enrichment'
+REPORT_FILE = 'REPORT.md'
+
+# REPORT.md 中由流水线自动维护的区块
+REPORT_BLOCK_START = '<!-- pipeline:metrics:start -->'
+REPORT_BLOCK_END = '<!-- pipeline:metrics:end -->'
+
+
+class Stage:
+    """
+    流水线阶段
+    inputs / outputs 为文件路径或通配符；上游阶段由输入与输出的重叠自动推断
+    """
+
+    def __init__(self, name: str, action: Callable[[], None], inputs: List[str], outputs: List[str],
+                 fingerprint: Optional[Callable[[], str]] = None, manual: bool = False,
+                 explicit: bool = False, requires_env: Optional[List[str]] = None):
+        self.name = name
+        self.action = action
+        self.inputs = inputs
+        self.outputs = outputs
+        # 额外的输入指纹（如外部 Git 仓库的 HEAD），不在文件系统内的输入用它表示
+        self.fingerprint = fingerprint
+        # 手动阶段（如消耗 API 配额的爬取）只在输出缺失或显式 --force 时执行
+        self.manual = manual
+        # 显式阶段不在默认目标中，只在命令行点名时执行（其输出不被其他阶段使用）
+        self.explicit = explicit
+        # 缺少这些环境变量时跳过，而不是执行后失败
+        self.requires_env = requires_env or []
+
+    def input_files(self) -> List[str]:
+        files = set()
+        for pattern in self.inputs:
+            matches = glob.glob(pattern)
+            files.update(matches if matches else [pattern])
+        return sorted(files)
+
+    def input_hash(self) -> str:
+        """所有输入文件内容的哈希（缺失文件也计入，出现后即视为变化）"""
+        digest = hashlib.sha256(self.name.encode('utf-8'))
+        for path in self.input_files():
+            digest.update(path.encode('utf-8'))
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(chunk)
+            else:
+                digest.update(b'<missing>')
+        if self.fingerprint:
+            digest.update(self.fingerprint().encode('utf-8'))
+        return digest.hexdigest()
+
+    def outputs_exist(self) -> bool:
+        return all(glob.glob(pattern) for pattern in self.outputs)
+
+
+# ---------- 各阶段动作 ----------
+
+def crawl():
+    """调用爬虫导出全部数据（Token 从环境变量 GITHUB_TOKEN 读取）"""
+    from cyxcode import MaxDataVSCodeCrawler
+
+    crawler = MaxDataVSCodeCrawler(github_token=os.environ.get('GITHUB_TOKEN', ''))
+    crawler.export_massive_data_safely(DATA_PATH)
+
+
+def enrich():
+    """补充 PR 审阅与 Issue 时间线（只抓取 updated_at 变化的条目）"""
+    from cyxcode import MaxDataVSCodeCrawler
+    from pr_enrichment import ReviewEnricher, load_items
+
+    crawler = MaxDataVSCodeCrawler(github_token=os.environ.get('GITHUB_TOKEN', ''))
+    ReviewEnricher(crawler, ENRICH_DIR).run(load_items(DATA_PATH))
+
+
+def git_extract():
+    """运行 run.py 导出本地仓库提交历史"""
+    from run import repo_path
+
+    if not os.path.exists(repo_path):
+        print(f"  ⚠️  本地仓库不存在（{repo_path}），沿用现有提交历史")
+        return
+    subprocess.run([sys.executable, 'run.py'], check=True)
+
+
+def git_head_fingerprint() -> str:
+    """本地 VS Code 仓库的 HEAD，仓库提交变化时触发重新提取"""
+    from run import repo_path
+
+    try:
+        result = subprocess.run(['git', '-C', repo_path, 'rev-parse', 'HEAD'],
+                                capture_output=True, text=True, timeout=30)
+        return result.stdout.strip()
+    except Exception:
+        return ''
+
+
+def normalize():
+    """作者身份归并、提交类型、提交信息聚类、Issue 引用"""
+    import analysis
+    from identity import resolve_vscode_authors
+    from issue_linker import CommitIssueLinker
+    from message_clusters import cluster_messages
+
+    os.makedirs(NORMALIZED_DIR, exist_ok=True)
+    resolver, frames = resolve_vscode_authors(DATA_PATH)
+
+    history = analysis.load_commit_history()
+    if history is not None:
+        if 'author_email' in history.columns:
+            history['author_id'] = resolver.author_ids(resolver.git_row_keys(history)).to_numpy()
+        history['commit_type'] = analysis.classify_commit_types(history['message']).to_numpy()
+        history['message_cluster'] = cluster_messages(history['message']).to_numpy()
+        linker = CommitIssueLinker(history)
+        history['has_issue'] = linker.has_reference().to_numpy()
+        history.to_csv(f'{NORMALIZED_DIR}/commits_history.csv', index=False, encoding='utf-8-sig')
+        linker.link_table().to_csv(f'{NORMALIZED_DIR}/issue_links.csv', index=False, encoding='utf-8-sig')
+
+    for name in ['commits_full', 'contributors']:
+        if name in frames:
+            frames[name].to_csv(f'{NORMALIZED_DIR}/{name}.csv', index=False, encoding='utf-8-sig')
+
+
+def aggregate():
+    """汇总核心指标，供报告阶段使用"""
+    os.makedirs(AGGREGATES_DIR, exist_ok=True)
+    summary: Dict[str, object] = {}
+
+    history_path = f'{NORMALIZED_DIR}/commits_history.csv'
+    if os.path.exists(history_path):
+        history = pd.read_csv(history_path, parse_dates=['date'])
+        author_col = 'author_id' if 'author_id' in history.columns else 'author'
+        types = history['commit_type'].value_counts()
+        bugfix = (history['commit_type'] == 'Bug Fix').groupby(history['date'].dt.year).mean() * 100
+        summary['history'] = {
+            '总提交数': int(len(history)),
+            '唯一作者数': int(history[author_col].nunique()),
+            '时间范围': [str(history['date'].min().date()), str(history['date'].max().date())],
+            '提交类型': {k: int(v) for k, v in types.items()},
+            'Bug Fix占比': {int(k): round(float(v), 1) for k, v in bugfix.items()},
+            'Issue相关提交': int(history['has_issue'].sum()),
+        }
+
+    contributors_path = f'{NORMALIZED_DIR}/contributors.csv'
+    if os.path.exists(contributors_path):
+        contributors = pd.read_csv(contributors_path)
+        counts = contributors['贡献次数'].sort_values(ascending=False)
+        cumulative = counts.cumsum() / counts.sum() * 100
+        summary['contributors'] = {
+            '贡献者数': int(len(contributors)),
+            '归并后贡献者数': int(contributors['author_id'].nunique()),
+            '贡献80%的人数': int((cumulative <= 80).sum()),
+        }
+
+    with open(f'{AGGREGATES_DIR}/summary.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+def render():
+    from render_report import render_report
+
+    render_report(data_path=DATA_PATH)
+
+
+def report():
+    """把汇总指标写入 REPORT.md 的自动维护区块"""
+    with open(f'{AGGREGATES_DIR}/summary.json', 'r', encoding='utf-8') as f:
+        summary = json.load(f)
+
+    lines = [REPORT_BLOCK_START, '', '### 自动生成指标', '']
+    history = summary.get('history')
+    if history:
+        lines.append(f"- 总提交数：{history['总提交数']:,}（{history['时间范围'][0]} 至 {history['时间范围'][1]}）")
+        lines.append(f"- 唯一作者数（身份归并后）：{history['唯一作者数']:,}")
+        lines.append(f"- Issue 相关提交：{history['Issue相关提交']:,}")
+        total = max(history['总提交数'], 1)
+        for commit_type, count in history['提交类型'].items():
+            lines.append(f"  - {commit_type}：{count}（{count / total * 100:.1f}%）")
+    contributors = summary.get('contributors')
+    if contributors:
+        lines.append(f"- 贡献者：{contributors['贡献者数']}，贡献 80% 的人数：{contributors['贡献80%的人数']}")
+    lines.extend(['', REPORT_BLOCK_END])
+    block = '\n'.join(lines)
+
+    with open(REPORT_FILE, 'r', encoding='utf-8') as f:
+        content = f.read()
+    start = content.find(REPORT_BLOCK_START)
+    end = content.find(REPORT_BLOCK_END)
+    if start != -1 and end != -1:
+        content = content[:start] + block + content[end + len(REPORT_BLOCK_END):]
+    else:
+        content = content.rstrip('\n') + '\n\n' + block + '\n'
+    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def build_stages() -> List[Stage]:
+    return [
+        Stage('crawl', crawl,
+              inputs=['cyxcode.py'],
+              outputs=[f'{DATA_PATH}/*.csv'],
+              manual=True),
+        Stage('enrich', enrich,
+              inputs=[f'{DATA_PATH}/*.csv', 'pr_enrichment.py'],
+              outputs=[f'{ENRICH_DIR}/*.csv'],
+              explicit=True, requires_env=['GITHUB_TOKEN']),
+        Stage('git-extract', git_extract,
+              inputs=['run.py'],
+              outputs=['vscode_commit_history.csv'],
+              fingerprint=git_head_fingerprint),
+        Stage('normalize', normalize,
+              inputs=[f'{DATA_PATH}/*.csv', 'vscode_commit_history.csv', 'commits_massive.csv',
+                      'identity.py', 'issue_linker.py', 'message_clusters.py', 'analysis.py'],
+              outputs=[f'{NORMALIZED_DIR}/*.csv']),
+        Stage('aggregate', aggregate,
+              inputs=[f'{NORMALIZED_DIR}/*.csv'],
+              outputs=[f'{AGGREGATES_DIR}/summary.json']),
+        Stage('render', render,
+              inputs=[f'{DATA_PATH}/*.csv', 'vscode_commit_history.csv', 'commits_massive.csv',
+                      'analysis.py', 'render_report.py'],
+              outputs=['report_images/*.svg']),
+        Stage('report', report,
+              inputs=[f'{AGGREGATES_DIR}/summary.json', 'report_images/*.svg'],
+              outputs=[REPORT_FILE]),
+    ]
+
+
+class Pipeline:
+    """
+    依赖感知的构建流水线
+    输入哈希未变且输出存在的阶段直接跳过，互不依赖的阶段并行执行
+    """
+
+    def __init__(self, stages: List[Stage], state_file: str = STATE_FILE):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = state_file
+        self.state = self._load_state()
+        self.deps = self._infer_dependencies()
+        self.timings: Dict[str, float] = {}
+        self.status: Dict[str, str] = {}
+
+    def _load_state(self) -> Dict[str, str]:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_state(self):
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+
+    def _infer_dependencies(self) -> Dict[str, List[str]]:
+        """某阶段的输入与另一阶段的输出相同，则后者是前者的上游"""
+        deps: Dict[str, List[str]] = {}
+        for name, stage in self.stages.items():
+            deps[name] = [other.name for other in self.stages.values()
+                          if other.name != name and set(other.outputs) & set(stage.inputs)]
+        return deps
+
+    def _with_upstream(self, targets: List[str]) -> List[str]:
+        selected, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.deps[name])
+        return [name for name in self.stages if name in selected]
+
+    def _run_stage(self, stage: Stage, force: bool) -> str:
+        start = time.perf_counter()
+        try:
+            missing = [name for name in stage.requires_env if not os.environ.get(name)]
+            if missing:
+                print(f"  ⚠️  {stage.name}: 未设置 {', '.join(missing)}，跳过")
+                return 'unavailable'
+            if not force and stage.manual and stage.outputs_exist():
+                return 'skipped'
+            key = stage.input_hash()
+            if not force and self.state.get(stage.name) == key and stage.outputs_exist():
+                return 'skipped'
+            stage.action()
+            self.state[stage.name] = key
+            return 'ran'
+        finally:
+            self.timings[stage.name] = time.perf_counter() - start
+
+    def run(self, targets: Optional[List[str]] = None, force: Optional[List[str]] = None,
+            workers: int = 4) -> Dict[str, str]:
+        defaults = [name for name, stage in self.stages.items() if not stage.explicit]
+        names = self._with_upstream(targets or defaults)
+        force = set(force or [])
+        remaining = set(names)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while remaining or running:
+                active = set(running.values())
+                ready = [name for name in names if name in remaining
+                         and all(dep not in remaining and dep not in active for dep in self.deps[name])]
+                for name in ready:
+                    failed_upstream = [dep for dep in self.deps[name] if self.status.get(dep) == 'failed']
+                    remaining.discard(name)
+                    if failed_upstream:
+                        self.status[name] = 'failed'
+                        print(f"  ⏭️  {name}: 上游失败 ({', '.join(failed_upstream)})")
+                        continue
+                    print(f"  ▶️  {name}")
+                    running[pool.submit(self._run_stage, self.stages[name], name in force)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.status[name] = future.result()
+                    except Exception as e:
+                        self.status[name] = 'failed'
+                        print(f"  ❌ {name}: {type(e).__name__}: {e}")
+                    else:
+                        icon = {'ran': '✅', 'skipped': '💤', 'unavailable': '⏭️ '}[self.status[name]]
+                        print(f"  {icon} {name} ({self.timings[name]:.2f}s)")
+                self._save_state()
+
+        return self.status
+
+    def print_summary(self):
+        print(f"\n{'=' * 60}")
+        print("⏱️  阶段耗时")
+        print("=" * 60)
+        labels = {'ran': '执行', 'skipped': '跳过（未变化）', 'unavailable': '跳过（缺少配置）', 'failed': '失败'}
+        for name in self.stages:
+            if name in self.status:
+                print(f"  {name:<12} {labels[self.status[name]]:<10} {self.timings.get(name, 0.0):8.2f}s")
+        print(f"  {'合计':<12} {'':<10} {sum(self.timings.values()):8.2f}s")
+
+
+def main():
+    """主函数"""
+    stages = build_stages()
+    parser = argparse.ArgumentParser(description='报告构建流水线')
+    explicit = ', '.join(s.name for s in stages if s.explicit)
+    parser.add_argument('targets', nargs='*',
+                        help=f"目标阶段（含上游）：{', '.join(s.name for s in stages)}；默认除 {explicit} 外全部")
+    parser.add_argument('--force', nargs='*', default=[], help='强制重新执行的阶段（如 crawl）')
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    known = {stage.name for stage in stages}
+    unknown = [name for name in args.targets + args.force if name not in known]
+    if unknown:
+        parser.error(f"未知阶段: {', '.join(unknown)}")
+
+    print("🚀 报告构建流水线")
+    print("=" * 60)
+    pipeline = Pipeline(stages)
+    pipeline.run(args.targets or None, args.force, args.workers)
+    pipeline.print_summary()
+
+
+if __name__ == "__main__":
+    main()
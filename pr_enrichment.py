@@ -0,0 +1,266 @@
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+import os
+
+from field_schema import EndpointSchema, Field, safe_len
+from record_store import RecordStore
+
+
+DATA_PATH = 'vscode_massive_data'
+ENRICH_DIR = f'{DATA_PATH}/enrichment'
+STATE_FILE = 'enrichment_state.json'
+
+# 每个 PR 需要的子资源；Issue 只取时间线
+PR_RESOURCES = [('reviews', 'pulls', 'reviews'), ('review_comments', 'pulls', 'comments'),
+                ('timeline', 'issues', 'timeline')]
+ISSUE_RESOURCES = [('timeline', 'issues', 'timeline')]
+
+
+def _actor(event: Dict) -> str:
+    """时间线事件的操作者：commented/reviewed 事件在 user 字段，其余在 actor 字段"""
+    person = event.get('actor') or event.get('user')
+    return person.get('login') or '' if isinstance(person, dict) else ''
+
+
+def _id(value) -> str:
+    return '' if value is None or value == '' else str(value)
+
+
+# 规范化事件表：每条子资源记录包装为 {'number': 编号, 'item': 原始记录}
+TABLES = {
+    'reviews': EndpointSchema([
+        Field("编号", 'number', 0, kind='int'),
+        Field("审阅ID", 'item.id', '', convert=_id),
+        Field("审阅者", 'item.user.login', kind='category'),
+        Field("状态", 'item.state', kind='category'),
+        Field("提交时间", 'item.submitted_at'),
+        Field("关联提交", 'item.commit_id'),
+        Field("正文长度", 'item.body', convert=safe_len, kind='int'),
+    ]),
+    'review_comments': EndpointSchema([
+        Field("编号", 'number', 0, kind='int'),
+        Field("评论ID", 'item.id', '', convert=_id),
+        Field("审阅ID", 'item.pull_request_review_id', '', convert=_id),
+        Field("回复ID", 'item.in_reply_to_id', '', convert=_id),
+        Field("评论者", 'item.user.login', kind='category'),
+        Field("文件路径", 'item.path', kind='category'),
+        Field("创建时间", 'item.created_at'),
+    ]),
+    'timeline': EndpointSchema([
+        Field("编号", 'number', 0, kind='int'),
+        Field("事件", 'item.event', kind='category'),
+        Field("操作者", 'item', {}, convert=_actor, kind='category'),
+        Field("时间", 'item', {}, convert=lambda e: e.get('created_at') or e.get('submitted_at') or ''),
+        Field("标签", 'item.label.name', kind='category'),
+        Field("被指派人", 'item.assignee.login', kind='category'),
+        Field("请求审阅者", 'item.requested_reviewer.login', kind='category'),
+        Field("审阅状态", 'item.state', kind='category'),
+    ]),
+}
+TABLE_FILES = {'reviews': 'pr_reviews.csv', 'review_comments': 'pr_review_comments.csv',
+               'timeline': 'issue_timeline.csv'}
+
+
+class ReviewEnricher:
+    """
+    PR 审阅 / Issue 时间线补充抓取
+    有界线程池并发抓取每个条目的子资源，请求经过爬虫的共享配额（crawler.rate_budget）；
+    与上次补充时 updated_at 相同的条目直接跳过，重新抓取的条目在事件表中整体替换
+    """
+
+    def __init__(self, crawler, output_dir: str = ENRICH_DIR, workers: int = 8):
+        self.crawler = crawler
+        self.output_dir = output_dir
+        self.workers = workers
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        self.state: Dict[str, str] = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        self.stats = {'items': 0, 'skipped': 0, 'enriched': 0, 'failed': 0, 'requests': 0}
+
+    def _fetch_all(self, url: str) -> Tuple[Optional[List[Dict]], int]:
+        """按页取完一个子资源，返回 (条目, 请求数)；任一页失败时条目为 None"""
+        results: List[Dict] = []
+        page = 1
+        while True:
+            data = self.crawler._make_request_safe(url, {"per_page": 100, "page": page})
+            if data is None or not isinstance(data, list):
+                return None, page
+            results.extend(item for item in data if isinstance(item, dict))
+            if len(data) < 100:
+                return results, page
+            page += 1
+
+    def _enrich_one(self, number: int, is_pr: bool) -> Tuple[int, Optional[Dict[str, List[Dict]]], int]:
+        """在工作线程中抓取一个条目的全部子资源（不写任何共享状态）"""
+        resources = PR_RESOURCES if is_pr else ISSUE_RESOURCES
+        fetched: Dict[str, List[Dict]] = {}
+        requests = 0
+        for table, kind, path in resources:
+            items, count = self._fetch_all(f"{self.crawler.base_url}/{kind}/{number}/{path}")
+            requests += count
+            if items is None:
+                return number, None, requests
+            fetched[table] = items
+        return number, fetched, requests
+
+    def pending(self, items: Iterable[Tuple[int, str, bool]]) -> List[Tuple[int, str, bool]]:
+        """(编号, 更新时间, 是否 PR) -> 需要重新补充的条目"""
+        todo = []
+        for number, updated_at, is_pr in items:
+            self.stats['items'] += 1
+            if self.state.get(str(number)) == updated_at:
+                self.stats['skipped'] += 1
+                continue
+            todo.append((number, updated_at, is_pr))
+        return todo
+
+    def run(self, items: Iterable[Tuple[int, str, bool]]) -> Dict[str, RecordStore]:
+        todo = self.pending(items)
+        print(f"🔍 补充审阅/时间线：{len(todo)} 个条目待抓取，{self.stats['skipped']} 个未变化已跳过")
+
+        stores = {name: schema.new_store() for name, schema in TABLES.items()}
+        refreshed: Dict[int, str] = {}
+        queue = iter(todo)
+        updated = {number: updated_at for number, updated_at, _ in todo}
+
+        # 最多 workers * 2 个任务在途，避免一次性提交全部条目
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = set()
+            for number, _, is_pr in queue:
+                running.add(pool.submit(self._enrich_one, number, is_pr))
+                if len(running) >= self.workers * 2:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    self._collect(done, stores, refreshed, updated)
+            done, _ = wait(running)
+            self._collect(done, stores, refreshed, updated)
+
+        self._write(stores, refreshed)
+        return stores
+
+    def _collect(self, done, stores: Dict[str, RecordStore], refreshed: Dict[int, str], updated: Dict[int, str]):
+        for future in done:
+            number, fetched, requests = future.result()
+            self.stats['requests'] += requests
+            if fetched is None:
+                self.stats['failed'] += 1
+                continue
+            for table, items in fetched.items():
+                for item in items:
+                    stores[table].write({'number': number, 'item': item})
+            refreshed[number] = updated[number]
+            self.stats['enriched'] += 1
+            if self.stats['enriched'] % 50 == 0:
+                print(f"  已补充 {self.stats['enriched']} 个条目...")
+
+    def _write(self, stores: Dict[str, RecordStore], refreshed: Dict[int, str]):
+        """按编号 upsert 到事件表，并更新 updated_at 检查点"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        for name, store in stores.items():
+            path = os.path.join(self.output_dir, TABLE_FILES[name])
+            frame = store.to_dataframe(categorical=False)
+            if os.path.exists(path):
+                existing = pd.read_csv(path, keep_default_na=False, encoding='utf-8-sig')
+                existing = existing[~existing['编号'].isin(list(refreshed))]
+                frame = pd.concat([existing, frame], ignore_index=True)
+            frame.to_csv(path, index=False, encoding='utf-8-sig')
+            print(f"  ✅ {path}: {len(frame):,} 行（本次新增 {len(store):,}）")
+
+        self.state.update({str(number): updated_at for number, updated_at in refreshed.items()})
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+
+
+def load_items(data_path: str = DATA_PATH) -> List[Tuple[int, str, bool]]:
+    """从导出的 Issue / PR CSV 读取 (编号, 更新时间, 是否 PR)"""
+    # Issue 与 PR 共用编号空间；同一编号出现在两个文件中时按 PR 处理（后读取的 PR 覆盖）
+    items: Dict[int, Tuple[int, str, bool]] = {}
+    for filename in ('3_issues_open.csv', '4_prs_open.csv'):
+        path = os.path.join(data_path, filename)
+        if not os.path.exists(path):
+            continue
+        df = pd.read_csv(path, keep_default_na=False, encoding='utf-8-sig')
+        for number, updated_at, kind in zip(df['编号'], df['更新时间'], df['类型']):
+            items[int(number)] = (int(number), str(updated_at), kind == 'PR')
+    return list(items.values())
+
+
+def review_metrics(output_dir: str = ENRICH_DIR, data_path: str = DATA_PATH) -> Dict[str, pd.DataFrame]:
+    """首次审阅耗时、审阅者负载、重开次数"""
+    result: Dict[str, pd.DataFrame] = {}
+    reviews_path = os.path.join(output_dir, TABLE_FILES['reviews'])
+    prs_path = os.path.join(data_path, '4_prs_open.csv')
+    if os.path.exists(reviews_path) and os.path.exists(prs_path):
+        reviews = pd.read_csv(reviews_path, keep_default_na=False, encoding='utf-8-sig')
+        prs = pd.read_csv(prs_path, keep_default_na=False, encoding='utf-8-sig')
+        submitted = pd.to_datetime(reviews['提交时间'], errors='coerce', utc=True)
+        first = submitted.groupby(reviews['编号']).min().rename('首次审阅时间')
+        created = pd.to_datetime(prs.set_index('编号')['创建时间'], errors='coerce', utc=True)
+        joined = first.to_frame().join(created.rename('创建时间'), how='inner')
+        joined['首次审阅耗时(小时)'] = (joined['首次审阅时间'] - joined['创建时间']).dt.total_seconds() / 3600
+        result['time_to_first_review'] = joined.reset_index()
+        result['reviewer_load'] = (reviews.groupby('审阅者')
+                                   .agg(审阅次数=('编号', 'size'), 审阅PR数=('编号', 'nunique'))
+                                   .sort_values('审阅次数', ascending=False).reset_index())
+
+    timeline_path = os.path.join(output_dir, TABLE_FILES['timeline'])
+    if os.path.exists(timeline_path):
+        timeline = pd.read_csv(timeline_path, keep_default_na=False, encoding='utf-8-sig')
+        reopened = timeline[timeline['事件'] == 'reopened'].groupby('编号').size()
+        result['reopen_cycles'] = reopened.rename('重开次数').reset_index()
+    return result
+
+
+def main():
+    """主函数"""
+    from cyxcode import MaxDataVSCodeCrawler
+
+    parser = argparse.ArgumentParser(description='PR 审阅 / Issue 时间线补充抓取')
+    parser.add_argument('--data', default=DATA_PATH, help='爬虫导出目录（读取 3_issues_open.csv / 4_prs_open.csv）')
+    parser.add_argument('--output', default=None, help=f'事件表输出目录（默认 {{data}}/enrichment）')
+    parser.add_argument('--workers', type=int, default=8, help='并发线程数')
+    parser.add_argument('--limit', type=int, default=None, help='最多处理的条目数')
+    parser.add_argument('--base-url', default="https://api.github.com/repos/microsoft/vscode")
+    args = parser.parse_args()
+
+    crawler = MaxDataVSCodeCrawler(github_token=os.environ.get('GITHUB_TOKEN', ''), base_url=args.base_url)
+    crawler.page_delay_scale = 0
+    enricher = ReviewEnricher(crawler, args.output or os.path.join(args.data, 'enrichment'), args.workers)
+
+    items = load_items(args.data)
+    if args.limit:
+        items = items[:args.limit]
+    if not items:
+        print(f"❌ 未找到 Issue/PR 导出：{args.data}")
+        return
+
+    start = datetime.now()
+    enricher.run(items)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    print("\n" + "=" * 60)
+    print("📊 补充抓取总结")
+    print("=" * 60)
+    stats = enricher.stats
+    print(f"条目 {stats['items']:,} | 跳过 {stats['skipped']:,} | 补充 {stats['enriched']:,} | "
+          f"失败 {stats['failed']:,} | 请求 {stats['requests']:,} | 耗时 {elapsed:.1f}s")
+    crawler.metrics.progress(force=True)
+
+    metrics = review_metrics(enricher.output_dir, args.data)
+    if 'time_to_first_review' in metrics and len(metrics['time_to_first_review']):
+        hours = metrics['time_to_first_review']['首次审阅耗时(小时)']
+        print(f"⏱️  首次审阅耗时中位数: {hours.median():.1f} 小时（{len(hours)} 个 PR）")
+    if 'reviewer_load' in metrics:
+        print(f"👥 审阅者: {len(metrics['reviewer_load'])} 人，前 3：" +
+              ', '.join(f"{r.审阅者}({r.审阅次数})" for r in metrics['reviewer_load'].head(3).itertuples()))
+    if 'reopen_cycles' in metrics:
+        print(f"🔁 被重开过的条目: {len(metrics['reopen_cycles'])} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import cProfile
+import contextlib
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+class StageProfiler:
+    """
+    阶段级计时器
+    按阶段累计耗时和调用次数，并按固定间隔记录吞吐（提交/秒）；
+    enabled=False 时 stage() 直接返回空上下文，几乎没有开销
+    """
+
+    def __init__(self, enabled: bool = True, sample_every: int = 100):
+        self.enabled = enabled
+        self.sample_every = sample_every
+        self.totals: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.order: List[str] = []
+        # (已用秒数, 已处理提交数)
+        self.throughput: List[Tuple[float, int]] = []
+        self.started = time.perf_counter()
+        self._null = contextlib.nullcontext()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return self._null
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float, calls: int = 1):
+        if not self.enabled:
+            return
+        if name not in self.totals:
+            self.order.append(name)
+            self.totals[name] = 0.0
+            self.calls[name] = 0
+        self.totals[name] += seconds
+        self.calls[name] += calls
+
+    def timed_iter(self, name: str, iterable):
+        """计时迭代器本身（每次 next() 的耗时计入 name）"""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - start, calls=0)
+                return
+            self.add(name, time.perf_counter() - start)
+            yield item
+
+    def tick(self, count: int):
+        """记录吞吐采样点"""
+        if self.enabled and count % self.sample_every == 0:
+            self.throughput.append((time.perf_counter() - self.started, count))
+
+    def print_summary(self, commit_count: Optional[int] = None):
+        if not self.enabled:
+            return
+        wall = time.perf_counter() - self.started
+        print("\n⏱️  阶段耗时")
+        print("=" * 60)
+        print(f"{'阶段':<22}{'调用':>10}{'累计(s)':>10}{'平均(ms)':>10}{'占比':>8}")
+        print("-" * 60)
+        for name in self.order:
+            total, calls = self.totals[name], self.calls[name]
+            avg = total / calls * 1000 if calls else 0.0
+            share = total / wall * 100 if wall > 0 else 0.0
+            print(f"{name:<22}{calls:>10,}{total:>10.3f}{avg:>10.3f}{share:>7.1f}%")
+        print("-" * 60)
+        print(f"{'总耗时':<22}{'':>10}{wall:>10.3f}")
+
+        if commit_count:
+            print(f"\n📈 平均吞吐: {commit_count / wall:.1f} 提交/秒")
+        if len(self.throughput) > 1:
+            # 最多显示 10 个区间，观察吞吐是否随历史变深而下降
+            step = max(1, -(-len(self.throughput) // 10))
+            points = [(0.0, 0)] + self.throughput[step - 1::step]
+            if points[-1] != self.throughput[-1]:
+                points.append(self.throughput[-1])
+            print(f"{'提交数':>12}{'区间 提交/秒':>16}")
+            for (t0, c0), (t1, c1) in zip(points, points[1:]):
+                rate = (c1 - c0) / (t1 - t0) if t1 > t0 else 0.0
+                print(f"{c1:>12,}{rate:>16.1f}")
+
+
+class StackSampler:
+    """
+    采样分析器
+    后台线程按固定间隔抓取目标线程的调用栈，输出 folded stacks 格式
+    （可直接交给 flamegraph.pl / speedscope）
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextlib.contextmanager
+def profile_run(cprofile_path: Optional[str] = None, sample_path: Optional[str] = None,
+                sample_interval: float = 0.005):
+    """按需开启 cProfile 和/或采样分析，结束时写出结果"""
+    profiler = cProfile.Profile() if cprofile_path else None
+    sampler = StackSampler(sample_interval) if sample_path else None
+    if sampler:
+        sampler.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+            print(f"\n📁 cProfile 结果: {cprofile_path}（python -m pstats {cprofile_path}）")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+        if sampler:
+            sampler.stop()
+            sampler.write(sample_path)
+            print(f"📁 采样结果（folded stacks）: {sample_path}，共 {sum(sampler.samples.values())} 个样本")
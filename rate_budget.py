@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class RateBudget:
+    """
+    多个线程 / 抓取阶段共享的 API 配额
+    acquire() 在发请求前调用：剩余配额低于 reserve 时阻塞到重置时间，限流暂停期间所有线程一起等待；
+    update() 用响应头校正剩余配额（同一重置窗口内取较小值，避免并发响应乱序把配额调高）；
+    core 与 search 是两份独立配额，响应头 X-RateLimit-Resource 与 resource 不符时忽略
+    """
+
+    def __init__(self, reserve: int = 50, resource: str = 'core'):
+        self.reserve = reserve
+        self.resource = resource
+        self.cond = threading.Condition()
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset_at = 0.0
+        self.paused_until = 0.0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self) -> float:
+        """取得一次请求配额，返回等待的秒数"""
+        start = time.time()
+        blocked = False
+        with self.cond:
+            while True:
+                now = time.time()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.remaining is not None and self.remaining <= self.reserve and now < self.reset_at:
+                    delay = self.reset_at - now
+                else:
+                    if self.remaining is not None:
+                        if now >= self.reset_at and self.remaining <= self.reserve:
+                            # 已过重置时间但还没有新的响应头：按配额已恢复放行，下一个响应头会校正
+                            self.remaining = max(self.limit or 0, self.reserve + 1)
+                        self.remaining -= 1
+                    break
+                blocked = True
+                self.cond.wait(min(delay, 5.0))
+            waited = time.time() - start if blocked else 0.0
+            if blocked:
+                self.waits += 1
+                self.wait_seconds += waited
+        return waited
+
+    def update(self, headers: Dict[str, str]):
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        limit = headers.get('X-RateLimit-Limit')
+        if remaining is None or not str(remaining).isdigit():
+            return
+        if headers.get('X-RateLimit-Resource', self.resource) != self.resource:
+            return
+        with self.cond:
+            reset_at = float(reset) if reset and str(reset).isdigit() else self.reset_at
+            if reset_at == self.reset_at and self.remaining is not None:
+                self.remaining = min(self.remaining, int(remaining))
+            else:
+                self.remaining = int(remaining)
+                self.reset_at = reset_at
+            if limit and str(limit).isdigit():
+                self.limit = int(limit)
+            self.cond.notify_all()
+
+    def pause(self, seconds: float):
+        """触发限流（403/429）后让所有共享该预算的线程暂停"""
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+            self.cond.notify_all()
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        with self.cond:
+            return {'remaining': self.remaining, 'limit': self.limit, 'reset_at': self.reset_at,
+                    'waits': self.waits, 'wait_seconds': round(self.wait_seconds, 3)}
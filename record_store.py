@@ -0,0 +1,267 @@
+import json
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# 列类型：
+#   text      原样保存的字符串（提交信息、SHA 等几乎不重复的值）
+#   category  字典编码字符串（作者、邮箱、状态等大量重复的值），列中只存 int32 编码
+#   int/float/bool  定长数值数组
+#   datetime  int64 秒（本地墙钟时间），输出时按 fmt 格式化
+#   strlist   字符串列表（修改的文件路径），路径字典编码 + CSR 偏移；输出时取前 limit 个用 sep 拼接
+#   rownum    派生列：1..n 的序号，不占存储
+#   page / page_time  派生列：由 begin_page() 记录的每页页码和获取时间展开，每页只存一次
+STORED_KINDS = {'text', 'category', 'int', 'float', 'bool', 'datetime', 'strlist'}
+DERIVED_KINDS = {'rownum', 'page', 'page_time'}
+ARRAY_TYPES = {'category': 'i', 'int': 'q', 'float': 'd', 'bool': 'b', 'datetime': 'q'}
+
+
+def pack_strings(values: Sequence[str]):
+    """UTF-8 拼接 + 偏移量，便于不用 pickle 写入 .npz"""
+    encoded = [v.encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    raw = blob.tobytes()
+    bounds = offsets.tolist()
+    return [raw[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+
+
+class Column:
+    """列定义"""
+    __slots__ = ('name', 'kind', 'fmt', 'limit', 'sep')
+
+    def __init__(self, name: str, kind: str, fmt: str = '%Y-%m-%d %H:%M:%S',
+                 limit: Optional[int] = None, sep: str = ', '):
+        if kind not in STORED_KINDS and kind not in DERIVED_KINDS:
+            raise ValueError(f"未知列类型: {kind}")
+        self.name = name
+        self.kind = kind
+        self.fmt = fmt
+        self.limit = limit
+        self.sep = sep
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'kind': self.kind, 'fmt': self.fmt, 'limit': self.limit, 'sep': self.sep}
+
+
+class StringPool:
+    """字符串字典：相同字符串只保存一份"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = list(values)
+        self.codes: Dict[str, int] = {v: i for i, v in enumerate(self.values)}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class RecordStore:
+    """
+    列式记录存储
+    按列追加到 array/list 中，不为每条记录创建 dict；重复字符串字典编码，
+    每页共享的页码和获取时间只记录一次。可直接转 DataFrame、写 CSV 或 .npz 列式文件
+    """
+
+    def __init__(self, columns: Sequence[Column]):
+        self.columns = list(columns)
+        self.names = [c.name for c in self.columns]
+        self.stored = [c for c in self.columns if c.kind in STORED_KINDS]
+        self.data: Dict[str, Any] = {}
+        self.pools: Dict[str, StringPool] = {}
+        self.offsets: Dict[str, array] = {}
+        self.page_starts = array('q')
+        self.page_numbers = array('q')
+        self.page_times: List[str] = []
+        self._count = 0
+
+        for column in self.stored:
+            if column.kind == 'text':
+                self.data[column.name] = []
+            elif column.kind == 'strlist':
+                self.data[column.name] = array('i')
+                self.offsets[column.name] = array('q', [0])
+            else:
+                self.data[column.name] = array(ARRAY_TYPES[column.kind])
+            if column.kind in ('category', 'strlist'):
+                self.pools[column.name] = StringPool()
+        self._bind_appenders()
+
+    def _bind_appenders(self):
+        """为每个存储列预先绑定追加函数，append() 时只做一次 zip 循环"""
+        self._appenders = []
+        for column in self.stored:
+            store = self.data[column.name]
+            if column.kind == 'strlist':
+                def append_list(values, codes=store, offsets=self.offsets[column.name],
+                                encode=self.pools[column.name].encode):
+                    codes.extend([encode(v) for v in values])
+                    offsets.append(len(codes))
+                self._appenders.append(append_list)
+            elif column.kind == 'category':
+                self._appenders.append(
+                    lambda value, append=store.append, encode=self.pools[column.name].encode: append(encode(value)))
+            else:
+                self._appenders.append(store.append)
+
+    def begin_page(self, page: int, fetched_at: Optional[str] = None):
+        """标记新的一页：之后追加的记录共享该页码和获取时间"""
+        self.page_starts.append(self._count)
+        self.page_numbers.append(page)
+        self.page_times.append(fetched_at or datetime.now().isoformat())
+
+    def append(self, *values):
+        """按 stored 列的顺序追加一条记录"""
+        for append, value in zip(self._appenders, values):
+            append(value)
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def _page_index(self) -> np.ndarray:
+        starts = np.frombuffer(self.page_starts, dtype=np.int64) if self.page_starts else np.zeros(1, dtype=np.int64)
+        counts = np.diff(np.append(starts, self._count))
+        return np.repeat(np.arange(len(starts)), counts)
+
+    def column(self, name: str, categorical: bool = True):
+        """单列输出为 numpy 数组（category 列可输出 pandas.Categorical）"""
+        column = self.columns[self.names.index(name)]
+        kind = column.kind
+        if kind == 'rownum':
+            return np.arange(1, self._count + 1)
+        if kind == 'page':
+            numbers = np.frombuffer(self.page_numbers, dtype=np.int64) if self.page_numbers else np.zeros(1, dtype=np.int64)
+            return numbers[self._page_index()]
+        if kind == 'page_time':
+            times = np.array(self.page_times or [''], dtype=object)
+            return times[self._page_index()]
+        if kind == 'text':
+            return np.array(self.data[name], dtype=object)
+        if kind == 'category':
+            codes = np.frombuffer(self.data[name], dtype=np.int32)
+            categories = self.pools[name].values
+            if categorical:
+                # 类别不去重排序，保持编码顺序；pools 中的值本身唯一
+                return pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object))
+            return np.array(categories, dtype=object)[codes]
+        if kind == 'datetime':
+            seconds = np.frombuffer(self.data[name], dtype=np.int64)
+            return pd.to_datetime(seconds, unit='s').strftime(column.fmt).to_numpy(dtype=object)
+        if kind == 'strlist':
+            return self._join_lists(column)
+        values = np.frombuffer(self.data[name], dtype=ARRAY_TYPES[kind]).copy()
+        return values.astype(bool) if kind == 'bool' else values
+
+    def _join_lists(self, column: Column) -> np.ndarray:
+        codes = self.data[column.name]
+        offsets = self.offsets[column.name]
+        values = self.pools[column.name].values
+        join = column.sep.join
+        limit = column.limit
+        out = np.empty(self._count, dtype=object)
+        for i in range(self._count):
+            start, end = offsets[i], offsets[i + 1]
+            if limit is not None:
+                end = min(end, start + limit)
+            out[i] = join([values[c] for c in codes[start:end]])
+        return out
+
+    def list_lengths(self, name: str) -> np.ndarray:
+        """strlist 列每条记录的元素个数"""
+        return np.diff(np.frombuffer(self.offsets[name], dtype=np.int64))
+
+    def raw(self, name: str) -> np.ndarray:
+        """datetime/数值/编码列的原始数组（不复制）"""
+        column = self.columns[self.names.index(name)]
+        return np.frombuffer(self.data[name], dtype=ARRAY_TYPES.get(column.kind, 'i'))
+
+    def to_dataframe(self, columns: Optional[Sequence[str]] = None, order: Optional[np.ndarray] = None,
+                     categorical: bool = True) -> pd.DataFrame:
+        """转换为 DataFrame；order 为可选的行顺序（如按时间倒序的 argsort 结果）"""
+        frame = {}
+        for name in columns or self.names:
+            values = self.column(name, categorical)
+            if order is not None:
+                values = values[order]
+            frame[name] = values
+        return pd.DataFrame(frame)
+
+    def write_csv(self, path: str, columns: Optional[Sequence[str]] = None, order: Optional[np.ndarray] = None):
+        self.to_dataframe(columns, order).to_csv(path, index=False, encoding='utf-8-sig')
+
+    def nbytes(self) -> int:
+        """存储占用的近似字节数（text 列按字符串对象估算）"""
+        total = 0
+        for column in self.stored:
+            values = self.data[column.name]
+            if column.kind == 'text':
+                total += sum(len(v) for v in values) + 49 * len(values) + 8 * len(values)
+            else:
+                total += values.itemsize * len(values)
+        for name, offsets in self.offsets.items():
+            total += offsets.itemsize * len(offsets)
+        for pool in self.pools.values():
+            total += sum(len(v) + 49 for v in pool.values)
+        return total
+
+    def save(self, path: str):
+        """写出 .npz 列式文件（不使用 pickle）"""
+        arrays = {'__schema__': np.frombuffer(json.dumps([c.as_dict() for c in self.columns]).encode('utf-8'),
+                                              dtype=np.uint8),
+                  '__count__': np.array([self._count], dtype=np.int64),
+                  '__page_starts__': np.frombuffer(self.page_starts, dtype=np.int64),
+                  '__page_numbers__': np.frombuffer(self.page_numbers, dtype=np.int64)}
+        arrays['__page_times__'], arrays['__page_times_offsets__'] = pack_strings(self.page_times)
+        for column in self.stored:
+            name = column.name
+            if column.kind == 'text':
+                arrays[f'{name}.blob'], arrays[f'{name}.offsets'] = pack_strings(self.data[name])
+            else:
+                arrays[f'{name}.values'] = np.frombuffer(self.data[name], dtype=ARRAY_TYPES.get(column.kind, 'i'))
+            if name in self.pools:
+                arrays[f'{name}.pool'], arrays[f'{name}.pool_offsets'] = pack_strings(self.pools[name].values)
+            if name in self.offsets:
+                arrays[f'{name}.list_offsets'] = np.frombuffer(self.offsets[name], dtype=np.int64)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'RecordStore':
+        with np.load(path) as f:
+            schema = json.loads(f['__schema__'].tobytes().decode('utf-8'))
+            store = cls([Column(**c) for c in schema])
+            store._count = int(f['__count__'][0])
+            store.page_starts = array('q', f['__page_starts__'].tolist())
+            store.page_numbers = array('q', f['__page_numbers__'].tolist())
+            store.page_times = unpack_strings(f['__page_times__'], f['__page_times_offsets__'])
+            for column in store.stored:
+                name = column.name
+                if column.kind == 'text':
+                    store.data[name] = unpack_strings(f[f'{name}.blob'], f[f'{name}.offsets'])
+                else:
+                    store.data[name] = array(ARRAY_TYPES.get(column.kind, 'i'), f[f'{name}.values'].tobytes())
+                if f'{name}.pool' in f:
+                    store.pools[name] = StringPool(unpack_strings(f[f'{name}.pool'], f[f'{name}.pool_offsets']))
+                if f'{name}.list_offsets' in f:
+                    store.offsets[name] = array('q', f[f'{name}.list_offsets'].tobytes())
+        store._bind_appenders()
+        return store
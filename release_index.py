@@ -0,0 +1,287 @@
+import argparse
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+import git
+import numpy as np
+import pandas as pd
+import os
+
+from run import repo_path, resolve_main_branch
+
+
+INDEX_FILE = 'release_index.npz'
+# VS Code 的发布标签形如 1.85.0
+RELEASE_TAG_PATTERN = r'^\d+\.\d+\.\d+$'
+UNRELEASED = -1
+SHA_PREFIX_PATTERN = re.compile(r'[0-9a-fA-F]{1,40}')
+
+
+def list_release_tags(repo: git.Repo, pattern: str = RELEASE_TAG_PATTERN) -> List[Tuple[str, str, int]]:
+    """
+    匹配 pattern 的标签 -> [(标签名, 提交 SHA, 发布时间)]，按发布时间升序
+    附注标签取标签创建时间并解引用到提交，轻量标签取提交时间
+    """
+    regex = re.compile(pattern)
+    output = repo.git.for_each_ref('refs/tags', format='%(refname:short)\t%(objectname)\t%(*objectname)\t%(creatordate:unix)')
+    tags = []
+    for line in output.splitlines():
+        name, obj, peeled, created = line.split('\t')
+        if regex.match(name) and created.isdigit():
+            tags.append((name, peeled or obj, int(created)))
+    tags.sort(key=lambda t: (t[2], t[0]))
+    return tags
+
+
+def _to_binary(shas: Sequence[str]) -> np.ndarray:
+    return np.array([bytes.fromhex(sha) for sha in shas], dtype='S20')
+
+
+def _to_hex(sha: bytes) -> str:
+    # numpy 的 S20 取值会去掉末尾的 \0 字节，还原为 20 字节再转十六进制
+    return bytes(sha).ljust(20, b'\0').hex()
+
+
+class ReleaseIndex:
+    """
+    发布包含索引：每个提交最早被哪个发布标签包含
+    按 git log --topo-order（子提交先于父提交）遍历一次：提交的值 = min(自身标签的发布序号, 各子提交的值)，
+    再下推给父提交；待处理的值只保存在尚未遍历到的父提交上，内存与遍历前沿成正比。
+    结果按二进制 SHA 排序存为定长数组（每个提交 20 字节 SHA + 4 字节发布序号 + 8 字节提交时间），
+    支持短 SHA 前缀查找；出现新标签时只遍历旧标签不可达的部分。
+    """
+
+    def __init__(self, pattern: str = RELEASE_TAG_PATTERN):
+        self.pattern = pattern
+        self.shas = np.empty(0, dtype='S20')
+        self.release = np.empty(0, dtype=np.int32)
+        self.times = np.empty(0, dtype=np.int64)
+        # 发布表：按发布时间升序，下标即发布序号
+        self.tags: List[str] = []
+        self.tag_shas: List[str] = []
+        self.tag_times = np.empty(0, dtype=np.int64)
+        self.head = ''
+
+    def __len__(self) -> int:
+        return len(self.shas)
+
+    # ---------- 构建 ----------
+
+    def _walk(self, repo: git.Repo, include: Sequence[str], exclude: Sequence[str],
+              tag_rank: Dict[str, int]) -> Tuple[List[str], List[int], List[int]]:
+        """一次拓扑序遍历 include 可达、exclude 不可达的提交，返回 (SHA, 提交时间, 最早发布序号)"""
+        args = ['--topo-order', '--format=%H %ct %P', *include]
+        if exclude:
+            args += ['--not', *exclude]
+        shas: List[str] = []
+        times: List[int] = []
+        ranks: List[int] = []
+        pending: Dict[str, int] = {}
+        none = len(self.tags)
+
+        process = repo.git.log(*args, as_process=True)
+        for raw in process.stdout:
+            parts = raw.decode('ascii').split()
+            if not parts:
+                continue
+            sha = parts[0]
+            rank = pending.pop(sha, none)
+            own = tag_rank.get(sha, none)
+            if own < rank:
+                rank = own
+            shas.append(sha)
+            times.append(int(parts[1]))
+            ranks.append(rank if rank < none else UNRELEASED)
+            if rank < none:
+                for parent in parts[2:]:
+                    if pending.get(parent, none) > rank:
+                        pending[parent] = rank
+        process.wait()
+        return shas, times, ranks
+
+    def _merge(self, shas: List[str], times: List[int], ranks: List[int]):
+        """合并遍历结果，同一 SHA 以新结果为准"""
+        new_shas = _to_binary(shas)
+        combined = np.concatenate([self.shas, new_shas])
+        order = np.argsort(combined, kind='stable')
+        ordered = combined[order]
+        # 排序稳定，重复 SHA 中最后一个来自本次遍历
+        keep = np.append(ordered[1:] != ordered[:-1], True)
+        self.shas = ordered[keep]
+        self.release = np.concatenate([self.release, np.array(ranks, dtype=np.int32)])[order][keep]
+        self.times = np.concatenate([self.times, np.array(times, dtype=np.int64)])[order][keep]
+
+    def update(self, repo: git.Repo, branch: str) -> Dict[str, int]:
+        """
+        同步到仓库当前状态：没有新标签且分支未移动时不做任何事；
+        新标签都晚于已有标签时增量遍历（旧标签可达的提交结论不变），否则全量重建
+        """
+        tags = list_release_tags(repo, self.pattern)
+        head = repo.commit(branch).hexsha
+        known = dict(zip(self.tags, self.tag_shas))
+        added = [t for t in tags if t[0] not in known]
+        moved = any(known.get(name, sha) != sha for name, sha, _ in tags)
+        removed = len(known) > len(tags) - len(added)
+        last_time = int(self.tag_times[-1]) if len(self.tag_times) else None
+        incremental = (len(self) > 0 and not moved and not removed
+                       and all(last_time is None or t[2] >= last_time for t in added))
+
+        if incremental and not added and head == self.head:
+            return {'mode': 'unchanged', 'new_tags': 0, 'walked': 0}
+
+        if incremental:
+            exclude = list(self.tag_shas)
+            self.tags += [t[0] for t in added]
+            self.tag_shas += [t[1] for t in added]
+            self.tag_times = np.concatenate([self.tag_times, np.array([t[2] for t in added], dtype=np.int64)])
+        else:
+            exclude = []
+            self.__init__(self.pattern)
+            self.tags = [t[0] for t in tags]
+            self.tag_shas = [t[1] for t in tags]
+            self.tag_times = np.array([t[2] for t in tags], dtype=np.int64)
+
+        # 同一提交上有多个标签时取最早的发布
+        tag_rank: Dict[str, int] = {}
+        for rank, sha in enumerate(self.tag_shas):
+            tag_rank.setdefault(sha, rank)
+        include = [head] + [t[1] for t in (added if incremental else tags)]
+        shas, times, ranks = self._walk(repo, include, exclude, tag_rank)
+        self._merge(shas, times, ranks)
+        self.head = head
+        return {'mode': 'incremental' if incremental else 'rebuild', 'new_tags': len(added), 'walked': len(shas)}
+
+    # ---------- 查询 ----------
+
+    def lookup(self, prefixes: Iterable[str]) -> np.ndarray:
+        """SHA（或等长的短 SHA 前缀）-> 最早发布序号；未收录、前缀有歧义、不是十六进制或未发布为 -1"""
+        prefixes = list(prefixes)
+        result = np.full(len(prefixes), UNRELEASED, dtype=np.int32)
+        valid = [i for i, p in enumerate(prefixes) if isinstance(p, str) and SHA_PREFIX_PATTERN.fullmatch(p)]
+        if not valid or not len(self):
+            return result
+        # 前缀按整字节比较；奇数长度的最后半个字节单独检查
+        even = [prefixes[i][:len(prefixes[i]) // 2 * 2] for i in valid]
+        keys = np.array([bytes.fromhex(p) for p in even], dtype='S20')
+        upper = np.array([bytes.fromhex(p) + b'\xff' * (20 - len(p) // 2) for p in even], dtype='S20')
+        lo = np.searchsorted(self.shas, keys, side='left')
+        hi = np.searchsorted(self.shas, upper, side='right')
+        for k in np.flatnonzero(hi > lo):
+            i = valid[k]
+            prefix = prefixes[i].lower()
+            matches = range(lo[k], hi[k])
+            if len(prefix) % 2 or len(matches) > 1:
+                matches = [j for j in matches if _to_hex(self.shas[j]).startswith(prefix)]
+            if len(matches) == 1:
+                result[i] = self.release[matches[0]]
+        return result
+
+    def first_release(self, prefixes: Iterable[str]) -> List[str]:
+        """SHA 前缀 -> 最早包含它的发布标签（未发布为空字符串）"""
+        names = np.array(self.tags + [''], dtype=object)
+        return list(names[self.lookup(prefixes)])
+
+    def lead_times(self) -> pd.DataFrame:
+        """已发布提交的交付时长：首个包含它的发布时间 - 提交时间"""
+        released = self.release >= 0
+        ranks = self.release[released]
+        release_times = self.tag_times[ranks]
+        return pd.DataFrame({
+            'release': np.array(self.tags, dtype=object)[ranks],
+            'commit_time': pd.to_datetime(self.times[released], unit='s'),
+            'lead_days': (release_times - self.times[released]) / 86400,
+        })
+
+    def release_stats(self) -> pd.DataFrame:
+        """每个发布首次包含的提交数和交付时长分布（天）"""
+        leads = self.lead_times()
+        grouped = leads.groupby('release', sort=False)['lead_days']
+        stats = pd.DataFrame({
+            'commits': grouped.size(),
+            'lead_days_median': grouped.median(),
+            'lead_days_p90': grouped.quantile(0.9),
+            'lead_days_max': grouped.max(),
+        })
+        table = pd.DataFrame({'release': self.tags, 'released_at': pd.to_datetime(self.tag_times, unit='s')})
+        return table.join(stats, on='release').fillna({'commits': 0}).astype({'commits': int})
+
+    # ---------- 持久化 ----------
+
+    def save(self, path: str = INDEX_FILE):
+        """写出 .npz（不使用 pickle）"""
+        np.savez_compressed(
+            path, shas=self.shas, release=self.release, times=self.times,
+            tags=np.array(self.tags, dtype=str), tag_shas=_to_binary(self.tag_shas), tag_times=self.tag_times,
+            meta=np.array([self.pattern, self.head], dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> 'ReleaseIndex':
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(str(data['meta'][0]))
+            index.head = str(data['meta'][1])
+            index.shas = data['shas']
+            index.release = data['release']
+            index.times = data['times']
+            index.tags = [str(t) for t in data['tags']]
+            index.tag_shas = [_to_hex(s) for s in data['tag_shas']]
+            index.tag_times = data['tag_times']
+        return index
+
+
+def open_index(repo: git.Repo, path: str = INDEX_FILE, pattern: str = RELEASE_TAG_PATTERN,
+               rebuild: bool = False) -> ReleaseIndex:
+    """加载（或新建）索引并同步到仓库当前状态"""
+    if os.path.exists(path) and not rebuild:
+        index = ReleaseIndex.load(path)
+        if index.pattern != pattern:
+            index = ReleaseIndex(pattern)
+    else:
+        index = ReleaseIndex(pattern)
+    start = datetime.now()
+    result = index.update(repo, resolve_main_branch(repo))
+    elapsed = (datetime.now() - start).total_seconds()
+    if result['mode'] != 'unchanged':
+        index.save(path)
+    print(f"🏷️  发布索引（{result['mode']}）：{len(index.tags)} 个发布，{len(index):,} 个提交，"
+          f"新标签 {result['new_tags']} 个，遍历 {result['walked']:,} 个提交，耗时 {elapsed:.1f}s")
+    return index
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='发布包含索引：每个提交最早进入的发布版本')
+    parser.add_argument('--repo', default=repo_path, help='本地仓库路径')
+    parser.add_argument('--index', default=INDEX_FILE, help='索引文件（.npz）')
+    parser.add_argument('--tag-pattern', default=RELEASE_TAG_PATTERN, help='发布标签的正则')
+    parser.add_argument('--rebuild', action='store_true', help='忽略已有索引，全量重建')
+    parser.add_argument('--stats', metavar='CSV', help='写出每个发布的交付时长统计')
+    parser.add_argument('sha', nargs='*', help='要查询的提交 SHA（可用短 SHA）')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.repo):
+        print(f"错误：路径不存在 - {args.repo}")
+        return
+    repo = git.Repo(args.repo)
+    index = open_index(repo, args.index, args.tag_pattern, args.rebuild)
+
+    for sha, tag in zip(args.sha, index.first_release(args.sha)):
+        print(f"  {sha}: {tag or '未发布/未收录'}")
+
+    leads = index.lead_times()
+    if len(leads):
+        print("\n" + "=" * 60)
+        print("📊 交付时长（提交 -> 首个包含它的发布）")
+        print("=" * 60)
+        print(f"已发布提交 {len(leads):,} 个，未发布 {int((index.release < 0).sum()):,} 个")
+        print(f"中位数 {leads['lead_days'].median():.1f} 天 | P90 {leads['lead_days'].quantile(0.9):.1f} 天 | "
+              f"最长 {leads['lead_days'].max():.1f} 天")
+        stats = index.release_stats()
+        print(stats.tail(10).to_string(index=False))
+        if args.stats:
+            stats.to_csv(args.stats, index=False, encoding='utf-8-sig')
+            print(f"✅ 已写出 {args.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import argparse
+import hashlib
+import json
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pandas as pd
+import os
+
+import analysis
+
+
+OUTPUT_DIR = 'report_images'
+CACHE_FILE = '.render_cache.json'
+
+# 图表样式：参与缓存键计算，修改后所有图表都会重新渲染
+STYLE = {
+    'font.sans-serif': ['SimHei', 'Microsoft YaHei', 'SimSun', 'DejaVu Sans'],
+    'axes.unicode_minus': False,
+    'figure.dpi': 100,
+    # 固定 SVG 内部 id，使相同输入生成字节一致的文件
+    'svg.hashsalt': 'vscode-report',
+}
+
+# 绘图代码版本：修改任何绘图函数时递增
+RENDER_VERSION = 1
+
+
+# ---------- 绘图函数（顶层函数，便于进程池序列化） ----------
+
+def draw_top_contributors(ax, data: pd.Series):
+    ax.barh(range(len(data)), data.to_numpy(), color='#4e79a7')
+    ax.set_yticks(range(len(data)))
+    ax.set_yticklabels(data.index)
+    ax.invert_yaxis()
+    ax.set_xlabel('贡献次数', fontsize=12, fontweight='bold')
+    ax.set_title(f'VS Code Top {len(data)} 贡献者排行榜', fontsize=14, fontweight='bold', pad=20)
+    for i, value in enumerate(data.to_numpy()):
+        ax.text(value, i, f" {int(value)}", va='center', fontweight='bold')
+
+
+def draw_contributor_distribution(ax, data: pd.Series):
+    ax.hist(data, bins=50, color='steelblue', edgecolor='black', alpha=0.7)
+    ax.set_yscale('log')
+    ax.axvline(data.mean(), color='red', linestyle='--', linewidth=2, label=f'平均值: {data.mean():.0f}')
+    ax.axvline(data.median(), color='green', linestyle='--', linewidth=2, label=f'中位数: {data.median():.0f}')
+    ax.set_xlabel('贡献次数', fontsize=12, fontweight='bold')
+    ax.set_ylabel('贡献者数', fontsize=12, fontweight='bold')
+    ax.set_title('贡献者分布', fontsize=14, fontweight='bold', pad=20)
+    ax.legend()
+    ax.grid(alpha=0.3)
+
+
+def draw_pareto(ax, data: pd.DataFrame):
+    x = range(len(data))
+    ax.bar(x, data['贡献次数'], alpha=0.6, color='steelblue')
+    ax.set_xlabel('贡献者（按贡献次数排序）', fontsize=12, fontweight='bold')
+    ax.set_ylabel('贡献次数', fontsize=12, fontweight='bold', color='steelblue')
+    ax.set_xticks([])
+    ax2 = ax.twinx()
+    ax2.plot(x, data['cumulative_pct'], color='red', linewidth=3)
+    ax2.axhline(80, color='orange', linestyle='--', linewidth=2, alpha=0.5)
+    ax2.set_ylabel('累积贡献百分比(%)', fontsize=12, fontweight='bold', color='red')
+    ax2.set_ylim([0, 105])
+    ax.set_title('帕累托分析', fontsize=14, fontweight='bold', pad=20)
+
+
+def draw_monthly_commits(ax, data: pd.Series):
+    ax.plot(data.index, data.to_numpy(), linewidth=2.5, marker='o', markersize=4, color='steelblue')
+    ax.fill_between(data.index, data.to_numpy(), alpha=0.3, color='steelblue')
+    ax.set_xlabel('时间', fontsize=12, fontweight='bold')
+    ax.set_ylabel('月度提交数', fontsize=12, fontweight='bold')
+    ax.set_title('VS Code 月度提交趋势', fontsize=14, fontweight='bold', pad=20)
+    ax.grid(alpha=0.3)
+
+
+def draw_commit_types(ax, data: pd.Series):
+    ax.bar(data.index, data.to_numpy(), color='#f28e2b')
+    ax.set_ylabel('提交数', fontsize=11, fontweight='bold')
+    ax.set_title('提交类型分布（历史数据）', fontsize=14, fontweight='bold', pad=20)
+    ax.tick_params(axis='x', rotation=45)
+    for i, value in enumerate(data.to_numpy()):
+        ax.text(i, value, str(value), ha='center', va='bottom', fontweight='bold')
+
+
+def draw_bugfix_rate(ax, data: pd.Series):
+    ax.plot(data.index, data.to_numpy(), marker='o', linewidth=3, markersize=8, color='orangered')
+    ax.fill_between(data.index, data.to_numpy(), alpha=0.3, color='orangered')
+    ax.set_xticks(data.index)
+    ax.set_xlabel('年份', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Bug Fix 占比 (%)', fontsize=12, fontweight='bold')
+    ax.set_title('VS Code 代码质量演化：Bug修复频率变化', fontsize=14, fontweight='bold', pad=20)
+    ax.grid(alpha=0.3)
+    for year, pct in data.items():
+        ax.text(year, pct + 1, f'{pct:.1f}%', ha='center', fontweight='bold')
+
+
+def draw_issue_pr_activity(ax, data: pd.DataFrame):
+    ax.plot(data.index, data['issue'], marker='o', label='Issue相关提交', linewidth=2.5, markersize=5, color='steelblue')
+    ax.plot(data.index, data['merge'], marker='s', label='Merge提交(PR)', linewidth=2.5, markersize=5, color='coral')
+    ax.set_xlabel('时间', fontsize=12, fontweight='bold')
+    ax.set_ylabel('月度提交数', fontsize=12, fontweight='bold')
+    ax.set_title('Issue 和 PR 活跃度趋势（基于提交历史）', fontsize=14, fontweight='bold', pad=20)
+    ax.legend(fontsize=11, loc='best')
+    ax.grid(alpha=0.3)
+
+
+def draw_stars_growth(ax, data: pd.Series):
+    ax.plot(data.index, data.to_numpy(), linewidth=2.5, color='gold')
+    ax.fill_between(data.index, data.to_numpy(), alpha=0.3, color='gold')
+    ax.set_xlabel('时间', fontsize=12, fontweight='bold')
+    ax.set_ylabel('累积Star数', fontsize=12, fontweight='bold')
+    ax.set_title('VS Code GitHub Stars增长曲线', fontsize=14, fontweight='bold', pad=20)
+    ax.grid(alpha=0.3)
+
+
+def draw_release_timeline(ax, data: pd.Series):
+    ax.scatter(data.index, [0] * len(data), s=100, alpha=0.6)
+    for published, version in data.items():
+        ax.text(published, 0.15, str(version)[:10], rotation=45, ha='center', fontsize=8)
+    ax.set_ylim(-0.5, 0.5)
+    ax.set_yticks([])
+    ax.set_xlabel('发布日期', fontsize=12, fontweight='bold')
+    ax.set_title('VS Code 版本发布时间线', fontsize=14, fontweight='bold', pad=20)
+    ax.grid(alpha=0.3, axis='x')
+
+
+def draw_team_growth(ax, data: pd.Series):
+    ax.plot(data.index, data.to_numpy(), linewidth=2.5, color='green')
+    ax.fill_between(data.index, data.to_numpy(), alpha=0.3, color='green')
+    ax.set_xlabel('时间', fontsize=12, fontweight='bold')
+    ax.set_ylabel('累积贡献者数', fontsize=12, fontweight='bold')
+    ax.set_title('VS Code 团队规模增长：新贡献者加入趋势', fontsize=14, fontweight='bold', pad=20)
+    ax.grid(alpha=0.3)
+
+
+def draw_commit_heatmap(ax, data: pd.DataFrame):
+    image = ax.imshow(data.to_numpy(), cmap='YlOrRd', aspect='auto')
+    ax.figure.colorbar(image, ax=ax, label='提交数')
+    ax.set_xticks(range(len(data.columns)))
+    ax.set_xticklabels(data.columns)
+    ax.set_yticks(range(len(data.index)))
+    ax.set_yticklabels(data.index)
+    ax.set_xlabel('小时（UTC）', fontsize=12, fontweight='bold')
+    ax.set_ylabel('星期几', fontsize=12, fontweight='bold')
+    ax.set_title('VS Code 提交活跃度热力图：周度 × 小时规律', fontsize=14, fontweight='bold', pad=20)
+
+
+def draw_yearly_commit_types(ax, data: pd.DataFrame):
+    data.plot(kind='bar', stacked=False, ax=ax, width=0.8)
+    ax.set_xlabel('年份', fontsize=12, fontweight='bold')
+    ax.set_ylabel('提交数', fontsize=12, fontweight='bold')
+    ax.set_title('按年份划分的提交类型变化：项目重点演化', fontsize=14, fontweight='bold', pad=20)
+    ax.legend(title='提交类型', bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(alpha=0.3, axis='y')
+
+
+# 图表名 -> (所需数据集, 聚合函数, 绘图函数, 画布尺寸)
+FIGURES: Dict[str, Tuple[str, Callable, Callable, Tuple[int, int]]] = {
+    'fig_top_contributors': ('contributors', lambda df: analysis.top_contributors(df, n=5), draw_top_contributors, (9, 4)),
+    'fig_contributor_distribution': ('contributors', analysis.contribution_counts, draw_contributor_distribution, (12, 6)),
+    'fig_pareto': ('contributors', analysis.pareto, draw_pareto, (12, 6)),
+    'fig_monthly_commits': ('commits_history', analysis.monthly_commits, draw_monthly_commits, (14, 6)),
+    'fig_commit_types': ('commits_history', analysis.commit_type_distribution, draw_commit_types, (9, 4.2)),
+    'fig_bugfix_rate': ('commits_history', analysis.yearly_bugfix_rate, draw_bugfix_rate, (12, 6)),
+    'fig_issue_pr_activity': ('commits_history', analysis.issue_merge_activity, draw_issue_pr_activity, (14, 6)),
+    'fig_stars_growth': ('stargazers', analysis.stars_over_time, draw_stars_growth, (14, 6)),
+    'fig_release_timeline': ('releases', analysis.release_timeline, draw_release_timeline, (14, 4)),
+    'fig_team_growth': ('commits_history', analysis.cumulative_authors, draw_team_growth, (14, 6)),
+    'fig_commit_heatmap': ('commits_full', analysis.weekly_heatmap, draw_commit_heatmap, (14, 6)),
+    'fig_yearly_commit_types': ('commits_history', analysis.yearly_type_distribution, draw_yearly_commit_types, (14, 6)),
+}
+
+
+def content_hash(name: str, data: Any) -> str:
+    """图表缓存键：聚合数据内容 + 样式 + 绘图代码版本"""
+    digest = hashlib.sha256()
+    digest.update(f"{name}:{RENDER_VERSION}".encode('utf-8'))
+    digest.update(json.dumps(STYLE, sort_keys=True).encode('utf-8'))
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        names = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(repr(names).encode('utf-8'))
+    else:
+        digest.update(pickle.dumps(data))
+    return digest.hexdigest()
+
+
+def render_figure(name: str, data: Any, out_path: str) -> Tuple[str, float]:
+    """在工作进程中渲染单个图表（无界面后端）"""
+    import warnings
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    warnings.filterwarnings('ignore')
+
+    start = time.perf_counter()
+    _, _, draw, figsize = FIGURES[name]
+    with plt.rc_context(STYLE):
+        fig, ax = plt.subplots(figsize=figsize)
+        draw(ax, data)
+        fig.tight_layout()
+        fig.savefig(out_path, format='svg', metadata={'Date': None})
+        plt.close(fig)
+    return name, time.perf_counter() - start
+
+
+def _load_cache(output_dir: str) -> Dict[str, str]:
+    path = os.path.join(output_dir, CACHE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_cache(output_dir: str, cache: Dict[str, str]):
+    path = os.path.join(output_dir, CACHE_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def render_report(names: Optional[List[str]] = None, output_dir: str = OUTPUT_DIR,
+                  data_path: str = 'vscode_massive_data', workers: Optional[int] = None,
+                  force: bool = False) -> Dict[str, str]:
+    """
+    渲染报告图表
+    返回 图表名 -> 状态（rendered / cached / skipped）
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = names or list(FIGURES)
+    datasets = analysis.load_datasets(data_path)
+    cache = _load_cache(output_dir)
+
+    status: Dict[str, str] = {}
+    jobs = []
+    for name in names:
+        source, aggregate, _, _ = FIGURES[name]
+        frame = datasets.get(source)
+        if frame is None or frame.empty:
+            print(f"  ⚠️  {name}: 缺少数据集 {source}，跳过")
+            status[name] = 'skipped'
+            continue
+
+        data = aggregate(frame)
+        key = content_hash(name, data)
+        out_path = os.path.join(output_dir, f"{name}.svg")
+        if not force and cache.get(name) == key and os.path.exists(out_path):
+            status[name] = 'cached'
+            continue
+        jobs.append((name, data, out_path, key))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render_figure, name, data, out_path): (name, key)
+                       for name, data, out_path, key in jobs}
+            for future, (name, key) in futures.items():
+                try:
+                    _, elapsed = future.result()
+                    cache[name] = key
+                    status[name] = 'rendered'
+                    print(f"  ✅ {name}.svg ({elapsed:.2f}s)")
+                except Exception as e:
+                    status[name] = 'failed'
+                    print(f"  ❌ {name}: {e}")
+        _save_cache(output_dir, cache)
+
+    return status
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='无界面并行渲染报告图表')
+    parser.add_argument('figures', nargs='*', help=f"要渲染的图表（默认全部）：{', '.join(FIGURES)}")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--data-path', default='vscode_massive_data')
+    parser.add_argument('--workers', type=int, default=None, help='进程数（默认CPU核数）')
+    parser.add_argument('--force', action='store_true', help='忽略缓存强制重新渲染')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.figures if name not in FIGURES]
+    if unknown:
+        parser.error(f"未知图表: {', '.join(unknown)}")
+
+    print("🎨 渲染报告图表")
+    print("=" * 60)
+    start = time.perf_counter()
+    status = render_report(args.figures or None, args.output_dir, args.data_path, args.workers, args.force)
+
+    counts = pd.Series(status).value_counts()
+    print(f"\n📊 渲染 {counts.get('rendered', 0)}，缓存命中 {counts.get('cached', 0)}，"
+          f"跳过 {counts.get('skipped', 0)}，失败 {counts.get('failed', 0)}")
+    print(f"⏱️  总耗时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
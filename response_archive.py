@@ -0,0 +1,244 @@
+import argparse
+import gzip
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+import os
+
+from crawler_metrics import endpoint_of
+from field_schema import orjson
+from record_store import RecordStore
+
+
+ARCHIVE_DIR = 'raw_archive'
+INDEX_FILE = 'index.jsonl'
+# 回放时不参与匹配的请求参数（随运行时间或剩余目标数量变化）
+VOLATILE_PARAMS = {'since', 'per_page'}
+
+
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+class ResponseArchive:
+    """
+    原始响应归档
+    每个 200 响应以独立 gzip 成员追加到 {endpoint}.jsonl.gz（gzip 多成员可直接顺序解压），
+    index.jsonl 记录端点、页码、参数、获取时间和字节偏移，可按端点/页码/时间随机读取
+    """
+
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.entries: List[Dict[str, Any]] = []
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = [json.loads(line) for line in f if line.strip()]
+
+    def append(self, url: str, params: Optional[Dict], response) -> Dict[str, Any]:
+        """追加一个响应（原始响应体不解析、不截断）"""
+        endpoint = endpoint_of(url)
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        fetched_at = datetime.now().isoformat()
+        meta = {
+            'url': url,
+            'params': params,
+            'status': response.status_code,
+            'fetched_at': fetched_at,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        body = response.content or b'null'
+        record = json.dumps(meta, ensure_ascii=False).encode('utf-8')[:-1] + b', "body": ' + body + b'}\n'
+        member = gzip.compress(record, compresslevel=6)
+
+        with self.lock:
+            filename = f"{endpoint}.jsonl.gz"
+            path = os.path.join(self.directory, filename)
+            with open(path, 'ab') as f:
+                offset = f.tell()
+                f.write(member)
+            entry = {
+                'endpoint': endpoint,
+                'page': int(params['page']) if str(params.get('page', '')).isdigit() else None,
+                'url': url,
+                'params': params,
+                'fetched_at': fetched_at,
+                'file': filename,
+                'offset': offset,
+                'length': len(member),
+                'raw_bytes': len(body),
+                'etag': meta['etag'],
+            }
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.entries.append(entry)
+        return entry
+
+    def find(self, endpoint: Optional[str] = None, page: Optional[int] = None,
+             since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按端点、页码和获取时间（ISO 字符串比较）筛选索引"""
+        result = []
+        for entry in self.entries:
+            if endpoint is not None and entry['endpoint'] != endpoint:
+                continue
+            if page is not None and entry['page'] != page:
+                continue
+            if since is not None and entry['fetched_at'] < since:
+                continue
+            if until is not None and entry['fetched_at'] > until:
+                continue
+            result.append(entry)
+        return result
+
+    def read(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """读取一条归档记录（含 body）"""
+        with open(os.path.join(self.directory, entry['file']), 'rb') as f:
+            f.seek(entry['offset'])
+            member = f.read(entry['length'])
+        return _loads(gzip.decompress(member))
+
+    def latest_pages(self, endpoint: str, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """每个 (URL, 参数, 页码) 只保留最新的一次抓取，按页码排序"""
+        latest: Dict[str, Dict[str, Any]] = {}
+        for entry in self.find(endpoint, until=until):
+            latest[_request_key(entry['url'], entry['params'])] = entry
+        return sorted(latest.values(), key=lambda e: (e['url'], e['page'] or 0))
+
+    def iter_items(self, endpoint: str, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """按页顺序遍历某端点归档中的全部原始条目（不截断任何字段）"""
+        for entry in self.latest_pages(endpoint, until):
+            body = self.read(entry)['body']
+            if isinstance(body, list):
+                yield from body
+            elif isinstance(body, dict):
+                yield body
+
+    def to_store(self, endpoint: str, schema, until: Optional[str] = None) -> RecordStore:
+        """用任意字段投影（可以比导出的 CSV 更多字段）直接从归档生成列式存储"""
+        store = schema.new_store()
+        for entry in self.latest_pages(endpoint, until):
+            body = self.read(entry)['body']
+            store.begin_page(entry['page'] or 1, entry['fetched_at'])
+            for item in body if isinstance(body, list) else [body]:
+                if isinstance(item, dict):
+                    store.write(item)
+        return store
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        result: Dict[str, Dict[str, int]] = {}
+        for entry in self.entries:
+            s = result.setdefault(entry['endpoint'], {'pages': 0, 'raw_bytes': 0, 'stored_bytes': 0})
+            s['pages'] += 1
+            s['raw_bytes'] += entry['raw_bytes']
+            s['stored_bytes'] += entry['length']
+        return result
+
+
+def _request_key(url: str, params: Optional[Dict]) -> str:
+    stable = {k: str(v) for k, v in (params or {}).items() if k not in VOLATILE_PARAMS}
+    return urlparse(url).path + '?' + json.dumps(stable, sort_keys=True)
+
+
+class ArchivedResponse:
+    """回放用的最小响应对象（接口与爬虫用到的 requests.Response 部分一致）"""
+
+    def __init__(self, status_code: int, content: bytes = b'', headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.text = content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return _loads(self.content)
+
+
+class ReplaySession:
+    """
+    替换爬虫的 requests.Session：按 URL 路径 + 稳定参数返回归档中的最新响应，
+    未归档的请求返回 404（爬虫会当作该端点没有更多数据）
+    """
+
+    def __init__(self, archive: ResponseArchive, until: Optional[str] = None):
+        self.archive = archive
+        self.headers: Dict[str, str] = {}
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        for entry in archive.entries:
+            if until is None or entry['fetched_at'] <= until:
+                self.responses[_request_key(entry['url'], entry['params'])] = entry
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: Optional[float] = None) -> ArchivedResponse:
+        entry = self.responses.get(_request_key(url, params))
+        if entry is None:
+            self.misses += 1
+            return ArchivedResponse(404, b'{"message": "Not Archived"}')
+        self.hits += 1
+        body = self.archive.read(entry)['body']
+        # 请求的 per_page 比归档页小时按请求截断，与在线抓取的条数一致
+        per_page = (params or {}).get('per_page')
+        if isinstance(body, list) and per_page:
+            body = body[:int(per_page)]
+        return ArchivedResponse(200, json.dumps(body, ensure_ascii=False).encode('utf-8'))
+
+
+def replay_exports(archive_dir: str, export_dir: str, until: Optional[str] = None):
+    """完全离线地重新生成 vscode_massive_data 导出"""
+    from cyxcode import MaxDataVSCodeCrawler
+
+    archive = ResponseArchive(archive_dir)
+    if not archive.entries:
+        print(f"❌ 归档为空: {archive_dir}")
+        return
+
+    # 归档 URL 形如 {scheme}://{host}/repos/{owner}/{repo}/{endpoint}
+    parsed = urlparse(archive.entries[0]['url'])
+    owner_repo = parsed.path.split('/repos/', 1)[1].split('/')[:2]
+    base_url = f"{parsed.scheme}://{parsed.netloc}/repos/{'/'.join(owner_repo)}"
+    crawler = MaxDataVSCodeCrawler(github_token='replay', base_url=base_url)
+    crawler.archive_dir = None
+    crawler.session = ReplaySession(archive, until)
+    crawler.page_delay_scale = 0
+    crawler.rate_limit_min_wait = 0
+    crawler.metrics.progress_interval = float('inf')
+    # 目标数量不设上限：回放归档中的全部页，到归档末页（不足一页或未归档）即停止
+    for key in crawler.config:
+        crawler.config[key] = 10 ** 9
+
+    print(f"🔁 从归档回放: {archive_dir}（{len(archive.entries):,} 个响应）")
+    crawler.export_massive_data_safely(export_dir)
+    print(f"📊 命中 {crawler.session.hits} 个归档响应，未命中 {crawler.session.misses} 个")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='原始响应归档：统计与离线回放')
+    sub = parser.add_subparsers(dest='command', required=True)
+    replay = sub.add_parser('replay', help='从归档离线重新生成导出数据')
+    replay.add_argument('--archive', default=ARCHIVE_DIR)
+    replay.add_argument('--output', default='vscode_massive_data_replay', help='导出目录')
+    replay.add_argument('--until', help='只使用该时间（ISO）之前抓取的响应')
+    stats = sub.add_parser('stats', help='按端点统计归档页数和压缩率')
+    stats.add_argument('--archive', default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'replay':
+        replay_exports(args.archive, args.output, args.until)
+    else:
+        archive = ResponseArchive(args.archive)
+        print(f"{'端点':<16}{'页数':>8}{'原始MB':>10}{'压缩MB':>10}{'压缩率':>8}")
+        print("-" * 52)
+        for endpoint, s in sorted(archive.stats().items()):
+            ratio = s['stored_bytes'] / s['raw_bytes'] if s['raw_bytes'] else 0.0
+            print(f"{endpoint:<16}{s['pages']:>8}{s['raw_bytes'] / 1e6:>10.2f}"
+                  f"{s['stored_bytes'] / 1e6:>10.2f}{ratio:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
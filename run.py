@@ -1,26 +1,22 @@
 import git
+import numpy as np
 import pandas as pd
+import argparse
 from datetime import datetime, timedelta
+from typing import List, Optional
 import os
+import sys
+
+from profiling import StageProfiler, profile_run
+from record_store import Column, RecordStore
+from sketches import RepositorySketches
 
 # 1. 指定本地仓库路径
 repo_path = r'D:\code\data_crawler\vscode'
 
-try:
-    # 检查路径是否存在
-    if not os.path.exists(repo_path):
-        print(f"错误：路径不存在 - {repo_path}")
-        print("请先克隆仓库：git clone https://github.com/microsoft/vscode.git")
-        exit(1)
-    
-    repo = git.Repo(repo_path)
-    print(f"成功打开仓库：{repo_path}")
-    
-    # 2. 计算5年前的日期
-    five_years_ago = datetime.now() - timedelta(days=5*365)
-    print(f"提取从 {five_years_ago.strftime('%Y-%m-%d')} 到现在的提交历史")
-    
-    # 3. 确定正确的主分支名称
+
+def resolve_main_branch(repo: git.Repo) -> str:
+    """确定正确的主分支名称"""
     try:
         # 尝试获取当前分支
         current_branch = repo.active_branch.name
@@ -29,23 +25,20 @@ try:
     except:
         # 如果无法确定，尝试main，失败则尝试master
         main_branch = 'main' if 'main' in repo.heads else 'master'
-    
-    print(f"使用分支：{main_branch}")
-    
-    # 4. 遍历提交历史
-    commits_data = []
-    commit_count = 0
-    
-    for commit in repo.iter_commits(main_branch, since=five_years_ago):
-        commit_count += 1
-        
-        # 正确获取修改的文件列表
-        try:
+    return main_branch
+
+
+def get_modified_files(commit, profiler: Optional[StageProfiler] = None) -> List[str]:
+    """正确获取修改的文件列表"""
+    profiler = profiler or StageProfiler(enabled=False)
+    try:
+        with profiler.stage('commit.stats'):
             modified_files = list(commit.stats.files.keys())
-        except AttributeError:
-            # 如果stats.files不可用，尝试其他方法
-            modified_files = []
-            try:
+    except AttributeError:
+        # 如果stats.files不可用，尝试其他方法
+        modified_files = []
+        try:
+            with profiler.stage('parents[0].diff'):
                 if commit.parents:
                     # 比较与父提交的差异
                     diff = commit.parents[0].diff(commit)
@@ -53,50 +46,167 @@ try:
                         path = diff_item.a_path if diff_item.a_path else diff_item.b_path
                         if path:
                             modified_files.append(path)
-            except:
-                modified_files = ["获取失败"]
-        
-        # 准备提交信息
-        commit_info = {
-            'commit_hash': commit.hexsha[:10],  # 取前10位，更简洁
-            'author': commit.author.name if commit.author else "Unknown",
-            'author_email': commit.author.email if commit.author else "Unknown",
-            'date': commit.authored_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-            'message': commit.message.strip().replace('\n', ' ') if commit.message else "",
-            'modified_files_count': len(modified_files),
-            'modified_files': ', '.join(modified_files[:10]) if modified_files else ""  # 只显示前10个文件
-        }
-        
-        commits_data.append(commit_info)
-        
+        except:
+            modified_files = ["获取失败"]
+    return modified_files
+
+
+# 提交记录列：作者/邮箱字典编码，修改的文件路径字典编码后按 CSR 存储（CSV 中只显示前10个）
+COMMIT_COLUMNS = [
+    Column('commit_hash', 'text'),
+    Column('author', 'category'),
+    Column('author_email', 'category'),
+    Column('date', 'datetime', fmt='%Y-%m-%d %H:%M:%S'),
+    Column('message', 'text'),
+    Column('modified_files_count', 'int'),
+    Column('modified_files', 'strlist', limit=10, sep=', '),
+]
+
+
+def append_commit(store: RecordStore, commit, modified_files: List[str]):
+    """准备提交信息，直接追加到列式存储"""
+    store.append(
+        commit.hexsha[:10],  # 取前10位，更简洁
+        commit.author.name if commit.author else "Unknown",
+        commit.author.email if commit.author else "Unknown",
+        # 作者本地时间（与 authored_datetime 的墙钟时间一致）
+        commit.authored_date - commit.author_tz_offset,
+        commit.message.strip().replace('\n', ' ') if commit.message else "",
+        len(modified_files),
+        modified_files,
+    )
+
+
+def collect_commits(repo: git.Repo, main_branch: str, since: datetime,
+                    profiler: Optional[StageProfiler] = None,
+                    sketches: Optional[RepositorySketches] = None, keep_rows: bool = True) -> RecordStore:
+    """遍历提交历史；sketches 非空时同时更新近似统计，keep_rows=False 时不保留逐行记录"""
+    profiler = profiler or StageProfiler(enabled=False)
+    commits_data = RecordStore(COMMIT_COLUMNS)
+    commit_count = 0
+
+    for commit in profiler.timed_iter('iter_commits', repo.iter_commits(main_branch, since=since)):
+        commit_count += 1
+        modified_files = get_modified_files(commit, profiler)
+        if keep_rows:
+            with profiler.stage('append_commit'):
+                append_commit(commits_data, commit, modified_files)
+        if sketches is not None:
+            with profiler.stage('sketches'):
+                sketches.add_commit(commit.authored_date,
+                                    commit.author.email if commit.author else "Unknown", modified_files)
+        profiler.tick(commit_count)
+
         # 显示进度
         if commit_count % 100 == 0:
             print(f"已处理 {commit_count} 个提交...")
-    
-    # 5. 转换为DataFrame并保存
-    if commits_data:
-        df = pd.DataFrame(commits_data)
-        
-        # 排序：最新的提交在前
-        df['date_dt'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date_dt', ascending=False)
-        df = df.drop('date_dt', axis=1)
-        
-        # 保存到CSV
-        csv_filename = 'vscode_commit_history.csv'
-        df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-        print(f"成功导出 {len(df)} 条提交记录到 '{csv_filename}'")
-        
-        # 显示统计信息
-        print(f"\n数据统计：")
-        print(f"- 时间范围：{five_years_ago.strftime('%Y-%m-%d')} 至 {datetime.now().strftime('%Y-%m-%d')}")
-        print(f"- 作者数量：{df['author'].nunique()}")
-        print(f"- 平均每次提交修改文件数：{df['modified_files_count'].mean():.1f}")
-    else:
-        print("没有找到符合条件的提交记录")
-        
-except git.exc.InvalidGitRepositoryError:
-    print(f"错误：{repo_path} 不是有效的Git仓库")
-    print("请确保路径正确，或先克隆仓库：git clone https://github.com/microsoft/vscode.git")
-except Exception as e:
-    print(f"发生错误：{type(e).__name__}: {e}")
\ No newline at end of file
+
+    return commits_data
+
+
+def build_dataframe(commits_data: RecordStore, profiler: Optional[StageProfiler] = None) -> pd.DataFrame:
+    """转换为DataFrame，最新的提交在前"""
+    profiler = profiler or StageProfiler(enabled=False)
+    with profiler.stage('sort'):
+        order = np.argsort(-commits_data.raw('date'), kind='stable')
+    with profiler.stage('DataFrame'):
+        df = commits_data.to_dataframe(order=order)
+    return df
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='导出本地 Git 仓库近 5 年的提交历史')
+    parser.add_argument('--repo', default=repo_path, help='本地仓库路径')
+    parser.add_argument('--output', default='vscode_commit_history.csv', help='导出的 CSV 文件')
+    parser.add_argument('--profile', action='store_true', help='统计各阶段累计耗时、调用次数和吞吐')
+    parser.add_argument('--cprofile', metavar='PATH', help='把 cProfile 结果写到 PATH（.prof）')
+    parser.add_argument('--sample', metavar='PATH', help='采样调用栈，写出 folded stacks 到 PATH')
+    parser.add_argument('--sample-interval', type=float, default=0.005, help='采样间隔（秒）')
+    parser.add_argument('--sketch', metavar='PATH', help='同时按月写出近似统计草图（去重作者/热门文件/高频提交者）')
+    parser.add_argument('--sketch-only', action='store_true', help='只生成草图，不保留逐行记录、不导出 CSV')
+    parser.add_argument('--release-index', metavar='PATH', help='同步发布包含索引并增加 first_release 列（最早包含该提交的发布）')
+    args = parser.parse_args()
+    if args.sketch_only and not args.sketch:
+        parser.error('--sketch-only requires --sketch')
+    return args
+
+
+def export_history(repo_path: str, csv_filename: str, profiler: StageProfiler,
+                   sketch_path: Optional[str] = None, sketch_only: bool = False,
+                   release_index_path: Optional[str] = None):
+    """提取提交历史并导出为 CSV（以及可选的近似统计草图）"""
+    commit_count = 0
+    try:
+        # 检查路径是否存在
+        if not os.path.exists(repo_path):
+            print(f"错误：路径不存在 - {repo_path}")
+            print("请先克隆仓库：git clone https://github.com/microsoft/vscode.git")
+            sys.exit(1)
+
+        repo = git.Repo(repo_path)
+        print(f"成功打开仓库：{repo_path}")
+
+        # 2. 计算5年前的日期
+        five_years_ago = datetime.now() - timedelta(days=5*365)
+        print(f"提取从 {five_years_ago.strftime('%Y-%m-%d')} 到现在的提交历史")
+
+        # 3. 确定正确的主分支名称
+        main_branch = resolve_main_branch(repo)
+        print(f"使用分支：{main_branch}")
+
+        # 4. 遍历提交历史
+        sketches = RepositorySketches() if sketch_path else None
+        if sketches is not None:
+            sketches.sources.append(os.path.basename(os.path.abspath(repo_path)))
+        commits_data = collect_commits(repo, main_branch, five_years_ago, profiler,
+                                       sketches=sketches, keep_rows=not sketch_only)
+        commit_count = len(commits_data)
+
+        if sketches is not None:
+            sketches.save(sketch_path)
+            commit_count = sum(b.commits for b in sketches.buckets.values())
+            print(f"成功写出近似统计草图到 '{sketch_path}'（{len(sketches.buckets)} 个月）")
+            if sketch_only:
+                return
+
+        # 5. 转换为DataFrame并保存
+        if commits_data:
+            df = build_dataframe(commits_data, profiler)
+            if release_index_path:
+                from release_index import open_index
+
+                with profiler.stage('release_index'):
+                    index = open_index(repo, release_index_path)
+                    df['first_release'] = index.first_release(df['commit_hash'])
+
+            # 保存到CSV
+            with profiler.stage('to_csv'):
+                df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
+            print(f"成功导出 {len(df)} 条提交记录到 '{csv_filename}'")
+
+            # 显示统计信息
+            print(f"\n数据统计：")
+            print(f"- 时间范围：{five_years_ago.strftime('%Y-%m-%d')} 至 {datetime.now().strftime('%Y-%m-%d')}")
+            print(f"- 作者数量：{df['author'].nunique()}")
+            print(f"- 平均每次提交修改文件数：{df['modified_files_count'].mean():.1f}")
+        else:
+            print("没有找到符合条件的提交记录")
+
+    except git.exc.InvalidGitRepositoryError:
+        print(f"错误：{repo_path} 不是有效的Git仓库")
+        print("请确保路径正确，或先克隆仓库：git clone https://github.com/microsoft/vscode.git")
+    except Exception as e:
+        print(f"发生错误：{type(e).__name__}: {e}")
+    finally:
+        profiler.print_summary(commit_count)
+
+
+def main():
+    args = parse_args()
+    profiler = StageProfiler(enabled=args.profile)
+    with profile_run(args.cprofile, args.sample, args.sample_interval):
+        export_history(args.repo, args.output, profiler, args.sketch, args.sketch_only, args.release_index)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
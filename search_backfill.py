@@ -0,0 +1,193 @@
+import argparse
+import math
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+import os
+
+from record_store import RecordStore
+
+
+DATA_PATH = 'vscode_massive_data'
+BACKFILL_DIR = f'{DATA_PATH}/backfill'
+
+# 搜索 API 每个查询最多返回前 1000 条结果
+SEARCH_RESULT_CAP = 1000
+SEARCH_PAGE_SIZE = 100
+# 拆分窗口时按每个子窗口约 80% 上限估算份数，留出分布不均的余量
+SPLIT_FILL = 0.8
+
+Window = Tuple[datetime, datetime]
+
+
+def _iso(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def split_window(window: Window, total: int) -> List[Window]:
+    """
+    按结果数估算把 [start, end]（两端包含，秒级）等分为若干不重叠的子窗口
+    估算假设窗口内分布均匀；不均匀时超限的子窗口会在下一轮继续拆分
+    """
+    start, end = window
+    seconds = int((end - start).total_seconds()) + 1
+    parts = max(2, math.ceil(total / (SEARCH_RESULT_CAP * SPLIT_FILL)))
+    step = max(1, math.ceil(seconds / parts))
+    windows = []
+    offset = 0
+    while offset < seconds:
+        lo = start + timedelta(seconds=offset)
+        hi = min(start + timedelta(seconds=offset + step - 1), end)
+        windows.append((lo, hi))
+        offset += step
+    return windows
+
+
+class SearchBackfill:
+    """
+    基于搜索 API 的 Issue/PR 历史回填
+    /issues 列表的 since 是"更新时间之后"，且只能顺序翻页；搜索 API 的 created:A..B 按创建时间精确筛选，
+    但每个查询最多 1000 条。这里把时间范围自适应地拆成结果数不超过上限的子窗口，并行抓取并按编号去重。
+
+    每个窗口的第 1 页（per_page=100）同时用作探测：total_count 超限则丢弃该页并拆分窗口，
+    否则该页直接计入结果、再并发取剩余页。搜索配额按请求计数，用整页探测比 per_page=1 少一次请求。
+    """
+
+    def __init__(self, crawler, issue_type: str = 'issues', workers: int = 4):
+        self.crawler = crawler
+        self.issue_type = issue_type
+        self.workers = workers
+        # base_url 形如 {api}/repos/{owner}/{repo}
+        api_root, full_name = crawler.base_url.rstrip('/').split('/repos/', 1)
+        self.search_url = f"{api_root}/search/issues"
+        self.full_name = full_name
+        self.stats = {'windows': 0, 'splits': 0, 'requests': 0, 'duplicates': 0, 'truncated': 0,
+                      'incomplete': 0, 'failed': 0}
+
+    def query(self, window: Window) -> str:
+        qualifier = 'is:issue' if self.issue_type == 'issues' else 'is:pr'
+        return f"repo:{self.full_name} {qualifier} created:{_iso(window[0])}..{_iso(window[1])}"
+
+    def _fetch(self, window: Window, page: int) -> Tuple[Window, int, Optional[Dict]]:
+        params = {
+            "q": self.query(window),
+            "sort": "created",
+            "order": "desc",
+            "per_page": SEARCH_PAGE_SIZE,
+            "page": page,
+        }
+        data = self.crawler._make_request_safe(self.search_url, params, budget=self.crawler.search_budget)
+        return window, page, data if isinstance(data, dict) else None
+
+    def run(self, start: datetime, end: datetime) -> RecordStore:
+        from cyxcode import ENDPOINT_SCHEMAS
+
+        type_name = "问题" if self.issue_type == 'issues' else "PR"
+        print(f"🔍 搜索 API 回填{type_name}: {_iso(start)} ~ {_iso(end)}（{self.workers} 线程）")
+
+        store = ENDPOINT_SCHEMAS['issues'].new_store()
+        seen: Set[int] = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {pool.submit(self._fetch, (start, end), 1)}
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window, page, data = future.result()
+                    self.stats['requests'] += 1
+                    if data is None:
+                        self.stats['failed'] += 1
+                        print(f"  ⚠️  窗口 {_iso(window[0])} ~ {_iso(window[1])} 第{page}页获取失败")
+                        continue
+
+                    if page == 1:
+                        total = data.get('total_count') or 0
+                        if total > SEARCH_RESULT_CAP and window[1] > window[0]:
+                            # 超过上限：丢弃本页，拆分后重新探测
+                            self.stats['splits'] += 1
+                            for sub in split_window(window, total):
+                                running.add(pool.submit(self._fetch, sub, 1))
+                            continue
+                        self.stats['windows'] += 1
+                        if total > SEARCH_RESULT_CAP:
+                            self.stats['truncated'] += 1
+                            print(f"  ⚠️  {_iso(window[0])} 这一秒内有 {total} 条，只能取前 {SEARCH_RESULT_CAP} 条")
+                        pages = math.ceil(min(total, SEARCH_RESULT_CAP) / SEARCH_PAGE_SIZE)
+                        for next_page in range(2, pages + 1):
+                            running.add(pool.submit(self._fetch, window, next_page))
+
+                    if data.get('incomplete_results'):
+                        self.stats['incomplete'] += 1
+                    store.begin_page(page)
+                    for item in data.get('items') or []:
+                        if not isinstance(item, dict):
+                            continue
+                        number = item.get('number')
+                        if number in seen:
+                            self.stats['duplicates'] += 1
+                            continue
+                        seen.add(number)
+                        store.write(item)
+
+        stats = self.stats
+        print(f"✅ 获取到 {len(store):,} 条{type_name}：{stats['windows']} 个窗口，拆分 {stats['splits']} 次，"
+              f"{stats['requests']} 次搜索请求，去重 {stats['duplicates']} 条")
+        if stats['failed'] or stats['incomplete'] or stats['truncated']:
+            print(f"⚠️  失败 {stats['failed']} 页，结果不完整 {stats['incomplete']} 页，截断 {stats['truncated']} 个窗口")
+        return store
+
+
+def ordered(store: RecordStore) -> np.ndarray:
+    """按编号倒序（并行抓取的到达顺序不确定，输出时与 /issues 的创建时间倒序对齐）"""
+    return np.argsort(-store.raw('编号'), kind='stable')
+
+
+def _parse_date(text: str, end_of_day: bool = False) -> datetime:
+    value = datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    if end_of_day and len(text) == 10:
+        value += timedelta(days=1, seconds=-1)
+    return value
+
+
+def main():
+    """主函数"""
+    from cyxcode import MaxDataVSCodeCrawler
+
+    parser = argparse.ArgumentParser(description='搜索 API 时间切片回填 Issue/PR（按创建时间）')
+    parser.add_argument('--start', required=True, help='创建时间起点（YYYY-MM-DD 或 ISO 时间，UTC）')
+    parser.add_argument('--end', required=True, help='创建时间终点（YYYY-MM-DD 表示包含当天）')
+    parser.add_argument('--type', choices=['issues', 'pulls'], default='issues', help='问题或 PR')
+    parser.add_argument('--workers', type=int, default=4, help='并发线程数')
+    parser.add_argument('--output', default=None, help=f'输出 CSV（默认 {BACKFILL_DIR}/{{type}}_{{start}}_{{end}}.csv）')
+    parser.add_argument('--base-url', default="https://api.github.com/repos/microsoft/vscode")
+    args = parser.parse_args()
+
+    start = _parse_date(args.start)
+    end = _parse_date(args.end, end_of_day=True)
+    if end < start:
+        print("❌ 终点早于起点")
+        return
+
+    crawler = MaxDataVSCodeCrawler(github_token=os.environ.get('GITHUB_TOKEN', ''), base_url=args.base_url)
+    crawler.page_delay_scale = 0
+    backfill = SearchBackfill(crawler, args.type, args.workers)
+
+    started = datetime.now()
+    store = backfill.run(start, end)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    output = args.output or os.path.join(BACKFILL_DIR, f"{args.type}_{args.start}_{args.end}.csv")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    frame = store.to_dataframe(columns=sorted(store.names), order=ordered(store))
+    frame['序号'] = np.arange(1, len(frame) + 1)
+    frame.to_csv(output, index=False, encoding='utf-8-sig')
+    print(f"✅ 已写出 {output}（{len(store):,} 行，耗时 {elapsed:.1f}s）")
+    crawler.metrics.progress(force=True)
+    print(f"🔎 搜索配额: {crawler.search_budget.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+import argparse
+import base64
+import json
+import math
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import os
+
+import numpy as np
+import pandas as pd
+
+
+SKETCH_VERSION = 1
+
+
+def hash64(values) -> np.ndarray:
+    """稳定的 64 位哈希（与进程无关，可跨机器合并）"""
+    values = np.asarray(values, dtype=object)
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    return pd.util.hash_array(values, categorize=True)
+
+
+def _pack(array: np.ndarray) -> str:
+    return base64.b64encode(zlib.compress(np.ascontiguousarray(array).tobytes(), 6)).decode('ascii')
+
+
+def _unpack(text: str, dtype, shape) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype=dtype).reshape(shape).copy()
+
+
+class HyperLogLog:
+    """
+    HyperLogLog 基数估计
+    m = 2^p 个寄存器，相对标准误差约 1.04 / sqrt(m)（p=12 时约 1.6%）
+    """
+
+    def __init__(self, p: int = 12):
+        if not 4 <= p <= 18:
+            raise ValueError("p 必须在 4..18 之间")
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        # 取索引之后的 52 位计算前导零，float64 可精确表示
+        rest = ((hashes << np.uint64(self.p)) >> np.uint64(12)).astype(np.float64)
+        _, exponent = np.frexp(rest)
+        rank = (53 - exponent).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def add(self, values: Sequence):
+        self.add_hashes(hash64(values))
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return float(raw)
+
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.p != self.p:
+            raise ValueError("HyperLogLog 精度不同，无法合并")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def to_dict(self) -> Dict:
+        return {'p': self.p, 'registers': _pack(self.registers)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HyperLogLog':
+        sketch = cls(data['p'])
+        sketch.registers = _unpack(data['registers'], np.uint8, (sketch.m,))
+        return sketch
+
+
+class CountMinSketch:
+    """
+    Count-Min 频率估计
+    估计值 >= 真实值；以概率 1 - e^-depth 满足 估计值 <= 真实值 + (e / width) * N
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        self.total = 0
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        # Kirsch-Mitzenmacher：由一个 64 位哈希派生 depth 个哈希
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = hashes >> np.uint64(32)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add_hashes(self, hashes: np.ndarray, counts: Optional[np.ndarray] = None):
+        if len(hashes) == 0:
+            return
+        counts = np.ones(len(hashes), dtype=np.uint32) if counts is None else counts.astype(np.uint32)
+        columns = self._columns(hashes.astype(np.uint64, copy=False))
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], counts)
+        self.total += int(counts.sum())
+
+    def add(self, values: Sequence, counts: Optional[np.ndarray] = None):
+        self.add_hashes(hash64(values), counts)
+
+    def estimate(self, values: Sequence) -> np.ndarray:
+        hashes = hash64(values)
+        if len(hashes) == 0:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0).astype(np.int64)
+
+    def error_bound(self) -> Tuple[float, float]:
+        """(加性误差上界, 失败概率)"""
+        return math.e / self.width * self.total, math.exp(-self.depth)
+
+    def merge(self, other: 'CountMinSketch'):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Count-Min 尺寸不同，无法合并")
+        self.table += other.table
+        self.total += other.total
+
+    def to_dict(self) -> Dict:
+        return {'width': self.width, 'depth': self.depth, 'total': self.total, 'table': _pack(self.table)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CountMinSketch':
+        sketch = cls(data['width'], data['depth'])
+        sketch.table = _unpack(data['table'], np.uint32, (sketch.depth, sketch.width))
+        sketch.total = data['total']
+        return sketch
+
+
+class SpaceSaving:
+    """
+    Space-Saving Top-K（加权、批量预聚合）
+    最多保留 k 个计数器；每个计数的高估量不超过 error，且 error <= N / k
+    """
+
+    def __init__(self, k: int = 100):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.total = 0
+
+    def update(self, items: Iterable[str], weights: Optional[Iterable[int]] = None):
+        batch = Counter()
+        if weights is None:
+            batch.update(items)
+        else:
+            for item, weight in zip(items, weights):
+                batch[item] += weight
+        # 先处理大计数，减少替换次数
+        for item, count in batch.most_common():
+            self._offer(item, count)
+
+    def _offer(self, item: str, count: int):
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.k:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            victim = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(victim)
+            self.errors.pop(victim)
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+
+    def top(self, n: int = 10) -> List[Tuple[str, int, int]]:
+        """[(元素, 估计计数, 最大高估量)]"""
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[:n]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def error_bound(self) -> float:
+        return self.total / self.k
+
+    def merge(self, other: 'SpaceSaving'):
+        """可合并摘要：两侧计数相加（缺失一侧按该侧最小计数补误差），再保留前 k 个"""
+        floor_self = min(self.counts.values()) if len(self.counts) >= self.k else 0
+        floor_other = min(other.counts.values()) if len(other.counts) >= other.k else 0
+        counts, errors = {}, {}
+        for item in set(self.counts) | set(other.counts):
+            a = self.counts.get(item)
+            b = other.counts.get(item)
+            counts[item] = (a if a is not None else floor_self) + (b if b is not None else floor_other)
+            errors[item] = (self.errors[item] if a is not None else floor_self) + \
+                           (other.errors[item] if b is not None else floor_other)
+        kept = sorted(counts, key=lambda item: (-counts[item], item))[:self.k]
+        self.counts = {item: counts[item] for item in kept}
+        self.errors = {item: errors[item] for item in kept}
+        self.total += other.total
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'total': self.total,
+                'items': [[item, count, self.errors[item]] for item, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SpaceSaving':
+        sketch = cls(data['k'])
+        sketch.total = data['total']
+        for item, count, error in data['items']:
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+        return sketch
+
+
+class BucketSketches:
+    """单个时间桶内的草图：提交数、去重作者、热门文件和高频提交者"""
+
+    def __init__(self, hll_p: int = 12, cms_width: int = 2048, cms_depth: int = 4, top_k: int = 100):
+        self.commits = 0
+        self.authors = HyperLogLog(hll_p)
+        self.files = CountMinSketch(cms_width, cms_depth)
+        self.hot_files = SpaceSaving(top_k)
+        self.committers = SpaceSaving(top_k)
+
+    def merge(self, other: 'BucketSketches'):
+        self.commits += other.commits
+        self.authors.merge(other.authors)
+        self.files.merge(other.files)
+        self.hot_files.merge(other.hot_files)
+        self.committers.merge(other.committers)
+
+    def to_dict(self) -> Dict:
+        return {'commits': self.commits, 'authors': self.authors.to_dict(), 'files': self.files.to_dict(),
+                'hot_files': self.hot_files.to_dict(), 'committers': self.committers.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BucketSketches':
+        bucket = cls.__new__(cls)
+        bucket.commits = data['commits']
+        bucket.authors = HyperLogLog.from_dict(data['authors'])
+        bucket.files = CountMinSketch.from_dict(data['files'])
+        bucket.hot_files = SpaceSaving.from_dict(data['hot_files'])
+        bucket.committers = SpaceSaving.from_dict(data['committers'])
+        return bucket
+
+
+class RepositorySketches:
+    """
+    按时间桶（默认按月）维护的近似统计
+    提交流式写入、按批向量化更新；不同仓库/分片的结果可用 merge() 合并
+    """
+
+    def __init__(self, freq: str = 'M', hll_p: int = 12, cms_width: int = 2048, cms_depth: int = 4,
+                 top_k: int = 100, batch_size: int = 4096):
+        self.freq = freq
+        self.params = {'hll_p': hll_p, 'cms_width': cms_width, 'cms_depth': cms_depth, 'top_k': top_k}
+        self.batch_size = batch_size
+        self.buckets: Dict[str, BucketSketches] = {}
+        self.sources: List[str] = []
+        self._times: List[int] = []
+        self._authors: List[str] = []
+        self._files: List[Sequence[str]] = []
+
+    def bucket(self, key: str) -> BucketSketches:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = BucketSketches(**self.params)
+        return bucket
+
+    def _bucket_keys(self, seconds: np.ndarray) -> np.ndarray:
+        unit = {'M': 'datetime64[M]', 'D': 'datetime64[D]', 'Y': 'datetime64[Y]'}[self.freq]
+        return seconds.astype('datetime64[s]').astype(unit).astype(str)
+
+    def add_commit(self, timestamp: int, author: str, files: Sequence[str] = ()):
+        """追加一条提交（秒级时间戳、作者标识、修改的文件）；缓冲满一批后更新草图"""
+        self._times.append(timestamp)
+        self._authors.append(author)
+        self._files.append(files)
+        if len(self._times) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._times:
+            return
+        keys = self._bucket_keys(np.asarray(self._times, dtype=np.int64))
+        authors = np.asarray([a.lower() for a in self._authors], dtype=object)
+        files = self._files
+        for key in np.unique(keys):
+            rows = np.flatnonzero(keys == key)
+            bucket = self.bucket(key)
+            bucket.commits += len(rows)
+            bucket.authors.add(authors[rows])
+            bucket.committers.update(authors[rows])
+            paths = [path for row in rows for path in files[row]]
+            if paths:
+                bucket.files.add(paths)
+                bucket.hot_files.update(paths)
+        self._times, self._authors, self._files = [], [], []
+
+    def merge(self, other: 'RepositorySketches'):
+        if other.freq != self.freq or other.params != self.params:
+            raise ValueError("时间桶或草图参数不同，无法合并")
+        self.flush()
+        other.flush()
+        for key, bucket in other.buckets.items():
+            if key in self.buckets:
+                self.buckets[key].merge(bucket)
+            else:
+                self.buckets[key] = BucketSketches.from_dict(bucket.to_dict())
+        self.sources.extend(other.sources)
+
+    def summary(self, top: int = 3) -> pd.DataFrame:
+        """每个时间桶一行：提交数、去重作者估计、最热文件、高频提交者"""
+        self.flush()
+        rows = []
+        for key in sorted(self.buckets):
+            bucket = self.buckets[key]
+            rows.append({
+                'bucket': key,
+                'commits': bucket.commits,
+                'distinct_authors': round(bucket.authors.estimate()),
+                'hot_files': '; '.join(f"{item} ({count})" for item, count, _ in bucket.hot_files.top(top)),
+                'top_committers': '; '.join(f"{item} ({count})" for item, count, _ in bucket.committers.top(top)),
+            })
+        return pd.DataFrame(rows)
+
+    def error_bounds(self) -> Dict[str, str]:
+        p, width, depth, k = (self.params[name] for name in ('hll_p', 'cms_width', 'cms_depth', 'top_k'))
+        return {
+            'distinct_authors': f"HyperLogLog 相对标准误差 ≈ {1.04 / math.sqrt(1 << p):.1%}",
+            'file_counts': f"Count-Min 高估 ≤ {math.e / width:.3%} × 该桶文件修改总数（概率 ≥ {1 - math.exp(-depth):.1%}）",
+            'top_k': f"Space-Saving 每个计数高估 ≤ 该桶总数 / {k}；真实频率 > N/{k} 的元素一定在列表中",
+        }
+
+    def save(self, path: str):
+        self.flush()
+        data = {'version': SKETCH_VERSION, 'freq': self.freq, 'params': self.params, 'sources': self.sources,
+                'buckets': {key: bucket.to_dict() for key, bucket in sorted(self.buckets.items())}}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> 'RepositorySketches':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != SKETCH_VERSION:
+            raise ValueError(f"不支持的草图版本: {data.get('version')}")
+        sketches = cls(data['freq'], **data['params'])
+        sketches.sources = data.get('sources', [])
+        sketches.buckets = {key: BucketSketches.from_dict(b) for key, b in data['buckets'].items()}
+        return sketches
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='近似统计草图：合并与查看')
+    sub = parser.add_subparsers(dest='command', required=True)
+    merge = sub.add_parser('merge', help='合并多个仓库/分片的草图文件')
+    merge.add_argument('inputs', nargs='+')
+    merge.add_argument('-o', '--output', required=True)
+    show = sub.add_parser('show', help='按时间桶显示近似统计')
+    show.add_argument('path')
+    show.add_argument('--top', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == 'merge':
+        merged = RepositorySketches.load(args.inputs[0])
+        for path in args.inputs[1:]:
+            merged.merge(RepositorySketches.load(path))
+        merged.save(args.output)
+        print(f"✅ 已合并 {len(args.inputs)} 个草图 -> {args.output}（{len(merged.buckets)} 个时间桶）")
+    else:
+        sketches = RepositorySketches.load(args.path)
+        print(f"📊 草图来源: {', '.join(sketches.sources) or '未知'}")
+        print("=" * 60)
+        with pd.option_context('display.max_colwidth', 80, 'display.width', 200):
+            print(sketches.summary(args.top).to_string(index=False))
+        print("\n误差界：")
+        for name, text in sketches.error_bounds().items():
+            print(f"  • {name}: {text}")
+
+
+if __name__ == "__main__":
+    main()
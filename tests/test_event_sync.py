@@ -0,0 +1,63 @@
+import pandas as pd
+
+from cyxcode import ENDPOINT_SCHEMAS, MaxDataVSCodeCrawler
+from event_sync import EventSync, upsert_csv
+from fake_github import FakeGitHubServer, FakeGitHubState, SyntheticData
+
+
+def _issue(number, updated_at, title):
+    return {'number': number, 'title': title, 'state': 'open', 'updated_at': updated_at,
+            'created_at': '2024-01-01T00:00:00Z', 'user': {'login': 'someone'}}
+
+
+def _store(*items):
+    store = ENDPOINT_SCHEMAS['issues'].new_store()
+    store.begin_page(0, '2024-01-01T00:00:00')
+    for item in items:
+        store.write(item)
+    return store
+
+
+def test_upsert_keeps_newer_rows(tmp_path):
+    path = str(tmp_path / '3_issues_open.csv')
+    upsert_csv(path, _store(_issue(1, '2024-03-01T00:00:00Z', 'new'), _issue(2, '2024-01-01T00:00:00Z', 'old')),
+               set(), '编号', '更新时间')
+
+    # 1 号的快照比已有记录旧，不覆盖；2 号更新；3 号新增；删除不存在的主键没有影响
+    written, deleted = upsert_csv(
+        path,
+        _store(_issue(1, '2024-02-01T00:00:00Z', 'stale'), _issue(2, '2024-02-01T00:00:00Z', 'updated'),
+               _issue(3, '2024-02-01T00:00:00Z', 'added')),
+        {'99'}, '编号', '更新时间')
+    assert (written, deleted) == (2, 0)
+
+    frame = pd.read_csv(path, dtype=str, encoding='utf-8-sig').set_index('编号')
+    assert frame.loc['1', '标题'] == 'new'
+    assert frame.loc['2', '标题'] == 'updated'
+    assert frame.loc['3', '标题'] == 'added'
+    assert list(frame['序号']) == ['1', '2', '3']
+
+
+def test_upsert_deletes(tmp_path):
+    path = str(tmp_path / '3_issues_open.csv')
+    upsert_csv(path, _store(_issue(1, '2024-01-01T00:00:00Z', 'a'), _issue(2, '2024-01-01T00:00:00Z', 'b')),
+               set(), '编号', '更新时间')
+    assert upsert_csv(path, _store(), {'1'}, '编号', '更新时间') == (0, 1)
+    assert list(pd.read_csv(path, dtype=str, encoding='utf-8-sig')['编号']) == ['2']
+
+
+def test_first_sync_applies_all_retained_events(tmp_path):
+    state = FakeGitHubState(SyntheticData(), poll_interval=0)
+    state.add_events(250)
+    with FakeGitHubServer(state) as server:
+        crawler = MaxDataVSCodeCrawler(github_token='test-token', base_url=server.base_url)
+        crawler.page_delay_scale = 0
+        sync = EventSync(crawler, str(tmp_path))
+        sync.poll()
+        assert sync.stats['events'] + sync.stats['ignored'] == 250
+        assert sync.stats['gaps'] == 0
+
+        state.add_events(120)
+        sync.poll()
+        assert sync.stats['events'] + sync.stats['ignored'] == 370
+        assert sync.stats['gaps'] == 0
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+from cyxcode import MaxDataVSCodeCrawler
+from fake_github import FakeGitHubServer, FakeGitHubState, SyntheticData
+from fork_network import ForkNetworkCrawler
+
+
+def _crawl(workers, max_forks=None):
+    data = SyntheticData({'forks': 60})
+    # 合成时间相对当前时间生成，固定下来两次抓取才可比较
+    data.now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    state = FakeGitHubState(data)
+    with FakeGitHubServer(state) as server:
+        crawler = MaxDataVSCodeCrawler(github_token='test-token', base_url=server.base_url)
+        crawler.page_delay_scale = 0
+        network = ForkNetworkCrawler(crawler, workers=workers, max_depth=3, max_forks=max_forks)
+        frame = network.run()
+    return frame.sort_values('仓库ID').reset_index(drop=True), network.stats
+
+
+def test_results_identical_across_worker_counts():
+    serial, serial_stats = _crawl(1)
+    parallel, parallel_stats = _crawl(8)
+
+    assert serial['深度'].max() > 1
+    assert serial['仓库ID'].is_unique
+    assert serial.equals(parallel)
+    for key in ('forks', 'active', 'list_requests', 'compare_requests'):
+        assert serial_stats[key] == parallel_stats[key]
+    # 只对比活跃的 Fork
+    assert serial_stats['compare_requests'] == serial_stats['active'] == int(serial['活跃'].sum())
+    assert serial.loc[~serial['活跃'], '领先提交'].isna().all()
+
+
+def test_max_forks_limit():
+    frame, stats = _crawl(8, max_forks=40)
+    assert len(frame) == 40
+    assert stats['truncated'] > 0
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from identity import AuthorIdentityResolver
+
+
+def test_incremental_link_keeps_existing_ids():
+    resolver = AuthorIdentityResolver()
+    keys = pd.Series(['email:a', 'email:b', 'email:c'])
+    assert list(resolver.author_ids(keys)) == [0, 1, 2]
+
+    resolver.link('email:a', 'email:b')
+    assert list(resolver.author_ids(keys)) == [0, 0, 2]
+
+    # 新增标识追加新ID，已有ID不变
+    resolver.link('email:d', 'login:d')
+    assert list(resolver.author_ids(pd.Series(['email:c', 'login:d', 'email:a']))) == [2, 3, 0]
+
+
+def test_merge_keeps_older_set_id():
+    resolver = AuthorIdentityResolver()
+    resolver.author_ids(pd.Series(['email:b']))
+    resolver._index('email:a')
+    resolver.author_ids(pd.Series(['email:a']))
+    # b 先出现：合并后沿用 b 的ID
+    resolver.link('email:a', 'email:b')
+    assert list(resolver.author_ids(pd.Series(['email:a', 'email:b']))) == [0, 0]
+
+
+def test_ids_consistent_across_datasets():
+    resolver = AuthorIdentityResolver()
+    resolver.link('login:alice', 'email:alice@example.com')
+    git_ids = resolver.author_ids(resolver.git_row_keys(pd.DataFrame(
+        {'author': ['Alice', 'Bob'], 'author_email': ['alice@example.com', 'bob@example.com']})))
+    api_ids = resolver.author_ids(resolver.contributor_row_keys(pd.DataFrame({'用户名': ['alice']})))
+    assert api_ids.iloc[0] == git_ids.iloc[0]
+    assert git_ids.iloc[1] != git_ids.iloc[0]
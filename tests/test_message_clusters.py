@@ -0,0 +1,40 @@
+import pandas as pd
+
+from message_clusters import cluster_messages, normalize_message
+
+
+def test_bump_same_packages_single_cluster():
+    messages = [f"Bump lodash{i % 10} from 1.{i}.0 to 1.{i + 1}.0" for i in range(50)]
+    assert cluster_messages(pd.Series(messages)).nunique() == 1
+
+
+def test_bump_distinct_packages_single_cluster():
+    messages = [f"Bump package{i} from 1.{i}.0 to 1.{i + 1}.0" for i in range(50)]
+    assert normalize_message(messages[0]) == 'bump <pkg> from <ver> to <ver>'
+    assert cluster_messages(pd.Series(messages)).nunique() == 1
+
+
+def test_trailing_pr_reference_ignored():
+    ids = cluster_messages(pd.Series(["Fix typo", "Update distro", "Update distro (#1234)"]))
+    assert list(ids) == [0, 1, 1]
+
+
+def test_non_ascii_and_missing_messages_not_merged():
+    ids = cluster_messages(pd.Series(["修复编辑器崩溃", "更新中文文档", None]))
+    assert list(ids) == [0, 1, 2]
+
+
+def test_empty_template_falls_back_to_subject():
+    assert normalize_message("🎉") == "🎉"
+    assert normalize_message("...") != normalize_message("🎉")
+
+
+def test_sha_requires_letter():
+    assert normalize_message("Fix 1234567 failing tests") == 'fix <num> failing tests'
+    assert normalize_message("Revert abc1234f") == 'revert <sha>'
+
+
+def test_from_branch_only_for_non_versions():
+    assert normalize_message("Merge pull request #123 from user/feature-x") == \
+        'merge pull request <ref> from <branch>'
+    assert normalize_message("Upgrade from 1.2.0") == 'upgrade from <ver>'
@@ -0,0 +1,36 @@
+import git
+
+from release_index import UNRELEASED, ReleaseIndex
+
+
+def _repo(path):
+    repo = git.Repo.init(path)
+    with repo.config_writer() as config:
+        config.set_value('user', 'name', 'Test')
+        config.set_value('user', 'email', 'test@example.com')
+    shas = []
+    for i in range(3):
+        (path / 'file.txt').write_text(str(i))
+        repo.index.add(['file.txt'])
+        shas.append(repo.index.commit(f'commit {i}').hexsha)
+        if i == 1:
+            repo.create_tag('1.0.0')
+    return repo, shas
+
+
+def test_lookup_prefixes(tmp_path):
+    repo, shas = _repo(tmp_path)
+    index = ReleaseIndex()
+    index.update(repo, repo.active_branch.name)
+
+    assert list(index.lookup([shas[0], shas[1][:7], shas[2]])) == [0, 0, UNRELEASED]
+    assert index.first_release([shas[0][:9].upper()]) == ['1.0.0']
+
+
+def test_lookup_invalid_prefixes(tmp_path):
+    repo, shas = _repo(tmp_path)
+    index = ReleaseIndex()
+    index.update(repo, repo.active_branch.name)
+
+    result = index.lookup(['zz', '', shas[0] + '\n', 'g' * 40, shas[0]])
+    assert list(result) == [UNRELEASED] * 4 + [0]
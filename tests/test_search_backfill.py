@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from cyxcode import MaxDataVSCodeCrawler
+from fake_github import FakeGitHubServer, FakeGitHubState, SyntheticData
+from search_backfill import SEARCH_RESULT_CAP, SearchBackfill, split_window
+
+
+def test_split_window_covers_range_without_overlap():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for seconds, total in [(1, 5000), (2, 1001), (3599, 2500), (86400 * 30, 12345), (86399, 1000000)]:
+        end = start + timedelta(seconds=seconds)
+        windows = split_window((start, end), total)
+        assert len(windows) >= 2
+        assert windows[0][0] == start
+        assert windows[-1][1] == end
+        for (lo, hi), (next_lo, _) in zip(windows, windows[1:]):
+            assert lo <= hi
+            # 两端包含、秒级：下一个窗口紧接在上一个窗口之后一秒
+            assert next_lo == hi + timedelta(seconds=1)
+
+
+def test_capped_backfill_matches_synthetic_search(tmp_path):
+    data = SyntheticData({'issues': 4000})
+    state = FakeGitHubState(data, search_rate_limit=10000)
+    end = data.now
+    start = end - timedelta(days=25)
+    expected = {item['number'] for item in data.search_issues(False, start.replace(microsecond=0),
+                                                              end.replace(microsecond=0))}
+    assert len(expected) > SEARCH_RESULT_CAP
+
+    with FakeGitHubServer(state) as server:
+        crawler = MaxDataVSCodeCrawler(github_token='test-token', base_url=server.base_url)
+        crawler.page_delay_scale = 0
+        backfill = SearchBackfill(crawler, 'issues', workers=4)
+        store = backfill.run(start, end)
+
+    numbers = list(store.raw('编号'))
+    assert len(numbers) == len(set(numbers))
+    assert set(numbers) == expected
+    assert backfill.stats['splits'] > 0
+    assert backfill.stats['truncated'] == 0